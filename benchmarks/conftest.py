@@ -0,0 +1,118 @@
+"""
+Regression gate for the CPU benchmarks.
+
+The fastest round of each benchmark in the `synthetic` group, the least
+noisy statistic for CPU-bound code, is divided by the time of a fixed
+calibration workload to make it comparable across machines, and checked
+against `baseline.json`. A benchmark slower than its baseline by
+more than the tolerance fails the run. Record a new baseline with
+`--update-baseline` after an intended change.
+"""
+import os
+import json
+import time
+import random
+import pytest
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+GATED_GROUP = "synthetic"
+DEFAULT_TOLERANCE = 1.5
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("weaviate-migrate baseline")
+    group.addoption(
+        "--update-baseline", action="store_true", help="Record the synthetic benchmarks as the new baseline."
+    )
+    group.addoption(
+        "--baseline-tolerance", type=float, default=None,
+        help=f"Allowed slowdown against the baseline (default: the baseline's own, or {DEFAULT_TOLERANCE})."
+    )
+
+
+def calibrate(rounds: int = 10) -> float:
+    """
+    Best time of a fixed workload of dict building, sorting and JSON, the
+    operations the gated benchmarks spend their time in. It does not call
+    this package, so a regression here does not hide itself.
+    """
+    rng = random.Random(0)
+    records = [
+        {"name": f"item{i}", "value": rng.random(), "tags": [f"t{rng.randrange(50)}" for _ in range(5)]}
+        for i in range(5000)
+    ]
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        encoded = json.dumps(sorted(records, key=lambda r: r["value"]))
+        decoded = json.loads(encoded)
+        {r["name"]: {t: r["value"] for t in r["tags"]} for r in decoded}
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _benchmarks_enabled(config) -> bool:
+    benchmark_session = getattr(config, "_benchmarksession", None)
+    return benchmark_session is not None and not benchmark_session.disabled
+
+
+def pytest_sessionstart(session):
+    # Calibrate before and after the run, and keep the faster of the two,
+    # so a burst of load on the machine at either end does not skew it.
+    if _benchmarks_enabled(session.config):
+        session.config._calibration = calibrate()
+
+
+def _write(session, line: str = "") -> None:
+    reporter = session.config.pluginmanager.get_plugin("terminalreporter")
+    if reporter is not None:
+        reporter.write_line(line)
+
+
+def pytest_sessionfinish(session, exitstatus):
+    if not _benchmarks_enabled(session.config):
+        return
+    benchmark_session = session.config._benchmarksession
+    fastest = {
+        b.name: b.stats.min for b in benchmark_session.benchmarks
+        if b.group == GATED_GROUP and b.stats and b.stats.rounds
+    }
+    if not fastest:
+        return
+
+    unit = min(calibrate(), getattr(session.config, "_calibration", float("inf")))
+    normalized = {name: seconds / unit for name, seconds in fastest.items()}
+
+    if session.config.getoption("update_baseline"):
+        baseline = {
+            "tolerance": session.config.getoption("baseline_tolerance") or DEFAULT_TOLERANCE,
+            "benchmarks": {name: round(value, 4) for name, value in sorted(normalized.items())},
+        }
+        with open(BASELINE_PATH, "w") as f:
+            json.dump(baseline, f, indent=2)
+            f.write("\n")
+        _write(session, f"Wrote {len(normalized)} benchmark(s) to {BASELINE_PATH}")
+        return
+
+    if not os.path.exists(BASELINE_PATH):
+        return
+    with open(BASELINE_PATH, "r") as f:
+        baseline = json.load(f)
+    tolerance = session.config.getoption("baseline_tolerance") or baseline.get("tolerance", DEFAULT_TOLERANCE)
+
+    _write(session)
+    _write(session, f"Against baseline (calibration unit {unit * 1000:.1f}ms, tolerance {tolerance:.2f}x):")
+    regressions = []
+    for name, value in sorted(normalized.items()):
+        expected = baseline["benchmarks"].get(name)
+        if expected is None:
+            _write(session, f"  {name}: no baseline")
+            continue
+        ratio = value / expected
+        failed = ratio > tolerance
+        _write(session, f"  {name}: {ratio:.2f}x{'  REGRESSION' if failed else ''}")
+        if failed:
+            regressions.append(name)
+    if regressions:
+        _write(session, f"{len(regressions)} benchmark(s) regressed against {BASELINE_PATH}")
+        session.exitstatus = pytest.ExitCode.TESTS_FAILED
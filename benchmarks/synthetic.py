@@ -0,0 +1,110 @@
+"""
+Seeded generator of large, realistic Weaviate schemas for benchmarks.
+
+The same seed and size always produce the same schema, so benchmark runs
+compare like with like.
+"""
+import copy
+import random
+from typing import Dict, List
+
+PRIMITIVE_TYPES = [
+    (["text"], 40), (["int"], 12), (["number"], 8), (["boolean"], 8), (["date"], 8),
+    (["text[]"], 6), (["uuid"], 3), (["geoCoordinates"], 1), (["int[]"], 2), (["blob"], 1),
+]
+VECTORIZERS = ["none", "text2vec-openai", "text2vec-cohere", "text2vec-transformers"]
+TOKENIZATIONS = ["word", "field", "lowercase", "whitespace"]
+# Share of properties that are cross-references to another class.
+REFERENCE_RATE = 0.08
+
+
+def _property_count(rng: random.Random) -> int:
+    # Most classes are small and a few are wide: a log-normal with a median
+    # of about 10 properties, capped like production schemas tend to be.
+    return max(1, min(int(rng.lognormvariate(2.3, 0.7)), 120))
+
+
+def _property(rng: random.Random, class_names: List[str], index: int) -> Dict:
+    if class_names and rng.random() < REFERENCE_RATE:
+        return {"name": f"ref{index}", "dataType": [rng.choice(class_names)]}
+    data_types = rng.choices([t for t, _ in PRIMITIVE_TYPES], [w for _, w in PRIMITIVE_TYPES])[0]
+    definition = {"name": f"prop{index}", "dataType": list(data_types)}
+    if data_types[0].startswith("text"):
+        definition["tokenization"] = rng.choice(TOKENIZATIONS)
+        definition["indexSearchable"] = rng.random() < 0.8
+        if rng.random() < 0.3:
+            definition["moduleConfig"] = {"text2vec-openai": {"skip": rng.random() < 0.5}}
+    definition["indexFilterable"] = rng.random() < 0.7
+    return definition
+
+
+def _class(rng: random.Random, class_name: str, class_names: List[str]) -> Dict:
+    vectorizer = rng.choice(VECTORIZERS)
+    definition = {
+        "class": class_name,
+        "description": f"Synthetic class {class_name}.",
+        "vectorizer": vectorizer,
+        "properties": [_property(rng, class_names, i) for i in range(_property_count(rng))],
+        "vectorIndexType": "hnsw",
+        "vectorIndexConfig": {
+            "distance": rng.choice(["cosine", "dot", "l2-squared"]),
+            "ef": rng.choice([-1, 64, 128]),
+            "efConstruction": rng.choice([64, 128, 256]),
+            "maxConnections": rng.choice([16, 32, 64]),
+        },
+        "shardingConfig": {"desiredCount": rng.choice([1, 1, 1, 2, 4])},
+        "replicationConfig": {"factor": rng.choice([1, 1, 3])},
+    }
+    if vectorizer != "none":
+        definition["moduleConfig"] = {vectorizer: {"vectorizeClassName": rng.random() < 0.5}}
+    return definition
+
+
+def generate_schema(num_classes: int, seed: int = 0) -> Dict:
+    """
+    A schema of `num_classes` classes with log-normally distributed property
+    counts, text tokenization and module settings, vector index, sharding
+    and replication configs, and references between classes.
+    """
+    rng = random.Random(seed)
+    class_names = [f"Synthetic{i}" for i in range(num_classes)]
+    return {"classes": [_class(rng, name, class_names) for name in class_names]}
+
+
+def mutate_schema(schema: Dict, num_changes: int, seed: int = 0) -> Dict:
+    """
+    A copy of `schema` with `num_changes` changes spread across it: added
+    properties, changed property settings, added and removed classes.
+    """
+    rng = random.Random(seed)
+    target = copy.deepcopy(schema)
+    classes = target["classes"]
+    for change in range(num_changes):
+        kind = change % 4
+        class_definition = classes[rng.randrange(len(classes))]
+        if kind == 0:
+            class_definition["properties"].append(
+                {"name": f"added{change}", "dataType": ["int"], "indexFilterable": True}
+            )
+        elif kind == 1:
+            class_definition["properties"][0]["indexFilterable"] = not class_definition["properties"][0].get(
+                "indexFilterable", True
+            )
+        elif kind == 2:
+            classes.append(_class(rng, f"Added{change}", [c["class"] for c in classes[:100]]))
+        elif len(classes) > 1:
+            classes.remove(class_definition)
+    return target
+
+
+def additive_migration(schema: Dict, num_classes: int, seed: int = 0) -> Dict:
+    """
+    A migration adding one property to `num_classes` existing classes and
+    creating as many new ones.
+    """
+    rng = random.Random(seed)
+    existing = rng.sample(schema["classes"], min(num_classes, len(schema["classes"])))
+    names = [c["class"] for c in schema["classes"][:100]]
+    return {"classes": [
+        {"class": c["class"], "properties": [{"name": "added", "dataType": ["int"]}]} for c in existing
+    ] + [_class(rng, f"New{i}", names) for i in range(num_classes)]}
@@ -0,0 +1,54 @@
+import copy
+import pytest
+from unittest.mock import MagicMock
+from weaviate_migrate.commands.migrate import apply_migration
+from weaviate_migrate.schema_index import SchemaIndex
+
+pytest.importorskip("pytest_benchmark")
+
+
+def make_schema(num_classes, num_properties=10):
+    return {
+        "classes": [
+            {
+                "class": f"Class{i}",
+                "properties": [
+                    {"name": f"prop{j}", "dataType": ["text"]}
+                    for j in range(num_properties)
+                ]
+            }
+            for i in range(num_classes)
+        ]
+    }
+
+
+def make_migration(num_classes):
+    """
+    A fixed-size migration: one new property on 99 existing classes spread
+    across the schema, plus one new class.
+    """
+    step = max(num_classes // 99, 1)
+    migration = {"classes": []}
+    for i in range(0, num_classes, step)[:99]:
+        migration["classes"].append({
+            "class": f"Class{i}",
+            "properties": [{"name": "added", "dataType": ["int"]}]
+        })
+    migration["classes"].append({"class": "NewClass", "properties": []})
+    return migration
+
+
+@pytest.mark.parametrize("num_classes", [100, 1000, 10000])
+def test_apply_migration_scales_flat(benchmark, num_classes):
+    """
+    Applying a single file against an indexed schema should cost the same
+    whether the schema has a hundred classes or ten thousand.
+    """
+    schema = make_schema(num_classes)
+    migration = make_migration(num_classes)
+
+    def setup():
+        index = SchemaIndex(copy.deepcopy(schema))
+        return (MagicMock(), migration, index), {}
+
+    benchmark.pedantic(apply_migration, setup=setup, rounds=10)
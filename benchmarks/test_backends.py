@@ -0,0 +1,107 @@
+import os
+import sys
+import json
+import pytest
+import subprocess
+from contextlib import redirect_stdout
+from weaviate_migrate.commands.migrate import migrate
+from weaviate_migrate.standin import StandInClient
+from weaviate_migrate.transport import Transport
+from benchmarks.test_apply_migration import make_schema
+
+pytest.importorskip("pytest_benchmark")
+
+LATENCY = 0.005
+# Requests per second the throttling stand-in serves before answering 429.
+RATE_LIMIT = 100
+
+
+def _serve(*options):
+    """
+    A stand-in server in its own process, so it does not compete with the
+    backend under test for the GIL.
+    """
+    process = subprocess.Popen(
+        [sys.executable, "-m", "weaviate_migrate.standin", "--port", "0", "--latency", str(LATENCY), *options],
+        stdout=subprocess.PIPE, text=True,
+    )
+    try:
+        yield process.stdout.readline().strip()
+    finally:
+        process.terminate()
+        process.wait()
+
+
+@pytest.fixture(scope="module")
+def server_url():
+    yield from _serve()
+
+
+@pytest.fixture(scope="module")
+def throttling_server_url():
+    yield from _serve("--rate-limit", str(RATE_LIMIT), "--retry-after", "0")
+
+
+@pytest.fixture(scope="module")
+def migration_folder(tmp_path_factory):
+    """
+    A bootstrap migration of 100 classes, then one property added to each.
+    """
+    folder = tmp_path_factory.mktemp("migrations")
+    schema = make_schema(100, num_properties=3)
+    with open(os.path.join(folder, "0001_migration.json"), "w") as f:
+        json.dump(schema, f)
+    with open(os.path.join(folder, "0002_migration.json"), "w") as f:
+        json.dump({"classes": [
+            {"class": c["class"], "properties": [{"name": "added", "dataType": ["int"]}]}
+            for c in schema["classes"]
+        ]}, f)
+    return str(folder)
+
+
+@pytest.mark.parametrize("backend,concurrency", [("sync", 1), ("sync", 8), ("async", 8), ("async", 16)])
+def test_migrate_backend_wall_clock(benchmark, server_url, migration_folder, backend, concurrency):
+    """
+    Wall-clock time to apply the folder against a stand-in server that adds
+    5ms to every request.
+    """
+    client = StandInClient(server_url)
+
+    def setup():
+        for class_definition in client.schema.get()["classes"]:
+            client.schema.delete_class(class_definition["class"])
+        return (client, migration_folder), {"concurrency": concurrency, "backend": backend}
+
+    def run(*args, **kwargs):
+        with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+            return migrate(*args, **kwargs)
+
+    benchmark.pedantic(run, setup=setup, rounds=5)
+
+    assert len(client.schema.get()["classes"]) == 100
+    client.close()
+
+
+@pytest.mark.parametrize("backend", ["sync", "async"])
+def test_migrate_under_rate_limit(benchmark, throttling_server_url, migration_folder, backend):
+    """
+    Wall-clock time to apply the folder at concurrency 32 against a server
+    that serves 100 requests per second, with a burst of as many. The run
+    makes more requests than that, so it is paced by the server; the
+    adaptive limiter should keep it close to the rate limit.
+    """
+    client = Transport.create(max_retries=10).wrap(StandInClient(throttling_server_url))
+
+    def setup():
+        for class_definition in client.schema.get()["classes"]:
+            client.schema.delete_class(class_definition["class"])
+        return (client, migration_folder), {"concurrency": 32, "backend": backend}
+
+    def run(*args, **kwargs):
+        with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+            return migrate(*args, **kwargs)
+
+    benchmark.pedantic(run, setup=setup, rounds=3)
+
+    assert len(client.schema.get()["classes"]) == 100
+    client.close()
@@ -0,0 +1,47 @@
+import copy
+import pytest
+from weaviate_migrate.commands.makemigrations import calculate_schema_diff
+from benchmarks.test_apply_migration import make_schema
+
+pytest.importorskip("pytest_benchmark")
+
+
+@pytest.mark.parametrize("num_classes", [1000, 10000])
+def test_diff_with_few_changes(benchmark, num_classes):
+    """
+    Two large schemas that differ in a handful of classes: identical classes
+    are skipped without a structural walk.
+    """
+    current = make_schema(num_classes)
+    target = copy.deepcopy(current)
+    for class_definition in target["classes"][::1000]:
+        class_definition["properties"][0]["tokenization"] = "field"
+        class_definition["properties"].append({"name": "added", "dataType": ["int"]})
+
+    diff = benchmark(calculate_schema_diff, current, target)
+
+    assert len(diff["properties_to_add"]) == len(target["classes"][::1000])
+
+
+@pytest.mark.parametrize("num_classes", [1000, 10000])
+def test_diff_against_live_schema(benchmark, num_classes):
+    """
+    A target schema against the live schema it produced, which carries the
+    defaults Weaviate fills in: nothing has changed.
+    """
+    target = make_schema(num_classes)
+    current = copy.deepcopy(target)
+    for class_definition in current["classes"]:
+        class_definition.update(
+            vectorizer="none",
+            vectorIndexConfig={"distance": "cosine", "ef": -1, "efConstruction": 128, "maxConnections": 64},
+            invertedIndexConfig={"bm25": {"b": 0.75, "k1": 1.2}, "cleanupIntervalSeconds": 60},
+            shardingConfig={"desiredCount": 1, "virtualPerPhysical": 128},
+            replicationConfig={"factor": 1},
+        )
+        for property_definition in class_definition["properties"]:
+            property_definition.update(indexFilterable=True, indexSearchable=True, tokenization="word")
+
+    diff = benchmark(calculate_schema_diff, current, target)
+
+    assert not any(diff.values())
@@ -0,0 +1,83 @@
+import os
+import copy
+import functools
+import pytest
+from contextlib import redirect_stdout
+from unittest.mock import MagicMock
+from weaviate_migrate.commands.makemigrations import calculate_schema_diff, save_schema
+from weaviate_migrate.commands.migrate import apply_migration, load_migration
+from weaviate_migrate.planner import compile_plan
+from weaviate_migrate.schema_index import SchemaIndex
+from benchmarks.synthetic import additive_migration, generate_schema, mutate_schema
+
+pytest.importorskip("pytest_benchmark")
+
+# 50k classes take minutes per benchmark; opt in with the environment.
+SIZES = [10, 1000, 10000] + ([50000] if os.environ.get("WEAVIATE_MIGRATE_BENCH_LARGE") else [])
+MIGRATION_CLASSES = 50
+
+pytestmark = pytest.mark.benchmark(group="synthetic")
+
+
+@functools.lru_cache(maxsize=None)
+def schema(num_classes):
+    return generate_schema(num_classes)
+
+
+@pytest.mark.parametrize("num_classes", SIZES)
+def test_diff(benchmark, num_classes):
+    """
+    Diff a schema against a copy with 20 scattered changes.
+    """
+    current = schema(num_classes)
+    target = mutate_schema(current, 20)
+
+    diff = benchmark(calculate_schema_diff, current, target)
+
+    assert diff["classes_to_add"]
+
+
+@pytest.mark.parametrize("num_classes", SIZES)
+def test_plan(benchmark, num_classes):
+    """
+    Compile a migration that adds a property to MIGRATION_CLASSES existing
+    classes and creates as many new ones, against an indexed schema.
+    """
+    index = SchemaIndex(copy.deepcopy(schema(num_classes)))
+    migration = additive_migration(schema(num_classes), MIGRATION_CLASSES)
+
+    def setup():
+        return ([("0002_migration.json", copy.deepcopy(migration))], index), {}
+
+    benchmark.pedantic(compile_plan, setup=setup, rounds=20, warmup_rounds=2)
+
+
+@pytest.mark.parametrize("num_classes", SIZES)
+def test_apply_to_mock(benchmark, num_classes):
+    """
+    Apply a migration that adds a property to MIGRATION_CLASSES existing
+    classes and creates as many new ones to a mock client.
+    """
+    migration = additive_migration(schema(num_classes), MIGRATION_CLASSES)
+
+    def setup():
+        return (MagicMock(), migration, SchemaIndex(copy.deepcopy(schema(num_classes)))), {}
+
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        benchmark.pedantic(apply_migration, setup=setup, rounds=15, warmup_rounds=2)
+
+
+@pytest.mark.parametrize("num_classes", SIZES)
+def test_json_save_and_load(benchmark, num_classes, tmp_path):
+    """
+    Write a bootstrap migration of the whole schema and read it back.
+    """
+    path = str(tmp_path / "0001_migration.json")
+
+    def save_and_load():
+        save_schema(schema(num_classes), path)
+        return load_migration(path)
+
+    loaded = benchmark(save_and_load)
+
+    assert len(loaded["classes"]) == num_classes
@@ -26,12 +26,19 @@ setup(
         'docs': [
             'mkdocs',
         ],
+        'bench': [
+            'pytest-benchmark',
+        ],
     },
     entry_points={
         'console_scripts': [
             'weaviate-makemigrations=weaviate_migrate.commands.makemigrations:main',
-            'weaviate-migrate=weaviate_migrate.commands.migrate:main',
+            'weaviate-migrate=weaviate_migrate.cli:main',
+            'weaviate-migrate-fleet=weaviate_migrate.commands.fleet:main',
+            'weaviate-squashmigrations=weaviate_migrate.commands.squashmigrations:main',
+            'weaviate-manifest=weaviate_migrate.manifest:main',
             'weaviate-django-makemigrations=weaviate_migrate.commands.django_makemigrations:main',
+            'weaviate-django-sync=weaviate_migrate.commands.django_sync:main',
         ],
     },
     classifiers=[
@@ -41,10 +48,9 @@ setup(
         "Operating System :: OS Independent",
         "Programming Language :: Python",
         "Programming Language :: Python :: 3",
-        "Programming Language :: Python :: 3.6",
         "Programming Language :: Python :: 3.7",
         "Programming Language :: Python :: 3.8",
         "Programming Language :: Python :: 3.9",
     ],
-    python_requires='>=3.6',
+    python_requires='>=3.7',
 )
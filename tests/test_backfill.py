@@ -0,0 +1,99 @@
+import os
+import tempfile
+from unittest import TestCase
+from unittest.mock import MagicMock, call
+from weaviate_migrate.backfill import (
+    CheckpointStore,
+    DataMigrationError,
+    load_transform,
+    run_data_migration,
+)
+from weaviate_migrate.planner import compile_plan
+from weaviate_migrate.schema_index import SchemaIndex
+
+
+def add_slug(properties):
+    if properties.get("slug"):
+        return None
+    return dict(properties, slug=properties["title"].lower().replace(" ", "-"))
+
+
+def make_objects(start, count):
+    return [
+        {"id": f"uuid-{i}", "properties": {"title": f"Title {i}"}, "vector": [0.1, 0.2]}
+        for i in range(start, start + count)
+    ]
+
+
+class TestDataMigration(TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.checkpoints = CheckpointStore(os.path.join(self.temp_dir.name, "checkpoints.json"))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def make_client(self, pages, batch_results=None):
+        client = MagicMock()
+        client.data_object.get.side_effect = [{"objects": page} for page in pages]
+        responses = []
+        for results in batch_results or [[]] * len(pages):
+            response = MagicMock(status_code=200, content=b"[]")
+            response.json.return_value = results
+            responses.append(response)
+        client._connection.post.side_effect = responses
+        return client
+
+    def test_load_transform(self):
+        self.assertIs(load_transform("tests.test_backfill:add_slug"), add_slug)
+        with self.assertRaises(ValueError):
+            load_transform("tests.test_backfill")
+
+    def test_streams_transforms_and_writes_in_chunks(self):
+        client = self.make_client([make_objects(0, 2), make_objects(2, 1)])
+
+        stats = run_data_migration(client, "Article", add_slug, batch_size=2)
+
+        self.assertEqual((stats["read"], stats["written"]), (3, 3))
+        self.assertEqual(client.data_object.get.call_args_list, [
+            call(class_name="Article", limit=2, after=None, with_vector=True),
+            call(class_name="Article", limit=2, after="uuid-1", with_vector=True),
+        ])
+        self.assertEqual(client._connection.post.call_count, 2)
+        _, kwargs = client._connection.post.call_args_list[0]
+        self.assertEqual(kwargs["path"], "/batch/objects")
+        self.assertEqual(kwargs["weaviate_object"]["objects"][0], {
+            "class": "Article", "id": "uuid-0",
+            "properties": {"title": "Title 0", "slug": "title-0"}, "vector": [0.1, 0.2],
+        })
+
+    def test_resumes_from_checkpoint(self):
+        client = self.make_client(
+            [make_objects(0, 2), make_objects(2, 2)],
+            [[], [{"result": {"errors": {"error": ["boom"]}}}]]
+        )
+
+        with self.assertRaises(DataMigrationError):
+            run_data_migration(client, "Article", add_slug, 2, self.checkpoints, "key")
+        self.assertEqual(self.checkpoints.get("key"), "uuid-1")
+
+        client = self.make_client([make_objects(2, 1)])
+        stats = run_data_migration(client, "Article", add_slug, 2, self.checkpoints, "key")
+
+        client.data_object.get.assert_called_once_with(class_name="Article", limit=2, after="uuid-1", with_vector=True)
+        self.assertEqual(stats["read"], 1)
+        self.assertIsNone(self.checkpoints.get("key"))
+
+    def test_plan_runs_backfill_after_its_property(self):
+        index = SchemaIndex({"classes": [{"class": "Article", "properties": [{"name": "title", "dataType": ["text"]}]}]})
+        migrations = [("0002_migration.json", {
+            "classes": [{"class": "Article", "properties": [{"name": "slug", "dataType": ["text"]}]}],
+            "operations": [{"type": "data_migration", "class": "Article", "transform": "tests.test_backfill:add_slug"}],
+        })]
+
+        plan = compile_plan(migrations, index)
+
+        add_property, backfill = plan.operations
+        self.assertEqual(str(backfill), "data_migration Article (tests.test_backfill:add_slug)")
+        self.assertEqual(backfill.depends_on, [add_property])
@@ -0,0 +1,60 @@
+import os
+import sys
+import json
+import tempfile
+import subprocess
+from unittest import TestCase
+from weaviate_migrate.cli import main
+
+# Seconds the no-op path may spend importing and running, in a fresh
+# interpreter. Importing `weaviate` alone takes several times this.
+STARTUP_BUDGET = 0.3
+HEAVY_MODULES = ("weaviate", "django", "jsonschema")
+
+NOOP_SCRIPT = """
+import sys, time, json
+start = time.perf_counter()
+from weaviate_migrate.cli import main
+for argv in (["--help"], ["migrate", "--url", "http://localhost:8080", "--ledger", "local", "--folder", sys.argv[1]]):
+    try:
+        main(argv)
+    except SystemExit:
+        pass
+elapsed = time.perf_counter() - start
+print(json.dumps({"elapsed": elapsed, "modules": [m for m in sys.argv[2:] if m in sys.modules]}))
+"""
+
+
+class TestCli(TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.folder = self.temp_dir.name
+        with open(os.path.join(self.folder, "0001_migration.json"), "w") as f:
+            json.dump({"classes": []}, f)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_noop_path_stays_within_startup_budget(self):
+        with open(os.path.join(self.folder, ".weaviate_migrations.json"), "w") as f:
+            json.dump({"applied": {"0001_migration.json": {"checksum": None}}}, f)
+
+        output = subprocess.run(
+            [sys.executable, "-c", NOOP_SCRIPT, self.folder, *HEAVY_MODULES],
+            capture_output=True, text=True, check=True, cwd=os.path.dirname(os.path.dirname(__file__)),
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+
+        self.assertEqual(result["modules"], [])
+        self.assertLess(result["elapsed"], STARTUP_BUDGET)
+
+    def test_arguments_without_subcommand_go_to_migrate(self):
+        with self.assertRaises(SystemExit) as exit_info:
+            main(["--url", "http://localhost:8080", "--ledger", "local", "--folder", self.folder, "--check"])
+        # 0001_migration.json is pending in the empty local ledger.
+        self.assertEqual(exit_info.exception.code, 1)
+
+    def test_subcommand_dispatch(self):
+        main(["manifest", "--folder", self.folder])
+        self.assertTrue(os.path.exists(os.path.join(self.folder, "manifest.json")))
@@ -0,0 +1,108 @@
+import os
+import json
+import tempfile
+from unittest import TestCase
+from unittest.mock import MagicMock
+from django.db import models
+from weaviate_migrate.commands.django_makemigrations import (
+    ModelFingerprints, get_models, make_django_migrations, model_fingerprint, reference_definitions,
+)
+
+PREFIX = "Fingerprint"
+
+
+class FingerprintAuthor(models.Model):
+    name = models.CharField(max_length=100)
+
+    class Meta:
+        app_label = "tests"
+
+
+class FingerprintBook(models.Model):
+    title = models.CharField(max_length=100)
+    author = models.ForeignKey(FingerprintAuthor, on_delete=models.CASCADE)
+
+    class Meta:
+        app_label = "tests"
+
+
+def read_migration(folder, filename):
+    with open(os.path.join(folder, filename), "r") as f:
+        return json.load(f)
+
+
+class TestModelFingerprints(TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.folder = self.temp_dir.name
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def make(self, schema=None):
+        fetch_schema = MagicMock(return_value=schema or {"classes": []})
+        written = make_django_migrations(self.folder, fetch_schema, PREFIX, ["tests"])
+        return written, fetch_schema
+
+    def test_scopes_models_by_app_label(self):
+        self.assertEqual(get_models(PREFIX, ["tests"]), [FingerprintAuthor, FingerprintBook])
+        self.assertNotIn(FingerprintAuthor, get_models(app_labels=["auth"]))
+
+    def test_fingerprint_is_stable_and_per_model(self):
+        self.assertEqual(model_fingerprint(FingerprintBook), model_fingerprint(FingerprintBook))
+        self.assertNotEqual(model_fingerprint(FingerprintAuthor), model_fingerprint(FingerprintBook))
+
+    def test_relations_become_cross_references(self):
+        self.assertEqual(reference_definitions([FingerprintAuthor, FingerprintBook]), [{
+            "field_name": "author", "source_class": "FingerprintBook",
+            "target_class": "FingerprintAuthor", "cardinality": "toOne",
+        }])
+        # References to models that are not synced are left out.
+        self.assertEqual(reference_definitions([FingerprintBook]), [])
+
+    def test_unchanged_models_are_skipped(self):
+        written, _ = self.make()
+        self.assertTrue(written)
+        self.assertEqual(
+            read_migration(self.folder, "0001_migration.json")["classes_to_add"],
+            ["FingerprintAuthor", "FingerprintBook"],
+        )
+
+        written, fetch_schema = self.make()
+
+        self.assertFalse(written)
+        fetch_schema.assert_not_called()
+        self.assertFalse(os.path.exists(os.path.join(self.folder, "0002_migration.json")))
+
+    def test_only_changed_models_reach_the_diff(self):
+        self.make()
+        fingerprints = ModelFingerprints(self.folder)
+        fingerprints.entries["tests.FingerprintBook"]["fingerprint"] = "stale"
+        fingerprints.update({}, [])
+        live_schema = {"classes": [
+            # Differs from the model, but the model is unchanged and skipped.
+            {"class": "FingerprintAuthor", "properties": []},
+            {"class": "FingerprintBook", "properties": [
+                {"name": "pk", "type": "int"}, {"name": "author", "type": "cref"},
+            ]},
+        ]}
+
+        self.make(live_schema)
+
+        migration = read_migration(self.folder, "0002_migration.json")
+        self.assertEqual(migration["classes_to_add"], [])
+        self.assertEqual(migration["properties_to_add"], {"FingerprintBook": ["title"]})
+
+    def test_removed_models_are_dropped(self):
+        self.make()
+        fingerprints = ModelFingerprints(self.folder)
+        fingerprints.update({"tests.FingerprintGone": {
+            "fingerprint": "gone", "class": "FingerprintGone", "appLabel": "tests"
+        }}, [])
+
+        self.make({"classes": [{"class": "FingerprintGone", "properties": []}]})
+
+        migration = read_migration(self.folder, "0002_migration.json")
+        self.assertEqual(migration["classes_to_remove"], ["FingerprintGone"])
+        self.assertNotIn("tests.FingerprintGone", ModelFingerprints(self.folder).entries)
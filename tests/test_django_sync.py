@@ -0,0 +1,291 @@
+import os
+import datetime
+import tempfile
+import functools
+from decimal import Decimal
+from unittest import TestCase
+from django.db import connection, models
+from weaviate_migrate.commands.django_makemigrations import get_models
+from weaviate_migrate.commands.django_sync import (
+    FileSyncState, WeaviateSyncState, backfill_references, beacon, object_uuid, reconcile_deletions,
+    rows_to_objects, sync_fields, sync_models, to_weaviate_value,
+)
+from weaviate_migrate.standin import StandInClient, StandInServer
+
+ROWS = 1234
+
+
+class SyncArticle(models.Model):
+    title = models.CharField(max_length=100)
+    views = models.IntegerField()
+    price = models.DecimalField(max_digits=8, decimal_places=2)
+    published = models.DateTimeField(null=True)
+
+    class Meta:
+        app_label = "tests"
+
+
+class SyncNote(models.Model):
+    body = models.CharField(max_length=100)
+    updated_at = models.DateTimeField()
+
+    class Meta:
+        app_label = "tests"
+
+
+class RefAuthor(models.Model):
+    name = models.CharField(max_length=100)
+
+    class Meta:
+        app_label = "tests"
+
+
+class RefTag(models.Model):
+    name = models.CharField(max_length=100)
+
+    class Meta:
+        app_label = "tests"
+
+
+class RefBook(models.Model):
+    title = models.CharField(max_length=100)
+    author = models.ForeignKey(RefAuthor, null=True, on_delete=models.CASCADE)
+    tags = models.ManyToManyField(RefTag)
+
+    class Meta:
+        app_label = "tests"
+
+
+class TestDjangoSync(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        with connection.schema_editor() as editor:
+            editor.create_model(SyncArticle)
+        SyncArticle.objects.bulk_create(
+            SyncArticle(title=f"Article {i}", views=i, price=Decimal("1.50"), published=None)
+            for i in range(ROWS)
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        with connection.schema_editor() as editor:
+            editor.delete_model(SyncArticle)
+
+    def setUp(self):
+        self.server = StandInServer().start()
+        self.server.state.classes["SyncArticle"] = {"class": "SyncArticle", "properties": []}
+        self.server.state.objects["SyncArticle"] = {}
+        self.connect = functools.partial(StandInClient, self.server.url)
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_converts_rows_with_the_schema_types(self):
+        fields = sync_fields(SyncArticle)
+        self.assertEqual([(name, data_type) for name, _, data_type in fields], [
+            ("pk", "string"), ("title", "string"), ("views", "int"), ("price", "number"), ("published", "date"),
+        ])
+
+        published = datetime.datetime(2024, 5, 1, 12, 30)
+        [obj] = rows_to_objects("SyncArticle", "tests.SyncArticle", fields, 0,
+                                [(7, "Seven", 7, Decimal("2.25"), published)])
+
+        self.assertEqual(obj["id"], object_uuid("tests.SyncArticle", 7))
+        self.assertEqual(obj["properties"], {
+            "pk": "7", "title": "Seven", "views": 7, "price": 2.25, "published": "2024-05-01T12:30:00+00:00",
+        })
+        self.assertEqual(to_weaviate_value(datetime.date(2024, 5, 1), "date"), "2024-05-01T00:00:00+00:00")
+
+    def test_syncs_every_row_in_process(self):
+        stats = sync_models([SyncArticle], self.connect, workers=0, batch_size=100, chunk_size=250)
+
+        self.assertEqual(stats["tests.SyncArticle"]["rows"], ROWS)
+        self.assertEqual(len(self.server.state.objects["SyncArticle"]), ROWS)
+
+    def test_syncs_from_worker_processes_without_duplicates(self):
+        for _ in range(2):
+            stats = sync_models([SyncArticle], self.connect, workers=2, batch_size=100)
+
+        self.assertEqual(stats["tests.SyncArticle"]["rows"], ROWS)
+        objects = self.server.state.objects["SyncArticle"]
+        self.assertEqual(len(objects), ROWS)
+        first = SyncArticle.objects.order_by("pk").first()
+        self.assertEqual(objects[object_uuid("tests.SyncArticle", first.pk)]["properties"]["title"], first.title)
+
+
+class TestIncrementalSync(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        with connection.schema_editor() as editor:
+            editor.create_model(SyncNote)
+
+    @classmethod
+    def tearDownClass(cls):
+        with connection.schema_editor() as editor:
+            editor.delete_model(SyncNote)
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.state_store = FileSyncState(os.path.join(self.temp_dir.name, "state.json"))
+        self.server = StandInServer().start()
+        self.server.state.classes["SyncNote"] = {"class": "SyncNote", "properties": []}
+        self.server.state.objects["SyncNote"] = {}
+        self.connect = functools.partial(StandInClient, self.server.url)
+        # Many rows share a timestamp, and the timestamps have microseconds.
+        self.updated_at = datetime.datetime(2024, 5, 1, 12, 0, 0, 123456, tzinfo=datetime.timezone.utc)
+        SyncNote.objects.bulk_create(
+            SyncNote(body=f"Note {i}", updated_at=self.updated_at + datetime.timedelta(microseconds=i // 4))
+            for i in range(50)
+        )
+
+    def tearDown(self):
+        SyncNote.objects.all().delete()
+        self.server.stop()
+        self.temp_dir.cleanup()
+
+    def sync(self, **kwargs):
+        kwargs.setdefault("incremental", True)
+        kwargs.setdefault("state_store", self.state_store)
+        stats = sync_models([SyncNote], self.connect, batch_size=7, **kwargs)
+        return stats["tests.SyncNote"]
+
+    def test_syncs_only_new_rows_by_primary_key(self):
+        self.assertEqual(self.sync()["rows"], 50)
+        SyncNote.objects.create(body="New", updated_at=self.updated_at)
+
+        self.assertEqual(self.sync()["rows"], 1)
+        self.assertEqual(self.sync()["rows"], 0)
+        self.assertEqual(len(self.server.state.objects["SyncNote"]), 51)
+
+    def test_incremental_sync_from_worker_processes(self):
+        self.assertEqual(self.sync(workers=2, watermark_field="updated_at")["rows"], 50)
+        self.assertEqual(self.sync(workers=2, watermark_field="updated_at")["rows"], 0)
+        self.assertEqual(len(self.server.state.objects["SyncNote"]), 50)
+
+    def test_syncs_only_updated_rows_by_watermark_field(self):
+        self.assertEqual(self.sync(watermark_field="updated_at")["rows"], 50)
+        self.assertEqual(self.sync(watermark_field="updated_at")["rows"], 0)
+
+        note = SyncNote.objects.order_by("pk").first()
+        SyncNote.objects.filter(pk=note.pk).update(
+            body="Edited", updated_at=self.updated_at + datetime.timedelta(seconds=1)
+        )
+
+        self.assertEqual(self.sync(watermark_field="updated_at")["rows"], 1)
+        obj = self.server.state.objects["SyncNote"][object_uuid("tests.SyncNote", note.pk)]
+        self.assertEqual(obj["properties"]["body"], "Edited")
+
+    def test_reconcile_deletes_objects_of_deleted_rows(self):
+        self.sync(reconcile=True)
+        deleted_pks = list(SyncNote.objects.order_by("pk").values_list("pk", flat=True)[:3])
+        SyncNote.objects.filter(pk__in=deleted_pks).delete()
+        requests = self.server.state.requests
+
+        deleted = reconcile_deletions(SyncNote, self.connect())
+
+        self.assertEqual(deleted, 3)
+        self.assertEqual(len(self.server.state.objects["SyncNote"]), 47)
+        # One page lists the class and one batch request deletes the objects.
+        self.assertEqual(self.server.state.requests - requests, 2)
+        self.assertEqual(reconcile_deletions(SyncNote, self.connect()), 0)
+
+    def test_reconcile_deletes_rows_removed_between_runs(self):
+        self.sync(reconcile=True)
+        note = SyncNote.objects.create(body="Short-lived", updated_at=self.updated_at)
+        self.sync()
+        note.delete()
+
+        self.assertEqual(self.sync(reconcile=True)["deleted"], 1)
+        self.assertEqual(len(self.server.state.objects["SyncNote"]), 50)
+
+    def test_state_can_be_kept_in_weaviate(self):
+        state_store = WeaviateSyncState(self.connect())
+        state_store.ensure()
+        requests = self.server.state.requests
+        state_store.ensure()
+        # An existing class is looked up, not found in a full schema fetch.
+        self.assertEqual(self.server.state.requests - requests, 1)
+        self.assertIsNone(state_store.get("tests.SyncNote"))
+
+        self.sync(state_store=state_store)
+
+        self.assertEqual(state_store.get("tests.SyncNote")["field"], "id")
+        self.assertEqual(self.sync(state_store=state_store)["rows"], 0)
+
+
+class TestReferenceBackfill(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        with connection.schema_editor() as editor:
+            for model in (RefAuthor, RefTag, RefBook):
+                editor.create_model(model)
+
+    @classmethod
+    def tearDownClass(cls):
+        with connection.schema_editor() as editor:
+            for model in (RefBook, RefTag, RefAuthor):
+                editor.delete_model(model)
+
+    def setUp(self):
+        self.server = StandInServer().start()
+        for class_name in ("RefAuthor", "RefTag", "RefBook"):
+            self.server.state.classes[class_name] = {"class": class_name, "properties": []}
+            self.server.state.objects[class_name] = {}
+        self.connect = functools.partial(StandInClient, self.server.url)
+
+    def tearDown(self):
+        for model in (RefBook, RefTag, RefAuthor):
+            model.objects.all().delete()
+        self.server.stop()
+
+    def create_books(self):
+        authors = [RefAuthor.objects.create(name=f"Author {i}") for i in range(3)]
+        tags = [RefTag.objects.create(name=f"Tag {i}") for i in range(4)]
+        books = []
+        for i in range(10):
+            book = RefBook.objects.create(title=f"Book {i}", author=authors[i % 3] if i else None)
+            book.tags.set(tags[:i % 4])
+            books.append(book)
+        return authors, tags, books
+
+    def book(self, book):
+        return self.server.state.objects["RefBook"][object_uuid("tests.RefBook", book.pk)]["properties"]
+
+    def test_adds_foreign_key_and_many_to_many_references(self):
+        authors, tags, books = self.create_books()
+        models = get_models("Ref", ["tests"])
+        sync_models(models, self.connect)
+
+        # Foreign keys are written with the objects.
+        self.assertEqual(self.book(books[4])["author"], [{"beacon": beacon(RefAuthor, authors[1].pk)}])
+        self.assertNotIn("author", self.book(books[0]))
+        self.assertNotIn("tags", self.book(books[3]))
+
+        stats = backfill_references(models, self.connect(), workers=2, batch_size=3, chunk_size=4)
+
+        self.assertEqual(list(stats), ["tests.RefBook.tags"])
+        self.assertEqual(stats["tests.RefBook.tags"]["references"], sum(i % 4 for i in range(10)))
+        self.assertNotIn("tags", self.book(books[4]))
+        self.assertEqual(
+            sorted(b["beacon"] for b in self.book(books[3])["tags"]),
+            sorted(beacon(RefTag, tag.pk) for tag in tags[:3]),
+        )
+
+    def test_incremental_sync_keeps_backfilled_references(self):
+        with tempfile.TemporaryDirectory() as folder:
+            state_store = FileSyncState(os.path.join(folder, "state.json"))
+            authors, tags, books = self.create_books()
+            models = get_models("Ref", ["tests"])
+            sync_models(models, self.connect)
+            backfill_references(models, self.connect())
+
+            sync_models(models, self.connect, workers=2, state_store=state_store, incremental=True)
+
+        self.assertEqual(self.book(books[7])["author"], [{"beacon": beacon(RefAuthor, authors[1].pk)}])
+        self.assertEqual(
+            sorted(b["beacon"] for b in self.book(books[7])["tags"]),
+            sorted(beacon(RefTag, tag.pk) for tag in tags[:3]),
+        )
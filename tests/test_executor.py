@@ -0,0 +1,131 @@
+import threading
+from unittest import TestCase
+from unittest.mock import MagicMock
+from weaviate_migrate.executor import Executor, MigrationError, reference_targets
+from weaviate_migrate.planner import build_operations
+from weaviate_migrate.schema_index import SchemaIndex
+
+
+def keys(operations):
+    return [op.key for op in operations]
+
+
+class TestBuildOperations(TestCase):
+
+    def test_reference_targets(self):
+        self.assertEqual(reference_targets({"name": "p", "type": "cref", "refClass": "Target"}), {"Target"})
+        self.assertEqual(reference_targets({"name": "p", "dataType": ["Target"]}), {"Target"})
+        self.assertEqual(reference_targets({"name": "p", "dataType": ["text"]}), set())
+
+    def test_skips_existing_and_orders_dependencies(self):
+        index = SchemaIndex({"classes": [
+            {"class": "Existing", "properties": [{"name": "name", "dataType": ["text"]}]}
+        ]})
+        migrations = [
+            ("0001_migration.json", {"classes": [
+                {"class": "Article", "properties": [
+                    {"name": "title", "dataType": ["text"]},
+                    {"name": "author", "dataType": ["Author"]},
+                ]},
+                {"class": "Existing", "properties": [
+                    {"name": "name", "dataType": ["text"]},
+                    {"name": "article", "dataType": ["Article"]},
+                ]},
+            ]}),
+            ("0002_migration.json", {"classes": [
+                {"class": "Author", "properties": [{"name": "name", "dataType": ["text"]}]},
+                {"class": "Article", "properties": [{"name": "title", "dataType": ["text"]}]},
+            ]}),
+        ]
+
+        operations = build_operations(migrations, index)
+        by_key = {op.key: op for op in operations}
+
+        self.assertEqual(keys(operations), [
+            ("create_class", "Article"),
+            ("create_property", "Article", "author"),
+            ("create_property", "Existing", "article"),
+            ("create_class", "Author"),
+        ])
+        # The reference to a class created in a later file is split out of
+        # the class definition and waits for both ends.
+        self.assertEqual(by_key[("create_class", "Article")].definition["properties"], [
+            {"name": "title", "dataType": ["text"]}
+        ])
+        self.assertEqual(
+            set(by_key[("create_property", "Article", "author")].depends_on),
+            {by_key[("create_class", "Article")], by_key[("create_class", "Author")]}
+        )
+        self.assertEqual(
+            by_key[("create_property", "Existing", "article")].depends_on,
+            [by_key[("create_class", "Article")]]
+        )
+
+
+class TestExecutor(TestCase):
+
+    def setUp(self):
+        self.migrations = [
+            ("0001_migration.json", {"classes": [
+                {"class": "A", "properties": []},
+                {"class": "B", "properties": [{"name": "a", "dataType": ["A"]}]},
+                {"class": "C", "properties": []},
+            ]}),
+        ]
+
+    def test_runs_everything(self):
+        client = MagicMock()
+        index = SchemaIndex({"classes": []})
+        operations = build_operations(self.migrations, index)
+
+        report = Executor(client, index, concurrency=4).execute(operations)
+
+        self.assertEqual(len(report.succeeded), 3)
+        self.assertEqual(client.schema.create_class.call_count, 3)
+        client.schema.create_property.assert_not_called()
+        self.assertTrue(index.has_property("B", "a"))
+        self.assertTrue(report.migration_succeeded("0001_migration.json"))
+
+    def test_failure_skips_dependents_only(self):
+        client = MagicMock()
+
+        def create_class(definition):
+            if definition["class"] == "A":
+                raise Exception("boom")
+        client.schema.create_class.side_effect = create_class
+        index = SchemaIndex({"classes": []})
+        operations = build_operations(self.migrations, index)
+
+        report = Executor(client, index, concurrency=2).execute(operations)
+
+        self.assertEqual([str(r.operation) for r in report.failed], ["create_class A"])
+        self.assertEqual([str(r.operation) for r in report.skipped], ["create_class B"])
+        self.assertEqual([str(r.operation) for r in report.succeeded], ["create_class C"])
+        self.assertFalse(report.migration_succeeded("0001_migration.json"))
+        self.assertIn("create_class A", str(MigrationError(report)))
+
+    def test_concurrency_is_bounded(self):
+        lock = threading.Lock()
+        active = [0]
+        peak = [0]
+        barrier = threading.Event()
+
+        def create_class(definition):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            barrier.wait(0.01)
+            with lock:
+                active[0] -= 1
+
+        client = MagicMock()
+        client.schema.create_class.side_effect = create_class
+        index = SchemaIndex({"classes": []})
+        migrations = [("0001_migration.json", {"classes": [
+            {"class": f"Class{i}", "properties": []} for i in range(20)
+        ]})]
+
+        report = Executor(client, index, concurrency=3).execute(build_operations(migrations, index))
+
+        self.assertEqual(len(report.succeeded), 20)
+        self.assertLessEqual(peak[0], 3)
@@ -0,0 +1,104 @@
+import os
+import json
+import socket
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+from contextlib import redirect_stdout
+from weaviate_migrate.commands.fleet import apply_fleet, fleet_report, load_inventory, migrate_cluster
+from weaviate_migrate.executor import FAILED, SKIPPED, SUCCEEDED
+from weaviate_migrate.ledger import LEDGER_CLASS
+from weaviate_migrate.standin import StandInClient, StandInServer
+
+MIGRATION = {"classes": [{"class": "Article", "properties": [{"name": "title", "dataType": ["text"]}]}]}
+
+
+def connect_standin(url, api_key=None, max_retries=0, max_concurrency=1):
+    return StandInClient(url)
+
+
+def unused_url() -> str:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return f"http://127.0.0.1:{s.getsockname()[1]}"
+
+
+class TestFleet(TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.folder = self.temp_dir.name
+        with open(os.path.join(self.folder, "0001_migration.json"), "w") as f:
+            json.dump(MIGRATION, f)
+        self.servers = [StandInServer().start() for _ in range(3)]
+
+    def tearDown(self):
+        for server in self.servers:
+            server.stop()
+        self.temp_dir.cleanup()
+
+    def apply(self, clusters, **kwargs):
+        with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+            return apply_fleet(clusters, self.folder, connect=connect_standin, **kwargs)
+
+    def clusters(self):
+        return [{"name": f"cluster{i}", "url": server.url} for i, server in enumerate(self.servers)]
+
+    def test_all_clusters_are_migrated(self):
+        results = self.apply(self.clusters(), parallelism=3)
+        self.assertEqual([r["status"] for r in results], [SUCCEEDED] * 3)
+        self.assertEqual(results[0]["applied"], ["0001_migration.json"])
+        for server in self.servers:
+            self.assertEqual(sorted(server.state.classes), ["Article", LEDGER_CLASS])
+
+        results = self.apply(self.clusters())
+        self.assertEqual([r["applied"] for r in results], [[], [], []])
+
+    def test_a_failing_cluster_does_not_block_the_others(self):
+        clusters = self.clusters()
+        clusters.insert(1, {"name": "down", "url": unused_url()})
+        clusters.append({"name": "no-key", "url": self.servers[0].url, "api_key_env": "WEAVIATE_FLEET_TEST_KEY"})
+        with patch.dict(os.environ, {}, clear=False):
+            os.environ.pop("WEAVIATE_FLEET_TEST_KEY", None)
+            results = self.apply(clusters, parallelism=2)
+
+        self.assertEqual([r["status"] for r in results], [SUCCEEDED, FAILED, SUCCEEDED, SUCCEEDED, FAILED])
+        self.assertIn("WEAVIATE_FLEET_TEST_KEY", results[4]["error"])
+        report = fleet_report(results, 1.0)
+        self.assertEqual((report["succeeded"], report["failed"], report["skipped"]), (3, 2, 0))
+
+    def test_the_cached_schema_of_a_migrated_cluster_is_dropped(self):
+        down = {"name": "down", "url": unused_url()}
+        with patch("weaviate_migrate.commands.fleet.SchemaCache") as cache:
+            results = [migrate_cluster(cluster, self.folder, {}, connect_standin)
+                       for cluster in (self.clusters()[0], down)]
+            migrate_cluster(self.clusters()[1], self.folder, {"dry_run": True}, connect_standin)
+
+        self.assertEqual([r["status"] for r in results], [SUCCEEDED, FAILED])
+        self.assertEqual(
+            [c.args for c in cache.return_value.invalidate.call_args_list], [(self.servers[0].url,), (down["url"],)]
+        )
+
+    def test_failed_canary_stops_the_rollout(self):
+        clusters = [{"name": "canary", "url": unused_url(), "canary": True}] + self.clusters()
+        results = self.apply(clusters)
+        self.assertEqual([r["status"] for r in results], [FAILED, SKIPPED, SKIPPED, SKIPPED])
+        self.assertIn("canary", results[1]["error"])
+        for server in self.servers:
+            self.assertEqual(server.state.classes, {})
+
+    def test_canaries_named_on_the_command_line_override_the_inventory(self):
+        clusters = self.clusters() + [{"name": "down", "url": unused_url()}]
+        clusters[0]["canary"] = True
+        results = self.apply(clusters, canaries=["down"])
+        self.assertEqual([r["status"] for r in results], [SKIPPED, SKIPPED, SKIPPED, FAILED])
+
+    def test_inventory_validation(self):
+        path = os.path.join(self.folder, "inventory.json")
+        with open(path, "w") as f:
+            json.dump({"clusters": [{"name": "a", "url": "http://a"}, {"name": "a", "url": "http://b"}]}, f)
+        with self.assertRaises(ValueError):
+            load_inventory(path)
+        with open(path, "w") as f:
+            json.dump([{"name": "a", "url": "http://a", "canary": True}], f)
+        self.assertEqual(load_inventory(path)[0]["name"], "a")
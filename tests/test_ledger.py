@@ -0,0 +1,114 @@
+import os
+import json
+import tempfile
+from unittest import TestCase
+from unittest.mock import MagicMock
+from contextlib import redirect_stdout
+from weaviate_migrate.commands.migrate import migrate
+from weaviate_migrate.ledger import (
+    FileLedger,
+    WeaviateLedger,
+    LEDGER_CLASS,
+    is_up_to_date,
+    list_migration_files,
+    migration_checksum,
+)
+from weaviate_migrate.schema_index import SchemaIndex
+from weaviate_migrate.standin import StandInClient, StandInServer
+
+
+class TestLedger(TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.migration_folder = self.temp_dir.name
+        self.ledger_path = os.path.join(self.migration_folder, ".weaviate_migrations.json")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write_migration(self, filename, content):
+        path = os.path.join(self.migration_folder, filename)
+        with open(path, "w") as f:
+            json.dump(content, f)
+        return path
+
+    def test_list_migration_files(self):
+        self.write_migration("0010_later.json", {"classes": []})
+        self.write_migration("0002_migration.json", {"classes": []})
+        self.write_migration("notes.txt", {})
+        self.write_migration(".weaviate_migrations.json", {})
+
+        self.assertEqual(
+            list_migration_files(self.migration_folder),
+            ["0002_migration.json", "0010_later.json"]
+        )
+
+    def test_file_ledger_round_trip(self):
+        ledger = FileLedger(self.ledger_path)
+        self.assertEqual(ledger.applied(), {})
+
+        ledger.record("0001_migration.json", "abc")
+
+        self.assertEqual(FileLedger(self.ledger_path).applied(), {"0001_migration.json": "abc"})
+
+    def test_weaviate_ledger(self):
+        client = MagicMock()
+        client.data_object.get.return_value = {"objects": [
+            {"id": "1", "properties": {"name": "0001_migration.json", "checksum": "abc"}}
+        ]}
+        ledger = WeaviateLedger(client)
+
+        self.assertEqual(ledger.applied(), {"0001_migration.json": "abc"})
+        client.data_object.get.assert_called_once()
+
+        index = SchemaIndex({"classes": []})
+        ledger.ensure(index)
+        ledger.ensure(index)
+        client.schema.create_class.assert_called_once()
+        self.assertTrue(index.has_class(LEDGER_CLASS))
+
+        ledger.record("0002_migration.json", "def")
+        args, kwargs = client.data_object.create.call_args
+        self.assertEqual(args[0]["name"], "0002_migration.json")
+        self.assertEqual(kwargs["uuid"], ledger.object_uuid("0002_migration.json"))
+
+    def test_is_up_to_date(self):
+        self.write_migration("0001_migration.json", {"classes": []})
+        ledger = FileLedger(self.ledger_path)
+        self.assertFalse(is_up_to_date(ledger, self.migration_folder))
+
+        ledger.record("0001_migration.json", "abc")
+        self.assertTrue(is_up_to_date(ledger, self.migration_folder))
+
+    def test_fresh_cluster_is_not_up_to_date(self):
+        self.write_migration("0001_migration.json", {"classes": [{"class": "A", "properties": []}]})
+        with StandInServer() as server:
+            client = StandInClient(server.url)
+            ledger = WeaviateLedger(client)
+            self.assertFalse(ledger.exists())
+            requests = server.state.requests
+            self.assertFalse(is_up_to_date(ledger, self.migration_folder))
+            self.assertEqual(server.state.requests - requests, 1)
+
+            with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+                migrate(client, self.migration_folder, ledger)
+
+            self.assertTrue(ledger.exists())
+            self.assertTrue(is_up_to_date(ledger, self.migration_folder))
+            client.close()
+
+    def test_migrate_skips_applied(self):
+        self.write_migration("0001_migration.json", {"classes": [{"class": "A", "properties": []}]})
+        path = self.write_migration("0002_migration.json", {"classes": [{"class": "B", "properties": []}]})
+        ledger = FileLedger(self.ledger_path)
+        ledger.record("0001_migration.json", "abc")
+
+        client = MagicMock()
+        client.schema.get.return_value = {"classes": []}
+
+        migrate(client, self.migration_folder, ledger)
+
+        client.schema.create_class.assert_called_once_with({"class": "B", "properties": []})
+        self.assertEqual(ledger.applied()["0002_migration.json"], migration_checksum(path))
+        self.assertTrue(is_up_to_date(ledger, self.migration_folder))
@@ -0,0 +1,101 @@
+import os
+import json
+import tempfile
+from unittest import TestCase
+from unittest.mock import MagicMock
+from weaviate_migrate.commands.makemigrations import make_migrations, next_migration_number
+from weaviate_migrate.commands.migrate import migrate
+from weaviate_migrate.ledger import FileLedger, is_up_to_date, list_migration_files, migration_checksum
+from weaviate_migrate.manifest import MANIFEST_FILENAME, Manifest, ManifestError
+
+
+class TestManifest(TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.folder = self.temp_dir.name
+        self.write("0001_migration.json", {"classes": [{"class": "Article", "properties": []}]})
+        self.write("0002_migration.json", {"classes": [{"class": "Author", "properties": []}]})
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write(self, filename, content):
+        with open(os.path.join(self.folder, filename), "w") as f:
+            json.dump(content, f)
+
+    def make_client(self):
+        client = MagicMock()
+        client.schema.get.return_value = {"classes": []}
+        return client
+
+    def test_round_trip(self):
+        Manifest.build(self.folder).save(self.folder)
+
+        manifest = Manifest.load(self.folder)
+
+        self.assertEqual(manifest.filenames(), ["0001_migration.json", "0002_migration.json"])
+        self.assertEqual(manifest.entries[0]["id"], 1)
+        self.assertEqual(
+            manifest.checksum("0001_migration.json"),
+            migration_checksum(os.path.join(self.folder, "0001_migration.json"))
+        )
+        self.assertEqual(manifest.next_id(), 3)
+        self.assertEqual(manifest.verify(self.folder), [])
+
+    def test_listing_comes_from_manifest(self):
+        Manifest.build(self.folder).save(self.folder)
+        self.write("0004 stray copy.json", {})
+
+        self.assertEqual(list_migration_files(self.folder), ["0001_migration.json", "0002_migration.json"])
+
+    def test_unregistered_migration_is_rejected(self):
+        Manifest.build(self.folder).save(self.folder)
+        self.write("0003_unregistered.json", {"classes": [{"class": "Editor", "properties": []}]})
+
+        with self.assertRaises(ManifestError) as raised:
+            migrate(self.make_client(), self.folder)
+        self.assertIn("0003_unregistered.json is not in the manifest", str(raised.exception))
+        with self.assertRaises(ManifestError):
+            is_up_to_date(FileLedger(os.path.join(self.folder, ".weaviate_migrations.json")), self.folder)
+        self.assertEqual(
+            Manifest.load(self.folder).verify(self.folder),
+            ["0003_unregistered.json is not in the manifest."]
+        )
+
+    def test_tampered_file_is_rejected_before_it_is_applied(self):
+        Manifest.build(self.folder).save(self.folder)
+        self.write("0002_migration.json", {"classes": [{"class": "Editor", "properties": []}]})
+
+        with self.assertRaises(ManifestError):
+            migrate(self.make_client(), self.folder)
+        self.assertEqual(len(Manifest.load(self.folder).verify(self.folder)), 1)
+
+    def test_migrate_reads_only_pending_bodies(self):
+        Manifest.build(self.folder).save(self.folder)
+        ledger = FileLedger(os.path.join(self.folder, ".weaviate_migrations.json"))
+        ledger.record("0001_migration.json", Manifest.load(self.folder).checksum("0001_migration.json"))
+        # Unparseable, but already applied and therefore never opened.
+        with open(os.path.join(self.folder, "0001_migration.json"), "w") as f:
+            f.write("{")
+        client = self.make_client()
+
+        migrate(client, self.folder, ledger)
+
+        client.schema.create_class.assert_called_once_with({"class": "Author", "properties": []})
+        self.assertEqual(
+            ledger.applied()["0002_migration.json"],
+            Manifest.load(self.folder).checksum("0002_migration.json")
+        )
+
+    def test_make_migrations_registers_new_file(self):
+        with open(os.path.join(self.folder, "README.md"), "w") as f:
+            f.write("Stray files no longer break numbering.")
+
+        self.assertEqual(next_migration_number(self.folder), 3)
+        make_migrations(self.make_client(), self.folder, {"classes": [{"class": "Tag", "properties": []}]})
+
+        manifest = Manifest.load(self.folder)
+        self.assertEqual(manifest.filenames()[-1], "0003_migration.json")
+        self.assertEqual(manifest.verify(self.folder), [])
+        self.assertTrue(os.path.exists(os.path.join(self.folder, MANIFEST_FILENAME)))
@@ -1,9 +1,13 @@
 import os
 import json
 import tempfile
+from contextlib import redirect_stdout
 from unittest import TestCase
 from unittest.mock import MagicMock, patch
 from weaviate_migrate.commands.migrate import migrate, load_migration, apply_migration
+from weaviate_migrate.executor import MigrationError
+from weaviate_migrate.ledger import FileLedger
+from weaviate_migrate.schema_index import SchemaIndex
 
 
 class TestMigrate(TestCase):
@@ -56,7 +60,46 @@ class TestMigrate(TestCase):
         apply_migration(mock_client_instance, schema)
 
         mock_client_instance.schema.create_class.assert_called_once_with(schema["classes"][0])
-        mock_client_instance.schema.create_property.assert_called_once_with("TestClass", schema["classes"][0]["properties"][0])
+        # Properties are created together with their class.
+        mock_client_instance.schema.create_property.assert_not_called()
+
+    @patch("weaviate_migrate.commands.migrate.Client")
+    def test_apply_migration_adds_property_to_existing_class(self, mock_client):
+        new_property = {"name": "title", "dataType": ["string"]}
+        schema = {
+            "classes": [
+                {"class": "Article", "properties": [new_property]}
+            ]
+        }
+
+        mock_client_instance = MagicMock()
+        mock_client.return_value = mock_client_instance
+        mock_client_instance.schema.get.return_value = {
+            "classes": [
+                {"class": "Article", "properties": []},
+                # A property of the same name on another class must not
+                # prevent creating it on Article.
+                {"class": "Book", "properties": [{"name": "title", "dataType": ["string"]}]},
+            ]
+        }
+
+        apply_migration(mock_client_instance, schema)
+
+        mock_client_instance.schema.create_class.assert_not_called()
+        mock_client_instance.schema.create_property.assert_called_once_with("Article", new_property)
+
+    def test_apply_migration_deletes_the_class_behind_an_alias(self):
+        client = MagicMock()
+        client._connection.delete.return_value = MagicMock(status_code=204, content=b"")
+        index = SchemaIndex({"classes": [{"class": "Article_v2", "properties": []}]})
+        index.aliases["Article"] = "Article_v2"
+
+        with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+            apply_migration(client, {"classes": [], "operations": [{"type": "delete_class", "class": "Article"}]},
+                            index)
+
+        client.schema.delete_class.assert_called_once_with("Article_v2")
+        client._connection.delete.assert_called_once_with(path="/aliases/Article")
 
     @patch("weaviate_migrate.commands.migrate.Client")
     def test_migrate(self, mock_client):
@@ -71,4 +114,105 @@ class TestMigrate(TestCase):
 
         mock_client_instance.schema.get.assert_called_once()
         mock_client_instance.schema.create_class.assert_not_called()
-        mock_client_instance.schema.create_property.assert_not_called()
\ No newline at end of file
+        mock_client_instance.schema.create_property.assert_not_called()
+
+class TestMigrateSchemaFetches(TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.migration_folder = self.temp_dir.name
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write_migration(self, filename, content):
+        with open(os.path.join(self.migration_folder, filename), "w") as f:
+            json.dump(content, f)
+
+    def test_migrate_fetches_schema_once(self):
+        self.write_migration("0001_migration.json", {"classes": [{"class": "A", "properties": []}]})
+        self.write_migration("0002_migration.json", {"classes": [{"class": "B", "properties": []}]})
+        self.write_migration("0003_migration.json", {"classes": [
+            {"class": "A", "properties": [{"name": "title", "dataType": ["text"]}]}
+        ]})
+
+        client = MagicMock()
+        client.schema.get.return_value = {"classes": []}
+
+        index = migrate(client, self.migration_folder)
+
+        client.schema.get.assert_called_once()
+        self.assertEqual(index.fetch_count, 1)
+        self.assertEqual(client.schema.create_class.call_count, 2)
+        # The property added by 0003 is folded into the creation of A.
+        client.schema.create_property.assert_not_called()
+        self.assertTrue(index.has_property("A", "title"))
+
+    def test_conflict_triggers_refetch(self):
+        conflict = Exception("class already exists")
+        conflict.status_code = 422
+        existing = {"class": "A", "properties": []}
+        self.write_migration("0001_migration.json", {"classes": [existing]})
+
+        client = MagicMock()
+        client.schema.get.side_effect = [{"classes": []}, {"classes": [existing]}]
+        client.schema.create_class.side_effect = conflict
+
+        index = migrate(client, self.migration_folder)
+
+        self.assertEqual(index.fetch_count, 2)
+        self.assertTrue(index.has_class("A"))
+
+    def test_other_errors_are_raised(self):
+        error = Exception("unauthorized")
+        error.status_code = 401
+        self.write_migration("0001_migration.json", {"classes": [{"class": "A", "properties": []}]})
+
+        client = MagicMock()
+        client.schema.get.return_value = {"classes": []}
+        client.schema.create_class.side_effect = error
+
+        with self.assertRaises(Exception):
+            migrate(client, self.migration_folder)
+        client.schema.get.assert_called_once()
+
+    def test_migrate_concurrently(self):
+        self.write_migration("0001_migration.json", {"classes": [{"class": "A", "properties": []}]})
+        self.write_migration("0002_migration.json", {"classes": [
+            {"class": "B", "properties": [{"name": "a", "dataType": ["A"]}]}
+        ]})
+
+        client = MagicMock()
+        client.schema.get.return_value = {"classes": []}
+
+        index = migrate(client, self.migration_folder, concurrency=4)
+
+        self.assertEqual(index.fetch_count, 1)
+        self.assertEqual(client.schema.create_class.call_count, 2)
+        self.assertTrue(index.has_property("B", "a"))
+
+    def test_failed_fold_keeps_every_folded_file_pending(self):
+        error = Exception("internal error")
+        error.status_code = 500
+        self.write_migration("0001_migration.json", {"classes": [{"class": "A", "properties": []}]})
+        self.write_migration("0002_migration.json", {"classes": [{"class": "B", "properties": []}]})
+        self.write_migration("0003_migration.json", {"classes": [
+            {"class": "A", "properties": [{"name": "title", "dataType": ["text"]}]}
+        ]})
+        ledger = FileLedger(os.path.join(self.migration_folder, ".weaviate_migrations.json"))
+
+        client = MagicMock()
+        client.schema.get.return_value = {"classes": []}
+
+        def create_class(class_definition):
+            if class_definition["class"] == "A":
+                raise error
+
+        client.schema.create_class.side_effect = create_class
+
+        with open(os.devnull, "w") as devnull, redirect_stdout(devnull), self.assertRaises(MigrationError):
+            migrate(client, self.migration_folder, ledger)
+
+        # 0003 was folded into the failed creation of A, and 0002 comes
+        # after the failed 0001: none of them is recorded.
+        self.assertEqual(ledger.applied(), {})
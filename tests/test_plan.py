@@ -0,0 +1,119 @@
+import os
+import json
+import tempfile
+from unittest import TestCase
+from contextlib import redirect_stdout
+from weaviate_migrate import telemetry
+from weaviate_migrate.commands.migrate import migrate
+from weaviate_migrate.commands.plan import describe, plan_costs, violations
+from weaviate_migrate.cost import COPY, METADATA, REINDEX, Throughput, fetch_class_stats, format_duration
+from weaviate_migrate.rest import batch_objects
+from weaviate_migrate.standin import StandInClient, StandInServer
+
+ARTICLE = {
+    "class": "Article", "shardingConfig": {"desiredCount": 3},
+    "properties": [{"name": "title", "dataType": ["text"]}],
+}
+
+
+def articles(count):
+    return [
+        {"class": "Article", "id": f"{i:08d}-0000-0000-0000-000000000000", "properties": {"title": f"Title {i}"}}
+        for i in range(count)
+    ]
+
+
+class TestPlanCosts(TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.folder = self.temp_dir.name
+        self.server = StandInServer().start()
+        self.client = StandInClient(self.server.url)
+        self.client.schema.create_class(ARTICLE)
+        batch_objects(self.client, articles(500))
+        self.write_migration("0001_migration.json", {
+            "classes": [
+                {"class": "Article", "properties": [{"name": "slug", "dataType": ["text"]}]},
+                {"class": "Author", "properties": [{"name": "name", "dataType": ["text"]}]},
+            ],
+            "operations": [{"type": "data_migration", "class": "Article", "transform": "tests.test_backfill:add_slug"}],
+        })
+        self.write_migration("0002_migration.json", {"operations": [
+            {"type": "rebuild_class", "class": "Article", "definition": {"properties": [
+                {"name": "title", "dataType": ["text"]}, {"name": "slug", "dataType": ["text"]},
+            ]}},
+        ]})
+
+    def tearDown(self):
+        self.client.close()
+        self.server.stop()
+        self.temp_dir.cleanup()
+
+    def write_migration(self, filename, content):
+        with open(os.path.join(self.folder, filename), "w") as f:
+            json.dump(content, f)
+
+    def test_operations_are_classified_and_estimated(self):
+        throughput = Throughput(call_seconds=0.1, reindex_rate=100, copy_rate=50)
+        report = plan_costs(self.client, self.folder, throughput=throughput)
+        costs = {entry["operation"]: entry for entry in report["operations"]}
+
+        self.assertEqual(costs["create_class Author"]["cost"], METADATA)
+        self.assertEqual(costs["create_property Article.slug"]["cost"], METADATA)
+        reindex = costs["data_migration Article (tests.test_backfill:add_slug)"]
+        self.assertEqual((reindex["cost"], reindex["objects"], reindex["shards"]), (REINDEX, 500, 3))
+        self.assertAlmostEqual(reindex["seconds"], 5.1)
+        copy = costs["rebuild_class Article"]
+        self.assertEqual((copy["cost"], copy["objects"]), (COPY, 500))
+        self.assertAlmostEqual(copy["seconds"], 10.5)
+        self.assertEqual(report["costs"], {METADATA: 2, REINDEX: 1, COPY: 1})
+        self.assertAlmostEqual(report["seconds"], 15.8)
+        self.assertIn("data copy, 500 objects in 3 shard(s), ~10s", describe(report))
+        # Planning changes nothing.
+        self.assertEqual(sorted(self.server.state.classes), ["Article"])
+
+    def test_limits(self):
+        report = plan_costs(self.client, self.folder, throughput=Throughput(reindex_rate=100, copy_rate=50))
+        self.assertEqual(violations(report, max_cost=COPY, max_seconds=60), [])
+        self.assertEqual(violations(report, max_cost=REINDEX), ["rebuild_class Article requires a data copy"])
+        self.assertEqual(len(violations(report, max_cost=METADATA)), 2)
+        self.assertEqual(len(violations(report, max_seconds=10)), 1)
+
+    def test_unknown_object_counts(self):
+        self.client.schema.create_class({"class": "Document", "multiTenancyConfig": {"enabled": True}})
+        self.write_migration("0003_migration.json", {"operations": [
+            {"type": "data_migration", "class": "Document", "transform": "tests.test_backfill:add_slug"},
+        ]})
+        report = plan_costs(self.client, self.folder)
+        self.assertIsNone(report["operations"][-1]["objects"])
+        self.assertIsNone(report["seconds"])
+        self.assertEqual(violations(report, max_seconds=3600), ["The duration of the plan is unknown"])
+
+    def test_class_stats_are_fetched_concurrently(self):
+        for i in range(5):
+            self.client.schema.create_class({"class": f"Class{i}", "properties": []})
+        stats = fetch_class_stats(self.client, [f"Class{i}" for i in range(5)] + ["Article"], concurrency=4)
+        self.assertEqual(stats["Article"]["objects"], 500)
+        self.assertEqual(len(stats["Article"]["shards"]), 3)
+        self.assertEqual(stats["Class0"]["objects"], 0)
+
+    def test_rates_are_measured_by_a_traced_run(self):
+        tracer = telemetry.Tracer("migrate")
+        with telemetry.activate(tracer), open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+            os.remove(os.path.join(self.folder, "0002_migration.json"))
+            migrate(self.client, self.folder)
+        throughput = Throughput.from_report(tracer.report())
+        self.assertEqual(throughput.measured, {"call_seconds", "reindex_rate"})
+        self.assertEqual(throughput.source("copy_rate"), "default")
+        self.assertGreater(throughput.reindex_rate, 0)
+
+
+class TestFormatDuration(TestCase):
+
+    def test_format_duration(self):
+        self.assertEqual(format_duration(None), "unknown")
+        self.assertEqual(format_duration(0.2), "<1s")
+        self.assertEqual(format_duration(42), "42s")
+        self.assertEqual(format_duration(200), "3m 20s")
+        self.assertEqual(format_duration(50_000_000 / 1000), "13h 53m")
@@ -0,0 +1,97 @@
+from unittest import TestCase
+from weaviate_migrate.planner import compile_plan
+from weaviate_migrate.schema_index import SchemaIndex
+
+
+def text(name):
+    return {"name": name, "dataType": ["text"]}
+
+
+class TestCompilePlan(TestCase):
+
+    def test_folds_property_adds_into_class_creation(self):
+        migrations = [("0003_migration.json", {"classes": [{"class": "Article", "properties": [text("title")]}]})]
+        for number, name in enumerate(["a", "b", "c", "d", "e"], 4):
+            migrations.append((f"{number:04d}_migration.json", {"classes": [
+                {"class": "Article", "properties": [text(name)]}
+            ]}))
+
+        plan = compile_plan(migrations, SchemaIndex({"classes": []}))
+
+        self.assertEqual(len(plan.operations), 1)
+        self.assertEqual(
+            [p["name"] for p in plan.operations[0].definition["properties"]],
+            ["title", "a", "b", "c", "d", "e"]
+        )
+        self.assertEqual(plan.naive_calls, 6)
+        self.assertEqual(plan.saved_calls, 5)
+        self.assertEqual(plan.folded, 5)
+        self.assertEqual(plan.operations[0].migrations, {name for name, _ in migrations})
+
+    def test_cancels_class_created_then_deleted(self):
+        migrations = [
+            ("0001_migration.json", {"classes": [{"class": "Temp", "properties": [text("x")]}]}),
+            ("0002_migration.json", {"classes": [{"class": "Temp", "properties": [text("y")]}]}),
+            ("0003_migration.json", {"classes": [], "operations": [{"type": "delete_class", "class": "Temp"}]}),
+        ]
+
+        plan = compile_plan(migrations, SchemaIndex({"classes": []}))
+
+        self.assertEqual(plan.operations, [])
+        self.assertEqual(plan.naive_calls, 3)
+        self.assertEqual(plan.saved_calls, 3)
+
+    def test_delete_of_existing_class_drops_pending_property_adds(self):
+        index = SchemaIndex({"classes": [{"class": "Old", "properties": []}]})
+        migrations = [
+            ("0001_migration.json", {"classes": [{"class": "Old", "properties": [text("x")]}]}),
+            ("0002_migration.json", {"operations": [{"type": "delete_class", "class": "Old"}]}),
+            ("0003_migration.json", {"classes": [{"class": "Old", "properties": [text("y")]}]}),
+        ]
+
+        plan = compile_plan(migrations, index)
+
+        self.assertEqual([str(op) for op in plan.operations], ["delete_class Old", "create_class Old"])
+        self.assertEqual(plan.operations[1].depends_on, [plan.operations[0]])
+        self.assertEqual(plan.saved_calls, 1)
+
+    def test_drops_repeated_no_ops(self):
+        index = SchemaIndex({"classes": [{"class": "City", "properties": [text("name")]}]})
+        migrations = [
+            ("0001_migration.json", {"classes": [{"class": "City", "properties": [text("name"), text("zip")]}]}),
+            ("0002_migration.json", {"classes": [{"class": "City", "properties": [text("zip")]}]}),
+            ("0003_migration.json", {"operations": [{"type": "delete_class", "class": "Gone"}]}),
+        ]
+
+        plan = compile_plan(migrations, index)
+
+        self.assertEqual([str(op) for op in plan.operations], ["create_property City.zip"])
+        self.assertEqual(plan.deduplicated, 5)
+
+    def test_describe(self):
+        migrations = [("0001_migration.json", {"classes": [
+            {"class": "Author", "properties": [text("name")]},
+            {"class": "Book", "properties": [{"name": "writtenBy", "dataType": ["Author"]}]},
+        ]})]
+
+        description = compile_plan(migrations, SchemaIndex({"classes": []})).describe()
+
+        self.assertIn("1. [0001_migration.json] create_class Author (1 properties)", description)
+        self.assertIn("2. [0001_migration.json] create_class Book (1 properties) after 1", description)
+        self.assertIn("2 remote calls instead of 2", description)
+
+    def test_forward_references_stay_separate(self):
+        migrations = [("0001_migration.json", {"classes": [
+            {"class": "A", "properties": [{"name": "b", "dataType": ["B"]}]},
+            {"class": "B", "properties": [{"name": "a", "dataType": ["A"]}]},
+        ]})]
+
+        plan = compile_plan(migrations, SchemaIndex({"classes": []}))
+
+        self.assertEqual(
+            [str(op) for op in plan.operations],
+            ["create_class A", "create_property A.b", "create_class B"]
+        )
+        create_a, create_ab, create_b = plan.operations
+        self.assertEqual(create_b.depends_on, [create_a])
+        self.assertEqual(set(create_ab.depends_on), {create_a, create_b})
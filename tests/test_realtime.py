@@ -0,0 +1,181 @@
+import time
+import functools
+from unittest import TestCase
+from django.db import connection, models
+from django.test.utils import CaptureQueriesContext
+from weaviate_migrate.commands.django_sync import beacon, object_uuid
+from weaviate_migrate.realtime.queue import DELETE, SyncQueue
+from weaviate_migrate.realtime.signals import connect_signals, disconnect_signals, resolve_queued
+from weaviate_migrate.standin import StandInClient, StandInServer
+
+
+class RealtimeTag(models.Model):
+    name = models.CharField(max_length=100)
+
+    class Meta:
+        app_label = "tests"
+
+
+class RealtimeItem(models.Model):
+    name = models.CharField(max_length=100)
+    tags = models.ManyToManyField(RealtimeTag)
+
+    class Meta:
+        app_label = "tests"
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("Condition not met in time")
+        time.sleep(0.005)
+
+
+def item(object_id, name="x"):
+    return {"class": "RealtimeItem", "id": object_id, "properties": {"name": name}}
+
+
+class TestSyncQueue(TestCase):
+
+    def setUp(self):
+        self.server = StandInServer().start()
+        self.server.state.classes["RealtimeItem"] = {"class": "RealtimeItem", "properties": []}
+        self.server.state.objects["RealtimeItem"] = {}
+        self.objects = self.server.state.objects["RealtimeItem"]
+        self.queue = None
+
+    def tearDown(self):
+        if self.queue is not None:
+            self.queue.close()
+        self.server.stop()
+
+    def make_queue(self, **kwargs):
+        self.queue = SyncQueue(functools.partial(StandInClient, self.server.url), **kwargs).start()
+        return self.queue
+
+    def test_coalesces_writes_to_the_same_object(self):
+        queue = self.make_queue(flush_interval=60)
+        object_id = object_uuid("tests.RealtimeItem", 1)
+        for i in range(5):
+            queue.put("RealtimeItem", object_id, obj=item(object_id, f"v{i}"))
+
+        self.assertTrue(queue.flush(timeout=2))
+
+        self.assertEqual(queue.stats["written"], 1)
+        self.assertEqual(queue.stats["coalesced"], 4)
+        self.assertEqual(self.objects[object_id]["properties"]["name"], "v4")
+
+        queue.put("RealtimeItem", object_id, DELETE)
+        queue.flush(timeout=2)
+        self.assertNotIn(object_id, self.objects)
+
+    def test_flushes_by_size_and_by_time(self):
+        queue = self.make_queue(batch_size=3, flush_interval=60)
+        for pk in range(3):
+            object_id = object_uuid("tests.RealtimeItem", pk)
+            queue.put("RealtimeItem", object_id, obj=item(object_id))
+        wait_for(lambda: queue.stats["written"] == 3)
+
+        queue.flush_interval = 0.05
+        object_id = object_uuid("tests.RealtimeItem", 3)
+        queue.put("RealtimeItem", object_id, obj=item(object_id))
+        wait_for(lambda: queue.stats["written"] == 4)
+
+    def test_drops_writes_beyond_the_bound(self):
+        queue = SyncQueue(functools.partial(StandInClient, self.server.url), max_pending=2)
+        ids = [object_uuid("tests.RealtimeItem", pk) for pk in range(3)]
+
+        self.assertTrue(queue.put("RealtimeItem", ids[0], obj=item(ids[0])))
+        self.assertTrue(queue.put("RealtimeItem", ids[1], obj=item(ids[1])))
+        self.assertFalse(queue.put("RealtimeItem", ids[2], obj=item(ids[2])))
+        # Writes to pending objects are coalesced, not dropped.
+        self.assertTrue(queue.put("RealtimeItem", ids[0], obj=item(ids[0], "y")))
+        self.assertEqual(queue.stats["dropped"], 1)
+        self.assertEqual(len(queue), 2)
+
+    def test_put_does_not_wait_for_a_slow_server(self):
+        self.server.latency = 0.1
+        queue = self.make_queue(batch_size=10, max_pending=20)
+
+        start = time.perf_counter()
+        for pk in range(1000):
+            object_id = object_uuid("tests.RealtimeItem", pk)
+            queue.put("RealtimeItem", object_id, obj=item(object_id))
+        elapsed = time.perf_counter() - start
+
+        self.assertLess(elapsed, 0.1)
+        self.assertLessEqual(len(queue), 20 + 10)
+        self.assertGreater(queue.stats["dropped"], 0)
+
+
+class TestSignals(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        with connection.schema_editor() as editor:
+            editor.create_model(RealtimeTag)
+            editor.create_model(RealtimeItem)
+
+    @classmethod
+    def tearDownClass(cls):
+        with connection.schema_editor() as editor:
+            editor.delete_model(RealtimeItem)
+            editor.delete_model(RealtimeTag)
+
+    def setUp(self):
+        self.server = StandInServer().start()
+        for class_name in ("RealtimeTag", "RealtimeItem"):
+            self.server.state.classes[class_name] = {"class": class_name, "properties": []}
+            self.server.state.objects[class_name] = {}
+        self.queue = SyncQueue(
+            functools.partial(StandInClient, self.server.url), flush_interval=60, resolve=resolve_queued
+        ).start()
+        self.models = connect_signals({"MODEL_PREFIX": "Realtime", "APP_LABELS": ["tests"]}, queue=self.queue)
+
+    def tearDown(self):
+        disconnect_signals()
+        RealtimeItem.objects.all().delete()
+        RealtimeTag.objects.all().delete()
+        self.server.stop()
+
+    def test_saves_and_deletes_are_synced(self):
+        self.assertEqual(set(self.models), {RealtimeTag, RealtimeItem})
+        instance = RealtimeItem.objects.create(name="first")
+        for name in ("second", "third"):
+            instance.name = name
+            with CaptureQueriesContext(connection) as queries:
+                instance.save()
+            # The row and its relations are read by the queue's thread.
+            self.assertEqual(len(queries), 1)
+        self.queue.flush(timeout=2)
+
+        object_id = object_uuid("tests.RealtimeItem", instance.pk)
+        objects = self.server.state.objects["RealtimeItem"]
+        self.assertEqual(objects[object_id]["properties"]["name"], "third")
+        self.assertEqual(self.queue.stats["written"], 1)
+
+        instance.delete()
+        self.queue.flush(timeout=2)
+        self.assertNotIn(object_id, objects)
+
+    def test_many_to_many_changes_are_synced(self):
+        tags = [RealtimeTag.objects.create(name=name) for name in ("a", "b")]
+        instance = RealtimeItem.objects.create(name="item")
+        objects = self.server.state.objects["RealtimeItem"]
+        object_id = object_uuid("tests.RealtimeItem", instance.pk)
+
+        instance.tags.add(*tags)
+        self.queue.flush(timeout=2)
+        self.assertEqual(
+            sorted(b["beacon"] for b in objects[object_id]["properties"]["tags"]),
+            sorted(beacon(RealtimeTag, tag.pk) for tag in tags),
+        )
+
+        tags[0].realtimeitem_set.remove(instance)
+        self.queue.flush(timeout=2)
+        self.assertEqual(objects[object_id]["properties"]["tags"], [{"beacon": beacon(RealtimeTag, tags[1].pk)}])
+
+        tags[1].realtimeitem_set.clear()
+        self.queue.flush(timeout=2)
+        self.assertEqual(objects[object_id]["properties"]["tags"], [])
@@ -0,0 +1,142 @@
+from unittest import TestCase
+from unittest.mock import MagicMock
+from weaviate_migrate.planner import compile_plan
+from weaviate_migrate.rebuild import RebuildError, rebuild_class, shadow_class_name
+from weaviate_migrate.schema_index import SchemaIndex
+
+DEFINITION = {"class": "Article", "properties": [{"name": "wordCount", "dataType": ["int"]}]}
+
+
+def response(status_code, body=None):
+    result = MagicMock(status_code=status_code, content=b"{}" if body is not None else b"")
+    result.json.return_value = body
+    return result
+
+
+def make_client(objects, source_count, target_count, alias=None, supports_aliases=True):
+    client = MagicMock()
+    client.data_object.get.side_effect = [{"objects": objects}]
+    alias_response = response(200, {"alias": "Article", "class": alias}) if alias else response(404)
+    aliases_response = response(200, {"aliases": []}) if supports_aliases else response(404)
+    client._connection.get.side_effect = lambda path: aliases_response if path == "/aliases" else alias_response
+    client._connection.post.return_value = response(200, [])
+    client._connection.put.return_value = response(200, {})
+    counts = iter([source_count, target_count])
+    client.query.aggregate.side_effect = lambda name: MagicMock(**{
+        "with_meta_count.return_value.do.return_value": {
+            "data": {"Aggregate": {name: [{"meta": {"count": next(counts)}}]}}
+        }
+    })
+    return client
+
+
+class TestShadowClassName(TestCase):
+
+    def test_versions(self):
+        self.assertEqual(shadow_class_name("Article", "Article"), "Article_v2")
+        self.assertEqual(shadow_class_name("Article", "Article_v2"), "Article_v3")
+        self.assertEqual(shadow_class_name("Article", "Other_v7"), "Article_v2")
+
+
+class TestRebuildClass(TestCase):
+
+    def test_copies_with_vectors_and_swaps_alias(self):
+        objects = [{"id": "uuid-1", "properties": {"wordCount": 3, "old": "x"}, "vector": [0.1]}]
+        client = make_client(objects, 1, 1)
+
+        stats = rebuild_class(client, "Article", DEFINITION, batch_size=10, workers=2)
+
+        client.schema.create_class.assert_called_once_with(dict(DEFINITION, **{"class": "Article_v2"}))
+        batch_call, alias_call = client._connection.post.call_args_list
+        self.assertEqual(batch_call.kwargs["weaviate_object"], {"objects": [
+            {"class": "Article_v2", "id": "uuid-1", "properties": {"wordCount": 3}, "vector": [0.1]}
+        ]})
+        self.assertEqual(alias_call.kwargs["weaviate_object"], {"alias": "Article", "class": "Article_v2"})
+        client.schema.delete_class.assert_called_once_with("Article")
+        self.assertEqual((stats["shadow"], stats["copied"]), ("Article_v2", 1))
+
+    def test_old_class_is_dropped_after_the_copy_is_verified(self):
+        client = make_client([{"id": "uuid-1", "properties": {}}], 1, 1)
+
+        rebuild_class(client, "Article", DEFINITION)
+
+        calls = [c[0] for c in client.mock_calls if "()" not in c[0]]
+        order = [calls.index(name) for name in (
+            "schema.create_class", "_connection.post", "query.aggregate", "schema.delete_class",
+        )]
+        self.assertEqual(order, sorted(order))
+        # The alias is created right after the drop frees its name.
+        self.assertEqual(calls[calls.index("schema.delete_class") + 1], "_connection.get")
+        self.assertEqual(calls[-1], "_connection.post")
+
+    def test_server_without_aliases_is_refused_before_anything_changes(self):
+        client = make_client([{"id": "uuid-1", "properties": {}}], 1, 1, supports_aliases=False)
+
+        with self.assertRaises(RebuildError):
+            rebuild_class(client, "Article", DEFINITION)
+
+        client.schema.create_class.assert_not_called()
+        client.schema.delete_class.assert_not_called()
+        client._connection.post.assert_not_called()
+
+    def test_failed_alias_names_the_shadow_holding_the_data(self):
+        client = make_client([{"id": "uuid-1", "properties": {}}], 1, 1)
+        client._connection.post.side_effect = [response(200, []), response(500, {"error": "boom"})]
+
+        with self.assertRaises(RebuildError) as raised:
+            rebuild_class(client, "Article", DEFINITION)
+
+        self.assertIn("Article_v2", str(raised.exception))
+        # The verified copy is kept.
+        client.schema.delete_class.assert_called_once_with("Article")
+
+    def test_existing_alias_is_repointed_before_dropping_old_class(self):
+        client = make_client([], 0, 0, alias="Article_v2")
+
+        stats = rebuild_class(client, "Article", DEFINITION)
+
+        self.assertEqual(stats["source"], "Article_v2")
+        client._connection.put.assert_called_once_with(path="/aliases/Article", weaviate_object={"class": "Article_v3"})
+        client.schema.delete_class.assert_called_once_with("Article_v2")
+        calls = [c[0] for c in client.mock_calls if "()" not in c[0]]
+        self.assertLess(calls.index("_connection.put"), calls.index("schema.delete_class"))
+
+    def test_count_mismatch_leaves_shadow_and_does_not_swap(self):
+        client = make_client([{"id": "uuid-1", "properties": {}}], 2, 1)
+
+        with self.assertRaises(RebuildError):
+            rebuild_class(client, "Article", DEFINITION)
+
+        client.schema.delete_class.assert_not_called()
+        self.assertEqual(client._connection.post.call_count, 1)
+
+
+class TestRebuildPlanning(TestCase):
+
+    def test_rebuild_of_class_created_in_same_run_is_a_creation(self):
+        migrations = [
+            ("0001_migration.json", {"classes": [{"class": "Article", "properties": [
+                {"name": "wordCount", "dataType": ["text"]}
+            ]}]}),
+            ("0002_migration.json", {"classes": [], "operations": [
+                {"type": "rebuild_class", "class": "Article", "definition": DEFINITION}
+            ]}),
+        ]
+
+        plan = compile_plan(migrations, SchemaIndex({"classes": []}))
+
+        self.assertEqual([op.kind for op in plan.operations], ["create_class"])
+        self.assertEqual(plan.operations[0].definition["properties"], DEFINITION["properties"])
+
+    def test_rebuild_of_existing_class(self):
+        index = SchemaIndex({"classes": [{"class": "Article_v2", "properties": []}]})
+        index.aliases = {"Article": "Article_v2"}
+        migrations = [("0002_migration.json", {"classes": [], "operations": [
+            {"type": "rebuild_class", "class": "Article", "definition": DEFINITION}
+        ]})]
+
+        plan = compile_plan(migrations, index)
+
+        self.assertEqual([(op.kind, op.class_name) for op in plan.operations], [("rebuild_class", "Article")])
+        self.assertTrue(index.has_class("Article"))
+        self.assertEqual(index.resolve("Article"), "Article_v2")
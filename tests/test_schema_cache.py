@@ -0,0 +1,138 @@
+import os
+import json
+import tempfile
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+from contextlib import redirect_stdout
+from weaviate_migrate.commands.makemigrations import make_migrations, replay_schema
+from weaviate_migrate.schema_cache import SchemaCache, schema_hash
+
+URL = "http://weaviate.example:8080"
+SCHEMA = {"classes": [{"class": "Article", "properties": [{"name": "title", "dataType": ["text"]}]}]}
+
+
+def make_client():
+    client = MagicMock()
+    client.schema.get.return_value = SCHEMA
+    return client
+
+
+class TestSchemaCache(TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache = SchemaCache(self.temp_dir.name, ttl=60)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_hash_ignores_ordering(self):
+        reordered = {"classes": [
+            {"class": "B", "properties": [{"name": "y"}, {"name": "x"}]}, {"class": "A"}
+        ]}
+        ordered = {"classes": [{"class": "A"}, {"class": "B", "properties": [{"name": "x"}, {"name": "y"}]}]}
+        self.assertEqual(schema_hash(reordered), schema_hash(ordered))
+
+    def test_reuses_schema_within_ttl(self):
+        client = make_client()
+
+        self.assertEqual(self.cache.fetch(client, URL), SCHEMA)
+        self.assertEqual(self.cache.fetch(client, URL), SCHEMA)
+
+        client.schema.get.assert_called_once()
+        self.assertEqual(client.query.aggregate.call_count, 0)
+        self.assertEqual(self.cache.get(URL)["hash"], schema_hash(SCHEMA))
+
+    def test_refetches_after_ttl_or_on_refresh(self):
+        client = make_client()
+        self.cache.fetch(client, URL)
+
+        self.cache.fetch(client, URL, refresh=True)
+        with patch("weaviate_migrate.schema_cache.time.time", return_value=self.cache.get(URL)["fetchedAt"] + 61):
+            self.cache.fetch(client, URL)
+
+        self.assertEqual(client.schema.get.call_count, 3)
+
+    def test_caches_nothing_by_default(self):
+        client = make_client()
+        cache = SchemaCache(self.temp_dir.name)
+
+        cache.fetch(client, URL)
+        cache.fetch(client, URL)
+
+        self.assertEqual(client.schema.get.call_count, 2)
+        self.assertIsNone(cache.get(URL))
+
+    def test_refetches_entries_not_matching_their_hash(self):
+        client = make_client()
+        self.cache.fetch(client, URL)
+        entry = self.cache.get(URL)
+        entry["schema"] = {"classes": []}
+        with open(self.cache.path(URL), "w") as f:
+            json.dump(entry, f)
+
+        self.assertEqual(self.cache.fetch(client, URL), SCHEMA)
+        self.assertEqual(client.schema.get.call_count, 2)
+
+    def test_invalidate(self):
+        client = make_client()
+        self.cache.fetch(client, URL)
+        self.cache.invalidate(URL)
+        self.cache.invalidate(URL)
+
+        self.assertIsNone(self.cache.get(URL))
+        self.cache.fetch(client, URL)
+        self.assertEqual(client.schema.get.call_count, 2)
+
+    def test_entries_are_keyed_by_url(self):
+        self.cache.fetch(make_client(), URL)
+        self.assertIsNone(self.cache.get("http://other:8080"))
+
+
+class TestOfflineSchema(TestCase):
+
+    def test_replays_migration_folder(self):
+        with tempfile.TemporaryDirectory() as folder:
+            for name, migration in [
+                ("0001_migration.json", SCHEMA),
+                ("0002_migration.json", {"classes": [{"class": "Author", "properties": []}]}),
+                ("0003_migration.json", {"classes": [], "operations": [{"type": "delete_class", "class": "Author"}]}),
+            ]:
+                with open(os.path.join(folder, name), "w") as f:
+                    json.dump(migration, f)
+
+            schema = replay_schema(folder)
+
+        self.assertEqual(schema, SCHEMA)
+
+    def test_replays_diff_files(self):
+        with tempfile.TemporaryDirectory() as folder:
+            for name, migration in [
+                ("0001_migration.json", {"classes": [{"class": "Author", "properties": []}]}),
+                ("0002_migration.json", {"classes_to_add": ["Article"], "classes_to_remove": ["Author"],
+                                         "properties_to_add": {"Article": ["title"]}}),
+            ]:
+                with open(os.path.join(folder, name), "w") as f:
+                    json.dump(migration, f)
+
+            schema = replay_schema(folder)
+
+        # `migrate` does not delete the classes a diff removes, so neither does the replay.
+        self.assertEqual(schema, {"classes": [
+            {"class": "Author", "properties": []}, {"class": "Article", "properties": [{"name": "title"}]},
+        ]})
+
+    def test_successive_offline_runs(self):
+        target = {"classes": [{"class": "Article", "properties": [{"name": "title", "dataType": ["text"]}]}]}
+        with tempfile.TemporaryDirectory() as folder, open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+            make_migrations(None, folder, target, replay_schema(folder))
+            self.assertEqual(replay_schema(folder), target)
+            target["classes"].append({"class": "Author", "properties": []})
+            target["classes"][0]["properties"].append({"name": "body", "dataType": ["text"]})
+            make_migrations(None, folder, target, replay_schema(folder))
+            self.assertEqual(replay_schema(folder), target)
+            with open(os.path.join(folder, "0002_migration.json"), "r") as f:
+                second = json.load(f)
+
+        self.assertEqual(second["classes_to_add"], ["Author"])
+        self.assertEqual(second["properties_to_add"], {"Article": ["body"]})
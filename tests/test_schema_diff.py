@@ -0,0 +1,162 @@
+import os
+import copy
+import json
+import tempfile
+from unittest import TestCase
+from contextlib import redirect_stdout
+from weaviate_migrate.commands.makemigrations import (
+    AUTO_SCHEMA_DESCRIPTION,
+    calculate_schema_diff,
+    class_unchanged,
+    make_migrations,
+    rebuild_operations,
+)
+from weaviate_migrate.ledger import LEDGER_CLASS, SYNC_STATE_CLASS
+
+
+class TestCalculateSchemaDiff(TestCase):
+
+    def setUp(self):
+        self.current = {"classes": [
+            {
+                "class": "Article",
+                "vectorIndexConfig": {"ef": 64, "efConstruction": 128, "distance": "cosine"},
+                "properties": [
+                    {"name": "title", "dataType": ["text"], "tokenization": "word",
+                     "indexFilterable": True, "indexSearchable": True},
+                    {"name": "body", "dataType": ["text"], "tokenization": "word"},
+                    {"name": "legacy", "dataType": ["text"]},
+                ]
+            },
+            {"class": "Author", "properties": [{"name": "name", "dataType": ["text"]}]},
+            {"class": "Obsolete", "properties": []},
+        ]}
+
+    def test_identical_schemas(self):
+        diff = calculate_schema_diff(self.current, copy.deepcopy(self.current))
+
+        self.assertEqual(diff, {
+            "classes_to_add": [],
+            "classes_to_remove": [],
+            "class_changes": {},
+            "properties_to_add": {},
+            "properties_to_remove": {},
+            "properties_to_change": {},
+        })
+
+    def test_reports_changed_fields(self):
+        target = copy.deepcopy(self.current)
+        article = target["classes"][0]
+        article["vectorIndexConfig"] = {"ef": 128}
+        article["shardingConfig"] = {"desiredCount": 3}
+        title, body, _ = article["properties"]
+        title["tokenization"] = "field"
+        title["indexFilterable"] = False
+        body["dataType"] = ["text[]"]
+        article["properties"] = [title, body, {"name": "summary", "dataType": ["text"]}]
+        target["classes"][2] = {"class": "Tag", "properties": []}
+
+        diff = calculate_schema_diff(self.current, target)
+
+        self.assertEqual(diff["classes_to_add"], ["Tag"])
+        self.assertEqual(diff["classes_to_remove"], ["Obsolete"])
+        self.assertEqual(diff["class_changes"], {"Article": ["vectorIndexConfig", "shardingConfig"]})
+        self.assertEqual(diff["properties_to_add"], {"Article": ["summary"]})
+        self.assertEqual(diff["properties_to_remove"], {"Article": ["legacy"]})
+        self.assertEqual(diff["properties_to_change"], {
+            "Article": {"title": ["tokenization", "indexFilterable"], "body": ["dataType"]}
+        })
+
+    def test_changed_and_removed_properties_need_a_rebuild(self):
+        target = copy.deepcopy(self.current)
+        target["classes"][0]["properties"][1]["dataType"] = ["text[]"]
+        target["classes"][1]["properties"].append({"name": "bio", "dataType": ["text"]})
+
+        diff = calculate_schema_diff(self.current, target)
+
+        self.assertEqual(rebuild_operations(diff, target), [
+            {"type": "rebuild_class", "class": "Article", "definition": target["classes"][0]}
+        ])
+
+    def test_auto_created_properties_do_not_need_a_rebuild(self):
+        current = copy.deepcopy(self.current)
+        current["classes"][1]["properties"].append(
+            {"name": "nickname", "dataType": ["text"], "description": f"{AUTO_SCHEMA_DESCRIPTION} on 2024-05-01"}
+        )
+        target = copy.deepcopy(self.current)
+
+        diff = calculate_schema_diff(current, target)
+
+        self.assertEqual(diff["properties_to_remove"], {"Author": ["nickname"]})
+        self.assertEqual(rebuild_operations(diff, target, current), [])
+
+    def test_rebuilds_are_only_generated_when_allowed(self):
+        target = copy.deepcopy(self.current)
+        target["classes"][0]["properties"][1]["dataType"] = ["text[]"]
+        with tempfile.TemporaryDirectory() as folder, open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+            with self.assertLogs("weaviate_migrate.commands.makemigrations", "WARNING") as logs:
+                make_migrations(None, folder, target, self.current)
+            make_migrations(None, folder, target, self.current, allow_rebuild=True)
+            migrations = []
+            for name in ("0001_migration.json", "0002_migration.json"):
+                with open(os.path.join(folder, name)) as f:
+                    migrations.append(json.load(f))
+
+        self.assertIn("Article", logs.output[0])
+        self.assertNotIn("operations", migrations[0])
+        self.assertEqual([op["type"] for op in migrations[1]["operations"]], ["rebuild_class"])
+
+    def test_bookkeeping_classes_are_not_removed(self):
+        current = copy.deepcopy(self.current)
+        current["classes"] += [{"class": LEDGER_CLASS, "properties": []}, {"class": SYNC_STATE_CLASS, "properties": []}]
+        with tempfile.TemporaryDirectory() as folder, open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+            make_migrations(None, folder, self.current, current)
+            with open(os.path.join(folder, "0001_migration.json")) as f:
+                migration = json.load(f)
+
+        self.assertEqual(migration["classes_to_remove"], [])
+
+    def test_unspecified_settings_are_not_changes(self):
+        target = {"classes": [
+            {"class": "Article", "vectorIndexConfig": {"distance": "cosine"}, "properties": [
+                {"name": "title", "dataType": ["text"]},
+                {"name": "body", "dataType": ["text"]},
+                {"name": "legacy", "dataType": ["text"]},
+            ]},
+            {"class": "Author", "properties": [{"name": "name", "dataType": ["text"]}]},
+            {"class": "Obsolete", "properties": []},
+        ]}
+
+        diff = calculate_schema_diff(self.current, target)
+
+        self.assertEqual(diff["class_changes"], {})
+        self.assertEqual(diff["properties_to_change"], {})
+
+    def test_server_defaults_leave_a_class_unchanged(self):
+        target = {"class": "Article", "vectorIndexConfig": {"distance": "cosine"}, "properties": [
+            {"name": "title", "dataType": ["text"]},
+            {"name": "body", "dataType": ["text"], "tokenization": "word"},
+            {"name": "legacy", "dataType": ["text"]},
+        ]}
+        article = self.current["classes"][0]
+
+        self.assertTrue(class_unchanged(article, target))
+        target["properties"][1]["tokenization"] = "field"
+        self.assertFalse(class_unchanged(article, target))
+        self.assertFalse(class_unchanged(article, dict(target, properties=target["properties"][:2])))
+
+    def test_reordered_properties_are_not_a_change(self):
+        target = copy.deepcopy(self.current)
+        target["classes"][0]["properties"].reverse()
+
+        diff = calculate_schema_diff(self.current, target)
+
+        self.assertEqual(diff["properties_to_change"], {})
+        self.assertEqual(diff["properties_to_add"], {})
+
+    def test_empty_schemas(self):
+        diff = calculate_schema_diff({}, self.current)
+        self.assertEqual(diff["classes_to_add"], ["Article", "Author", "Obsolete"])
+
+        diff = calculate_schema_diff(self.current, {})
+        self.assertEqual(diff["classes_to_remove"], ["Article", "Author", "Obsolete"])
@@ -0,0 +1,53 @@
+from unittest import TestCase
+from unittest.mock import MagicMock
+from weaviate_migrate.schema_index import SchemaIndex
+
+
+class TestSchemaIndex(TestCase):
+
+    def setUp(self):
+        self.schema = {
+            "classes": [
+                {
+                    "class": "Person",
+                    "properties": [
+                        {"name": "name", "dataType": ["string"]},
+                        {"name": "age", "dataType": ["int"]},
+                    ]
+                },
+                {"class": "City", "properties": []},
+            ]
+        }
+
+    def test_lookups(self):
+        index = SchemaIndex(self.schema)
+
+        self.assertTrue(index.has_class("Person"))
+        self.assertTrue(index.has_class("City"))
+        self.assertFalse(index.has_class("Country"))
+        self.assertTrue(index.has_property("Person", "age"))
+        self.assertFalse(index.has_property("City", "age"))
+
+    def test_from_client(self):
+        client = MagicMock()
+        client.schema.get.return_value = self.schema
+
+        index = SchemaIndex.from_client(client)
+
+        client.schema.get.assert_called_once()
+        self.assertTrue(index.has_property("Person", "name"))
+
+    def test_updates_in_place(self):
+        index = SchemaIndex({"classes": []})
+
+        index.add_class({"class": "City", "properties": [{"name": "name", "dataType": ["string"]}]})
+        index.add_property("City", {"name": "population", "dataType": ["int"]})
+
+        self.assertTrue(index.has_class("City"))
+        self.assertTrue(index.has_property("City", "name"))
+        self.assertTrue(index.has_property("City", "population"))
+
+    def test_to_schema_round_trip(self):
+        index = SchemaIndex(self.schema)
+
+        self.assertEqual(index.to_schema(), self.schema)
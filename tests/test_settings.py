@@ -7,7 +7,8 @@ INSTALLED_APPS = [
 DATABASES = {  
     'default': {  
         'ENGINE': 'django.db.backends.sqlite3',  
-        'NAME': ':memory:',  
+        # Shared, so the realtime queue's thread sees the test rows.
+        'NAME': 'file:memorydb_default?mode=memory&cache=shared',  
     }  
 }  
   
@@ -0,0 +1,102 @@
+import os
+import json
+import tempfile
+from unittest import TestCase
+from unittest.mock import MagicMock
+from weaviate_migrate.commands.migrate import migrate
+from weaviate_migrate.commands.squashmigrations import squash_migrations, write_squashed_migration
+from weaviate_migrate.ledger import FileLedger, is_up_to_date
+
+
+class TestSquashMigrations(TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.migration_folder = self.temp_dir.name
+        self.ledger = FileLedger(os.path.join(self.migration_folder, ".weaviate_migrations.json"))
+        self.write_migration("0001_migration.json", {"classes": [
+            {"class": "Person", "properties": [{"name": "name", "dataType": ["text"]}]},
+            {"class": "Temp", "properties": []},
+        ]})
+        self.write_migration("0002_migration.json", {"classes": [
+            {"class": "Person", "properties": [{"name": "age", "dataType": ["int"]}]},
+        ]})
+        self.write_migration("0003_migration.json", {"operations": [{"type": "delete_class", "class": "Temp"}]})
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write_migration(self, filename, content):
+        with open(os.path.join(self.migration_folder, filename), "w") as f:
+            json.dump(content, f)
+
+    def test_squash_computes_final_schema(self):
+        snapshot = squash_migrations(self.migration_folder)
+
+        self.assertEqual(snapshot, {
+            "replaces": ["0001_migration.json", "0002_migration.json", "0003_migration.json"],
+            "classes": [
+                {"class": "Person", "properties": [
+                    {"name": "name", "dataType": ["text"]},
+                    {"name": "age", "dataType": ["int"]},
+                ]}
+            ],
+        })
+
+    def test_squash_range_deletes_earlier_classes(self):
+        snapshot = squash_migrations(self.migration_folder, start=2)
+
+        self.assertEqual(snapshot["replaces"], ["0002_migration.json", "0003_migration.json"])
+        self.assertEqual(snapshot["operations"], [{"type": "delete_class", "class": "Temp"}])
+
+    def test_fresh_cluster_applies_only_the_squash(self):
+        path = write_squashed_migration(self.migration_folder)
+        self.assertEqual(os.path.basename(path), "0001_squashed_0003.json")
+        client = MagicMock()
+        client.schema.get.return_value = {"classes": []}
+
+        migrate(client, self.migration_folder, self.ledger)
+
+        client.schema.create_class.assert_called_once()
+        client.schema.delete_class.assert_not_called()
+        self.assertEqual(set(self.ledger.applied()), {
+            "0001_migration.json", "0002_migration.json", "0003_migration.json", "0001_squashed_0003.json"
+        })
+        self.assertTrue(is_up_to_date(self.ledger, self.migration_folder))
+
+    def test_partially_applied_originals_are_finished_instead(self):
+        self.ledger.record("0001_migration.json", "abc")
+        write_squashed_migration(self.migration_folder)
+        client = MagicMock()
+        client.schema.get.return_value = {"classes": [
+            {"class": "Person", "properties": [{"name": "name", "dataType": ["text"]}]},
+            {"class": "Temp", "properties": []},
+        ]}
+
+        migrate(client, self.migration_folder, self.ledger)
+
+        client.schema.create_property.assert_called_once_with("Person", {"name": "age", "dataType": ["int"]})
+        client.schema.delete_class.assert_called_once_with("Temp")
+        self.assertNotIn("0001_squashed_0003.json", self.ledger.applied())
+
+    def test_squash_keeps_data_migrations(self):
+        self.write_migration("0002_migration.json", {
+            "classes": [{"class": "Person", "properties": [{"name": "slug", "dataType": ["text"]}]}],
+            "operations": [{"type": "data_migration", "class": "Person", "transform": "tests.test_backfill:add_slug"}],
+        })
+        self.write_migration("0003_migration.json", {"classes": [{"class": "Article", "properties": []}]})
+
+        snapshot = squash_migrations(self.migration_folder, start=2)
+
+        self.assertEqual(snapshot["operations"], [
+            {"type": "data_migration", "class": "Person", "transform": "tests.test_backfill:add_slug"},
+        ])
+
+    def test_squash_drops_data_migrations_of_deleted_classes(self):
+        self.write_migration("0002_migration.json", {
+            "operations": [{"type": "data_migration", "class": "Temp", "transform": "tests.test_backfill:add_slug"}],
+        })
+
+        snapshot = squash_migrations(self.migration_folder, start=2)
+
+        self.assertEqual(snapshot["operations"], [{"type": "delete_class", "class": "Temp"}])
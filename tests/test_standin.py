@@ -0,0 +1,108 @@
+import os
+import json
+import tempfile
+from unittest import TestCase
+from contextlib import redirect_stdout
+from weaviate_migrate.commands.makemigrations import make_migrations
+from weaviate_migrate.commands.migrate import migrate
+from weaviate_migrate.rest import RestError
+from weaviate_migrate.standin import StandInClient, StandInServer, StandInState, route
+
+ARTICLE = {"class": "Article", "properties": [{"name": "title", "dataType": ["text"]}]}
+
+
+class TestRoute(TestCase):
+
+    def setUp(self):
+        self.state = StandInState()
+
+    def test_schema_create_property_and_delete(self):
+        self.assertEqual(route(self.state, "POST", "/v1/schema", {}, ARTICLE)[0], 200)
+        self.assertEqual(route(self.state, "POST", "/v1/schema", {}, ARTICLE)[0], 422)
+        property_definition = {"name": "body", "dataType": ["text"]}
+        self.assertEqual(route(self.state, "POST", "/v1/schema/Article/properties", {}, property_definition)[0], 200)
+        self.assertEqual(route(self.state, "POST", "/v1/schema/Article/properties", {}, property_definition)[0], 422)
+        status, schema = route(self.state, "GET", "/v1/schema", {}, None)
+        self.assertEqual([p["name"] for p in schema["classes"][0]["properties"]], ["title", "body"])
+        route(self.state, "DELETE", "/v1/schema/Article", {}, None)
+        self.assertEqual(route(self.state, "GET", "/v1/schema", {}, None)[1], {"classes": []})
+
+    def test_cursor_listing_pages_in_id_order(self):
+        route(self.state, "POST", "/v1/schema", {}, ARTICLE)
+        objects = [{"class": "Article", "id": f"{i:04d}", "properties": {}} for i in (3, 1, 2)]
+        route(self.state, "POST", "/v1/batch/objects", {}, {"objects": objects})
+
+        _, page = route(self.state, "GET", "/v1/objects", {"class": ["Article"], "limit": ["2"]}, None)
+        self.assertEqual([o["id"] for o in page["objects"]], ["0001", "0002"])
+        query = {"class": ["Article"], "limit": ["2"], "after": ["0002"]}
+        _, page = route(self.state, "GET", "/v1/objects", query, None)
+        self.assertEqual([o["id"] for o in page["objects"]], ["0003"])
+
+    def test_batch_reports_per_object_errors(self):
+        _, results = route(self.state, "POST", "/v1/batch/objects", {}, {"objects": [
+            {"class": "Missing", "id": "0001", "properties": {}},
+        ]})
+        self.assertIn("errors", results[0]["result"])
+
+
+class TestStandInServer(TestCase):
+
+    def test_throttled_requests_get_retry_after_and_change_nothing(self):
+        with StandInServer(throttle_rate=1.0, retry_after=3) as server:
+            client = StandInClient(server.url)
+            response = client._connection.post("/schema", ARTICLE)
+            client.close()
+            self.assertEqual(response.status_code, 429)
+            self.assertEqual(response.headers["retry-after"], "3")
+            self.assertEqual(server.state.classes, {})
+            self.assertEqual(server.state.throttled, 1)
+
+    def test_errors_surface_as_rest_errors(self):
+        with StandInServer(error_rate=1.0) as server:
+            client = StandInClient(server.url)
+            with self.assertRaises(RestError) as raised:
+                client.schema.create_class(ARTICLE)
+            client.close()
+            self.assertEqual(raised.exception.status_code, 500)
+            self.assertEqual(server.state.failed, 1)
+
+    def test_rate_limit_throttles_bursts(self):
+        with StandInServer(rate_limit=2) as server:
+            client = StandInClient(server.url)
+            statuses = [client._connection.get("/schema").status_code for _ in range(4)]
+            client.close()
+        self.assertEqual(statuses[:2], [200, 200])
+        self.assertIn(429, statuses[2:])
+
+    def test_seeded_faults_replay(self):
+        def statuses():
+            with StandInServer(throttle_rate=0.3, error_rate=0.3, seed=7) as server:
+                client = StandInClient(server.url)
+                result = [client._connection.get("/schema").status_code for _ in range(20)]
+                client.close()
+                return result
+
+        first = statuses()
+        self.assertEqual(first, statuses())
+        self.assertEqual({200, 429, 500}, set(first))
+
+    def test_readiness_is_never_faulted(self):
+        with StandInServer(error_rate=1.0) as server:
+            client = StandInClient(server.url)
+            self.assertEqual(client._connection.get("/.well-known/ready").status_code, 200)
+            client.close()
+
+    def test_migrate_then_makemigrations_finds_no_changes(self):
+        desired = {"classes": [ARTICLE, {"class": "Author", "properties": []}]}
+        with tempfile.TemporaryDirectory() as folder, StandInServer(latency=0.001) as server:
+            with open(os.path.join(folder, "0001_migration.json"), "w") as f:
+                json.dump(desired, f)
+            client = StandInClient(server.url)
+            with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+                migrate(client, folder)
+                make_migrations(client, folder, desired)
+            client.close()
+            with open(os.path.join(folder, "0002_migration.json")) as f:
+                diff = json.load(f)
+        self.assertEqual(diff["classes_to_add"], [])
+        self.assertEqual(diff["properties_to_add"], {})
@@ -0,0 +1,109 @@
+import os
+import json
+import argparse
+import tempfile
+from unittest import TestCase
+from contextlib import redirect_stderr, redirect_stdout
+from weaviate_migrate import telemetry
+from weaviate_migrate.commands.migrate import migrate
+from weaviate_migrate.standin import StandInClient, StandInServer
+
+MIGRATIONS = [
+    ("0001_migration.json", {"classes": [
+        {"class": "Author", "properties": [{"name": "name", "dataType": ["text"]}]},
+    ]}),
+    ("0002_migration.json", {"classes": [
+        {"class": "Article", "properties": [{"name": "title", "dataType": ["text"]}]},
+    ]}),
+]
+
+
+class TestTelemetry(TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.folder = self.temp_dir.name
+        for name, migration in MIGRATIONS:
+            with open(os.path.join(self.folder, name), "w") as f:
+                json.dump(migration, f)
+        self.server = StandInServer().start()
+
+    def tearDown(self):
+        self.server.stop()
+        self.temp_dir.cleanup()
+
+    def traced_migrate(self, **kwargs) -> telemetry.Tracer:
+        tracer = telemetry.Tracer("migrate")
+        with telemetry.activate(tracer), open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+            client = telemetry.instrument(StandInClient(self.server.url))
+            with telemetry.span("migrate"):
+                migrate(client, self.folder, **kwargs)
+            client.close()
+        return tracer
+
+    def assert_traced(self, tracer: telemetry.Tracer):
+        spans = {span.id: span for span in tracer.spans}
+        creates = [span for span in tracer.spans if span.name == "create_class"]
+        self.assertEqual(len(creates), 2)
+        for span in creates:
+            self.assertEqual(span.attributes["status"], 200)
+            self.assertEqual(spans[span.parent_id].name, "operation")
+        self.assertIn("get_schema", tracer.summary())
+        self.assertEqual(sorted(tracer.migrations()), ["0001_migration.json", "0002_migration.json"])
+        self.assertEqual(tracer.migrations()["0001_migration.json"]["operations"], 1)
+        self.assertEqual(tracer.counters["requests"], self.server.state.requests)
+        self.assertGreater(tracer.counters["bytes_sent"], 0)
+        self.assertGreater(tracer.counters["bytes_received"], 0)
+
+    def test_sync_run_is_traced(self):
+        self.assert_traced(self.traced_migrate())
+
+    def test_async_run_is_traced(self):
+        self.assert_traced(self.traced_migrate(concurrency=4, backend="async"))
+
+    def test_failed_requests_are_counted(self):
+        tracer = telemetry.Tracer("migrate")
+        self.server.throttle_rate = 1.0
+        with telemetry.activate(tracer):
+            client = telemetry.instrument(StandInClient(self.server.url))
+            client._connection.get("/schema")
+            client.close()
+        self.assertEqual(tracer.counters["errors"], 1)
+        self.assertEqual(tracer.spans[0].attributes["status"], 429)
+
+    def test_instrument_without_tracer_leaves_client_alone(self):
+        client = StandInClient(self.server.url)
+        get = client._connection.get
+        telemetry.instrument(client)
+        self.assertEqual(client._connection.get, get)
+
+    def test_session_writes_metrics_and_profile(self):
+        metrics_file = os.path.join(self.folder, "run.prom")
+        profile_file = os.path.join(self.folder, "run.pstats")
+        args = argparse.Namespace(metrics_file=metrics_file, profile=profile_file)
+        with open(os.devnull, "w") as devnull, redirect_stderr(devnull):
+            with telemetry.session(args, "migrate") as tracer:
+                tracer.count("requests", 3)
+        with open(metrics_file) as f:
+            metrics = f.read()
+        self.assertIn('weaviate_migrate_requests_total{command="migrate"} 3', metrics)
+        self.assertIn('weaviate_migrate_span_seconds_count{command="migrate",span="migrate"} 1', metrics)
+        self.assertTrue(os.path.getsize(profile_file) > 0)
+        self.assertIsNone(telemetry.get_tracer())
+
+    def test_json_report(self):
+        path = os.path.join(self.folder, "run.json")
+        tracer = self.traced_migrate()
+        tracer.write(path)
+        with open(path) as f:
+            report = json.load(f)
+        self.assertEqual(report["command"], "migrate")
+        self.assertEqual(report["summary"]["create_class"]["count"], 2)
+        self.assertEqual(report["spans"][0]["name"], "migrate")
+
+    def test_operation_names(self):
+        self.assertEqual(telemetry.operation_name("POST", "/schema/Article/properties"), "create_property")
+        self.assertEqual(telemetry.operation_name("post", "/v1/batch/objects"), "batch_objects")
+        self.assertEqual(telemetry.operation_name("GET", "/objects?class=Article"), "list_objects")
+        self.assertEqual(telemetry.operation_name("PUT", "/schema/Document/tenants"), "update_tenants")
+        self.assertEqual(telemetry.operation_name("GET", "/aliases"), "GET /aliases")
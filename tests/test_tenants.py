@@ -0,0 +1,168 @@
+import os
+import json
+import tempfile
+from unittest import TestCase
+from contextlib import redirect_stdout
+from weaviate_migrate.commands.migrate import migrate
+from weaviate_migrate.commands.squashmigrations import squash_migrations
+from weaviate_migrate.planner import compile_plan
+from weaviate_migrate.rest import RestError, list_tenants
+from weaviate_migrate.schema_index import SchemaIndex
+from weaviate_migrate.standin import StandInClient, StandInServer
+from weaviate_migrate.tenants import TenantError, apply_tenant_operation, tenant_changes
+
+TENANTS = [f"tenant{i:04d}" for i in range(250)]
+MULTI_TENANT_CLASS = {
+    "class": "Document", "multiTenancyConfig": {"enabled": True},
+    "properties": [{"name": "title", "dataType": ["text"]}],
+}
+
+
+class TestTenantChanges(TestCase):
+
+    def test_add_only_sends_missing_tenants(self):
+        changes, unchanged = tenant_changes(
+            {"a": "HOT"}, {"type": "add_tenants", "class": "Document", "tenants": ["a", "b", "b", "c"]}
+        )
+        self.assertEqual(changes, [{"name": "b"}, {"name": "c"}])
+        self.assertEqual(unchanged, 1)
+
+        changes, _ = tenant_changes(
+            {}, {"type": "add_tenants", "class": "Document", "tenants": ["a"], "activityStatus": "COLD"}
+        )
+        self.assertEqual(changes, [{"name": "a", "activityStatus": "COLD"}])
+
+    def test_remove_only_sends_present_tenants(self):
+        changes, unchanged = tenant_changes(
+            {"a": "HOT", "b": "COLD"}, {"type": "remove_tenants", "class": "Document", "tenants": ["b", "x"]}
+        )
+        self.assertEqual(changes, ["b"])
+        self.assertEqual(unchanged, 1)
+
+    def test_activity_statuses_match_their_aliases(self):
+        entry = {"type": "set_tenant_activity", "class": "Document", "tenants": ["a", "b"],
+                 "activityStatus": "INACTIVE"}
+        changes, unchanged = tenant_changes({"a": "COLD", "b": "ACTIVE"}, entry)
+        self.assertEqual(changes, [{"name": "b", "activityStatus": "INACTIVE"}])
+        self.assertEqual(unchanged, 1)
+
+    def test_activity_of_unknown_tenants(self):
+        entry = {"type": "set_tenant_activity", "class": "Document", "tenants": ["a", "b"],
+                 "activityStatus": "COLD"}
+        with self.assertRaises(TenantError):
+            tenant_changes({"a": "HOT"}, entry)
+
+
+class TestTenantOperations(TestCase):
+
+    def setUp(self):
+        self.server = StandInServer().start()
+        self.client = StandInClient(self.server.url)
+        self.client.schema.create_class(MULTI_TENANT_CLASS)
+
+    def tearDown(self):
+        self.client.close()
+        self.server.stop()
+
+    def test_changes_are_sent_in_chunks(self):
+        entry = {"type": "add_tenants", "class": "Document", "tenants": TENANTS, "batch_size": 100, "workers": 3}
+        requests = self.server.state.requests
+        stats = apply_tenant_operation(self.client, "Document", entry)
+        self.assertEqual(stats["changed"], 250)
+        self.assertEqual(stats["chunks"], 3)
+        # One read of the live tenants, then one request per chunk.
+        self.assertEqual(self.server.state.requests - requests, 4)
+        self.assertEqual(len(list_tenants(self.client, "Document")), 250)
+
+    def test_rerun_is_a_no_op(self):
+        entries = [
+            {"type": "add_tenants", "class": "Document", "tenants": TENANTS},
+            {"type": "set_tenant_activity", "class": "Document", "tenants": TENANTS[:120], "activityStatus": "COLD"},
+            {"type": "remove_tenants", "class": "Document", "tenants": TENANTS[200:]},
+        ]
+        for entry in entries:
+            apply_tenant_operation(self.client, "Document", entry)
+        requests = self.server.state.requests
+        for entry in entries[1:]:
+            stats = apply_tenant_operation(self.client, "Document", entry)
+            self.assertEqual((stats["changed"], stats["chunks"]), (0, 0))
+        self.assertEqual(self.server.state.requests - requests, 2)
+        tenants = list_tenants(self.client, "Document")
+        self.assertEqual(len(tenants), 200)
+        self.assertEqual(sum(status == "COLD" for status in tenants.values()), 120)
+
+    def test_class_without_multi_tenancy(self):
+        self.client.schema.create_class({"class": "Article", "properties": []})
+        with self.assertRaises(RestError) as raised:
+            apply_tenant_operation(self.client, "Article", {"type": "add_tenants", "class": "Article",
+                                                            "tenants": ["a"]})
+        self.assertEqual(raised.exception.status_code, 422)
+
+
+class TestTenantMigrations(TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.folder = self.temp_dir.name
+        self.write_migration("0001_migration.json", {
+            "classes": [MULTI_TENANT_CLASS],
+            "operations": [{"type": "add_tenants", "class": "Document", "tenants": TENANTS, "batch_size": 50}],
+        })
+        self.write_migration("0002_migration.json", {"operations": [
+            {"type": "set_tenant_activity", "class": "Document", "tenants": TENANTS[:100], "activityStatus": "COLD"},
+            {"type": "remove_tenants", "class": "Document", "tenants": TENANTS[240:]},
+        ]})
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write_migration(self, filename, content):
+        with open(os.path.join(self.folder, filename), "w") as f:
+            json.dump(content, f)
+
+    def migrate(self, **kwargs):
+        with StandInServer() as server:
+            client = StandInClient(server.url)
+            with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+                migrate(client, self.folder, **kwargs)
+            tenants = list_tenants(client, "Document")
+            client.close()
+        return tenants
+
+    def assert_migrated(self, tenants):
+        self.assertEqual(len(tenants), 240)
+        self.assertEqual(sum(status == "COLD" for status in tenants.values()), 100)
+
+    def test_sync_backend(self):
+        self.assert_migrated(self.migrate(concurrency=4))
+
+    def test_async_backend(self):
+        self.assert_migrated(self.migrate(concurrency=4, backend="async"))
+
+    def test_tenant_operations_wait_for_their_class(self):
+        migrations = [
+            ("0001_migration.json", {"classes": [MULTI_TENANT_CLASS], "operations": [
+                {"type": "add_tenants", "class": "Document", "tenants": ["a"]},
+            ]}),
+            ("0002_migration.json", {"operations": [
+                {"type": "set_tenant_activity", "class": "Document", "tenants": ["a"], "activityStatus": "COLD"},
+            ]}),
+        ]
+        create, add, activate = compile_plan(migrations, SchemaIndex({"classes": []})).operations
+        self.assertEqual(add.depends_on, [create])
+        self.assertIn(add, activate.depends_on)
+        self.assertEqual(str(add), "add_tenants Document (1 tenants)")
+
+    def test_deleted_class_drops_its_tenant_operations(self):
+        migrations = [
+            ("0001_migration.json", {"classes": [MULTI_TENANT_CLASS], "operations": [
+                {"type": "add_tenants", "class": "Document", "tenants": ["a"]},
+                {"type": "delete_class", "class": "Document"},
+            ]}),
+        ]
+        self.assertEqual(compile_plan(migrations, SchemaIndex({"classes": []})).operations, [])
+
+    def test_squash_keeps_tenant_operations(self):
+        snapshot = squash_migrations(self.folder)
+        self.assertEqual([e["type"] for e in snapshot["operations"]],
+                         ["add_tenants", "set_tenant_activity", "remove_tenants"])
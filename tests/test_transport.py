@@ -0,0 +1,173 @@
+import os
+import json
+import tempfile
+import threading
+from unittest import TestCase
+from unittest.mock import MagicMock
+from contextlib import redirect_stdout
+from weaviate_migrate.aio import AsyncExecutor
+from weaviate_migrate.commands.migrate import migrate
+from weaviate_migrate.planner import compile_plan
+from weaviate_migrate.schema_index import SchemaIndex
+from weaviate_migrate.standin import StandInClient, StandInServer
+from weaviate_migrate.transport import AIMDLimiter, RetryPolicy, Transport, is_idempotent, transport_of
+
+
+def fast_transport(**limiter_options) -> Transport:
+    return Transport(RetryPolicy(max_retries=8, base_delay=0.001, max_delay=0.01), AIMDLimiter(**limiter_options))
+
+
+class TestRetryPolicy(TestCase):
+
+    def test_idempotency(self):
+        self.assertTrue(is_idempotent("GET", "/schema"))
+        self.assertTrue(is_idempotent("delete", "/v1/schema/Article"))
+        self.assertTrue(is_idempotent("POST", "/graphql"))
+        self.assertFalse(is_idempotent("POST", "/schema", {"class": "Article"}))
+        self.assertTrue(is_idempotent("POST", "/batch/objects", {"objects": [{"id": "a"}, {"id": "b"}]}))
+        self.assertFalse(is_idempotent("POST", "/batch/objects", {"objects": [{"id": "a"}, {}]}))
+
+    def test_should_retry(self):
+        policy = RetryPolicy(max_retries=2)
+        self.assertTrue(policy.should_retry(0, idempotent=False, status_code=429))
+        self.assertTrue(policy.should_retry(1, idempotent=False, status_code=503))
+        self.assertFalse(policy.should_retry(2, idempotent=True, status_code=429))
+        self.assertTrue(policy.should_retry(0, idempotent=True, status_code=502))
+        self.assertFalse(policy.should_retry(0, idempotent=False, status_code=502))
+        self.assertTrue(policy.should_retry(0, idempotent=True))
+        self.assertFalse(policy.should_retry(0, idempotent=False))
+        self.assertFalse(policy.should_retry(0, idempotent=True, status_code=422))
+
+    def test_delay_is_jittered_and_honours_retry_after(self):
+        policy = RetryPolicy(base_delay=0.1, max_delay=1.0)
+        delays = [policy.delay(3) for _ in range(100)]
+        self.assertTrue(all(0 <= d <= 0.8 for d in delays))
+        self.assertGreater(len(set(delays)), 90)
+        self.assertTrue(all(d <= 1.0 for d in (policy.delay(10) for _ in range(100))))
+        self.assertGreaterEqual(policy.delay(0, server_delay=0.5), 0.5)
+        self.assertEqual(policy.delay(0, server_delay=60), 1.0)
+
+
+class TestAIMDLimiter(TestCase):
+
+    def test_additive_increase_only_while_the_window_is_full(self):
+        limiter = AIMDLimiter(initial=2, maximum=4)
+        limiter.release(limiter.acquire(), key="get_schema")
+        self.assertEqual(limiter.limit, 2)
+
+        for _ in range(4):
+            started = [limiter.acquire() for _ in range(int(limiter.limit))]
+            for start in started:
+                limiter.release(start, key="get_schema")
+        self.assertGreater(limiter.limit, 3)
+        self.assertLessEqual(limiter.limit, 4)
+
+    def test_throttling_halves_once_per_window(self):
+        limiter = AIMDLimiter(initial=8)
+        started = [limiter.acquire() for _ in range(8)]
+        for start in started:
+            limiter.release(start, throttled=True)
+        self.assertEqual(limiter.limit, 4)
+        self.assertEqual(limiter.decreases, 1)
+
+        limiter.release(limiter.acquire(), throttled=True)
+        self.assertEqual(limiter.limit, 2)
+
+    def test_limit_stays_within_bounds(self):
+        limiter = AIMDLimiter(initial=2, minimum=1)
+        for _ in range(5):
+            limiter.release(limiter.acquire(), throttled=True)
+        self.assertEqual(limiter.limit, 1)
+        with self.assertRaises(ValueError):
+            AIMDLimiter(minimum=4, maximum=2)
+
+    def test_slow_responses_count_as_congestion(self):
+        limiter = AIMDLimiter(initial=8, latency_tolerance=2.0, latency_slack=0.0)
+        limiter.release(limiter.acquire(), key="create_class")
+        limiter._baselines["create_class"] = 0.0001
+        limiter.release(limiter.acquire() - 0.01, key="create_class")
+        self.assertEqual(limiter.decreases, 1)
+        # Another operation has its own baseline.
+        limiter.release(limiter.acquire() - 0.01, key="batch_objects")
+        self.assertEqual(limiter.decreases, 1)
+
+    def test_acquire_blocks_at_the_limit(self):
+        limiter = AIMDLimiter(initial=1, maximum=1)
+        started = limiter.acquire()
+        acquired = threading.Event()
+        thread = threading.Thread(target=lambda: (limiter.acquire(), acquired.set()))
+        thread.start()
+        self.assertFalse(acquired.wait(0.05))
+        limiter.release(started)
+        self.assertTrue(acquired.wait(1))
+        thread.join()
+
+
+class TestTransport(TestCase):
+
+    def test_connection_errors_are_retried_only_when_idempotent(self):
+        transport = fast_transport()
+        call = MagicMock(side_effect=[ConnectionResetError("reset"), MagicMock(status_code=200)])
+        self.assertEqual(transport.call("GET", call, "/schema").status_code, 200)
+        self.assertEqual(call.call_count, 2)
+
+        call = MagicMock(side_effect=ConnectionResetError("reset"))
+        with self.assertRaises(ConnectionResetError):
+            transport.call("POST", call, "/schema", {"class": "Article"})
+        self.assertEqual(call.call_count, 1)
+
+    def test_gives_up_with_the_last_response(self):
+        transport = fast_transport()
+        transport.retry.max_retries = 2
+        call = MagicMock(return_value=MagicMock(status_code=429, headers={}))
+        self.assertEqual(transport.call("POST", call, "/schema", {"class": "Article"}).status_code, 429)
+        self.assertEqual(call.call_count, 3)
+        self.assertEqual(transport.limiter.in_flight, 0)
+
+    def test_migrate_through_a_throttling_server(self):
+        with tempfile.TemporaryDirectory() as folder, \
+                StandInServer(throttle_rate=0.3, error_rate=0.0, retry_after=0, seed=3) as server:
+            with open(os.path.join(folder, "0001_migration.json"), "w") as f:
+                json.dump({"classes": [
+                    {"class": f"Class{i}", "properties": [{"name": "name", "dataType": ["text"]}]}
+                    for i in range(20)
+                ]}, f)
+            client = fast_transport().wrap(StandInClient(server.url))
+            with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+                migrate(client, folder, concurrency=4)
+            schema = client.schema.get()
+            client.close()
+            self.assertGreater(server.state.throttled, 0)
+        self.assertEqual(len(schema["classes"]), 20)
+
+    def test_async_backend_shares_the_retry_policy(self):
+        with StandInServer(throttle_rate=0.3, retry_after=0, seed=5) as server:
+            client = fast_transport().wrap(StandInClient(server.url))
+            migration = {"classes": [{"class": f"Class{i}", "properties": []} for i in range(20)]}
+            index = SchemaIndex({"classes": []})
+            executor = AsyncExecutor.from_client(client, index, concurrency=8)
+            self.assertIs(executor.transport.retry, transport_of(client).retry)
+            self.assertIsNot(executor.transport.limiter, transport_of(client).limiter)
+            report = executor.execute(compile_plan([("0001_migration.json", migration)], index).operations)
+            client.close()
+            self.assertGreater(server.state.throttled, 0)
+        self.assertEqual(len(report.succeeded), 20)
+
+    def test_limiter_backs_off_under_a_rate_limit(self):
+        with StandInServer(latency=0.005, rate_limit=200) as server:
+            client = fast_transport(initial=16, maximum=16).wrap(StandInClient(server.url))
+            statuses = []
+
+            def work():
+                for _ in range(15):
+                    statuses.append(client._connection.get("/schema").status_code)
+
+            threads = [threading.Thread(target=work) for _ in range(16)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            limiter = transport_of(client).limiter
+        self.assertEqual(set(statuses), {200})
+        self.assertGreater(limiter.decreases, 0)
+        self.assertLess(limiter.limit, 16)
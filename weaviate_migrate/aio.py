@@ -0,0 +1,565 @@
+import os
+import ssl
+import json
+import time
+import base64
+import socket
+import asyncio
+import logging
+import functools
+from collections import deque
+from typing import Callable, Dict, List, Optional, Union
+from urllib.parse import unquote, urlencode, urlsplit
+from urllib.request import getproxies, proxy_bypass
+from weaviate_migrate import telemetry
+from weaviate_migrate.backfill import batch_payload, check_batch_results
+from weaviate_migrate.executor import (
+    DEFAULT_CONCURRENCY,
+    FAILED,
+    SKIPPED,
+    SUCCEEDED,
+    ExecutionReport,
+    Executor,
+    Operation,
+    OperationResult,
+    is_conflict,
+    operation_span,
+)
+from weaviate_migrate.rest import RestError
+from weaviate_migrate.transport import Transport, transport_of
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_READY_TIMEOUT = 60.0
+DEFAULT_REQUEST_TIMEOUT = 60.0
+READY_POLL_INTERVAL = 0.5
+# Pages of a data migration whose writes may be in flight while the next
+# page is read.
+MAX_PENDING_WRITES = 2
+
+
+class Response:
+    def __init__(self, status_code: int, headers: Dict[str, str], content: bytes):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", "replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+
+def ssl_context(verify: Union[bool, str] = True, cert=None) -> ssl.SSLContext:
+    """
+    The TLS settings of a `requests` session as an SSL context: `verify` is
+    a bool or the path of a CA bundle file or directory, and `cert` a client
+    certificate file or a `(certificate, key)` pair.
+    """
+    if verify is False:
+        context = ssl.create_default_context()
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+    elif isinstance(verify, str):
+        if os.path.isdir(verify):
+            context = ssl.create_default_context(capath=verify)
+        else:
+            context = ssl.create_default_context(cafile=verify)
+    else:
+        try:
+            # The CA bundle `requests` verifies against by default.
+            import certifi
+            context = ssl.create_default_context(cafile=certifi.where())
+        except ImportError:
+            context = ssl.create_default_context()
+    if cert:
+        context.load_cert_chain(*((cert,) if isinstance(cert, str) else cert))
+    return context
+
+
+def select_proxy(url: str, proxies: Optional[Dict[str, str]], trust_env: bool = False) -> Optional[str]:
+    """
+    The proxy `requests` would use for `url` from a `proxies` mapping keyed
+    by scheme, `scheme://host` or `all`. With `trust_env`, the proxies of
+    the environment (HTTP_PROXY, HTTPS_PROXY, ALL_PROXY) fill in the
+    mapping, unless NO_PROXY or the system settings bypass the host.
+    """
+    parsed = urlsplit(url)
+    proxies = dict(proxies or {})
+    if trust_env and not proxy_bypass(parsed.hostname):
+        for key, proxy in getproxies().items():
+            proxies.setdefault(key, proxy)
+    for key in (f"{parsed.scheme}://{parsed.hostname}", parsed.scheme, "all"):
+        if proxies.get(key):
+            return proxies[key]
+    return None
+
+
+def request_headers(connection) -> Dict[str, str]:
+    """
+    The headers the synchronous client sends with its next request: its
+    additional headers and API key, and the current access token of an
+    OIDC session, which the client library refreshes.
+    """
+    get_headers = getattr(connection, "_get_request_header", None)
+    headers = dict(get_headers()) if get_headers else {}
+    token = getattr(getattr(connection, "_session", None), "token", None)
+    if isinstance(token, dict) and token.get("access_token"):
+        headers["authorization"] = f"Bearer {token['access_token']}"
+    return headers
+
+
+class _StaleConnection(Exception):
+    """
+    A kept-alive connection was closed by the server before it answered.
+    """
+
+
+class AsyncConnectionPool:
+    """
+    Pool of HTTP/1.1 keep-alive connections to one server, on asyncio
+    streams.
+
+    At most `size` requests are in flight, each on its own connection;
+    finished connections are reused by the next request. This costs a
+    fraction of the per-request CPU of general-purpose async HTTP clients,
+    which matters once hundreds of small schema calls overlap.
+
+    `headers` is a mapping or a callable returning one, called for every
+    request so refreshed credentials are picked up. HTTPS connections use
+    `ssl_context`. With an HTTP `proxy`, plain requests are sent to it in
+    absolute form and HTTPS connections are tunnelled through it with
+    CONNECT.
+    """
+
+    def __init__(self, url: str, headers: Union[Dict, Callable[[], Dict], None] = None,
+                 size: int = DEFAULT_CONCURRENCY, timeout: float = DEFAULT_REQUEST_TIMEOUT,
+                 ssl_context: Optional[ssl.SSLContext] = None, proxy: Optional[str] = None):
+        parsed = urlsplit(url)
+        self.host = parsed.hostname
+        self.port = parsed.port or (443 if parsed.scheme == "https" else 80)
+        self.ssl = (ssl_context or ssl.create_default_context()) if parsed.scheme == "https" else None
+        self.base_path = parsed.path.rstrip("/")
+        self.timeout = timeout
+        self.headers = {"host": parsed.netloc, "accept": "application/json"}
+        self._extra_headers = headers
+        self.proxy = urlsplit(proxy) if proxy else None
+        if self.proxy is not None and self.proxy.scheme != "http":
+            raise ValueError(f"Unsupported proxy scheme: {self.proxy.scheme}")
+        self._origin = f"{parsed.scheme}://{parsed.netloc}"
+        self._idle = []
+        self._semaphore = asyncio.Semaphore(size)
+
+    def _proxy_authorization(self) -> Dict[str, str]:
+        if self.proxy is None or self.proxy.username is None:
+            return {}
+        credentials = f"{unquote(self.proxy.username)}:{unquote(self.proxy.password or '')}"
+        return {"proxy-authorization": "Basic " + base64.b64encode(credentials.encode("utf-8")).decode("ascii")}
+
+    async def _connect(self):
+        if self.proxy is None:
+            return await asyncio.open_connection(self.host, self.port, ssl=self.ssl)
+        proxy_address = (self.proxy.hostname, self.proxy.port or 80)
+        if self.ssl is None:
+            return await asyncio.open_connection(*proxy_address)
+        # Tunnel to the server, then start TLS with it over the tunnel.
+        loop = asyncio.get_running_loop()
+        family, kind, proto, _, address = (await loop.getaddrinfo(*proxy_address, type=socket.SOCK_STREAM))[0]
+        sock = socket.socket(family, kind, proto)
+        sock.setblocking(False)
+        try:
+            await loop.sock_connect(sock, address)
+            headers = dict({"host": f"{self.host}:{self.port}"}, **self._proxy_authorization())
+            await loop.sock_sendall(sock, (
+                f"CONNECT {self.host}:{self.port} HTTP/1.1\r\n"
+                + "".join(f"{k}: {v}\r\n" for k, v in headers.items()) + "\r\n"
+            ).encode("latin-1"))
+            reply = b""
+            while b"\r\n\r\n" not in reply:
+                chunk = await loop.sock_recv(sock, 4096)
+                if not chunk:
+                    raise ConnectionError(f"Proxy {self.proxy.netloc} closed the connection during CONNECT.")
+                reply += chunk
+            status_line = reply.split(b"\r\n", 1)[0].decode("latin-1")
+            if status_line.split(" ", 2)[1:2] != ["200"]:
+                raise ConnectionError(f"Proxy {self.proxy.netloc} refused the tunnel: {status_line}")
+            return await asyncio.open_connection(sock=sock, ssl=self.ssl, server_hostname=self.host)
+        except BaseException:
+            sock.close()
+            raise
+
+    async def request(self, method: str, path: str, body=None, params: Optional[Dict] = None) -> Response:
+        target = self.base_path + path + (f"?{urlencode(params)}" if params else "")
+        headers = dict(self.headers)
+        if self.proxy is not None and self.ssl is None:
+            target = self._origin + target
+            headers.update(self._proxy_authorization())
+        extra = self._extra_headers() if callable(self._extra_headers) else self._extra_headers
+        headers.update((k.lower(), v) for k, v in (extra or {}).items())
+        payload = json.dumps(body).encode("utf-8") if body is not None else b""
+        headers["content-length"] = str(len(payload))
+        if body is not None:
+            headers["content-type"] = "application/json"
+        else:
+            headers.pop("content-type", None)
+        head = f"{method} {target} HTTP/1.1\r\n" + "".join(f"{k}: {v}\r\n" for k, v in headers.items())
+        data = head.encode("latin-1") + b"\r\n" + payload
+
+        async with self._semaphore:
+            while True:
+                reused = bool(self._idle)
+                if reused:
+                    connection = self._idle.pop()
+                else:
+                    connection = await asyncio.wait_for(self._connect(), self.timeout)
+                try:
+                    response, keep_alive = await asyncio.wait_for(
+                        self._exchange(connection, method, data), self.timeout
+                    )
+                except _StaleConnection:
+                    connection[1].close()
+                    if reused:
+                        telemetry.count("retries")
+                        continue
+                    raise ConnectionError(f"{self.host}:{self.port} closed the connection without a response.")
+                except BaseException:
+                    connection[1].close()
+                    raise
+                if keep_alive:
+                    self._idle.append(connection)
+                else:
+                    connection[1].close()
+                return response
+
+    async def _exchange(self, connection, method: str, data: bytes):
+        reader, writer = connection
+        writer.write(data)
+        await writer.drain()
+        status_line = await reader.readline()
+        if not status_line:
+            raise _StaleConnection()
+        status_code = int(status_line.split(b" ", 2)[1])
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n"):
+                break
+            if not line:
+                raise ConnectionError("Connection closed while reading response headers.")
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        keep_alive = headers.get("connection", "").lower() != "close"
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    while await reader.readline() not in (b"\r\n", b"\n", b""):
+                        pass
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readexactly(2)
+            content = b"".join(chunks)
+        elif "content-length" in headers:
+            content = await reader.readexactly(int(headers["content-length"]))
+        elif method == "HEAD" or status_code in (204, 304) or status_code < 200:
+            content = b""
+        else:
+            content = await reader.read()
+            keep_alive = False
+        return Response(status_code, headers, content), keep_alive
+
+    async def close(self) -> None:
+        while self._idle:
+            self._idle.pop()[1].close()
+
+
+class AsyncRestClient:
+    """
+    Asynchronous client for the part of the Weaviate REST API the migration
+    tool uses.
+
+    All requests share one connection pool, and at most `concurrency` are in
+    flight at any time. With a `transport`, failed requests are retried and
+    its limiter may hold the number in flight lower. `headers`,
+    `ssl_context` and `proxy` are passed to `AsyncConnectionPool`.
+    """
+
+    def __init__(self, url: str, headers: Union[Dict, Callable[[], Dict], None] = None,
+                 concurrency: int = DEFAULT_CONCURRENCY, timeout: float = DEFAULT_REQUEST_TIMEOUT,
+                 transport: Optional[Transport] = None, ssl_context: Optional[ssl.SSLContext] = None,
+                 proxy: Optional[str] = None):
+        self._pool = AsyncConnectionPool(
+            f"{url.rstrip('/')}/v1", headers, concurrency, timeout, ssl_context=ssl_context, proxy=proxy
+        )
+        self._transport = transport
+
+    async def __aenter__(self) -> "AsyncRestClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self._pool.close()
+
+    async def request(self, method: str, path: str, body=None, params: Optional[Dict] = None) -> Response:
+        if self._transport is not None:
+            return await self._transport.call_async(method, self._send, path, body, params)
+        return await self._send(method, path, body, params)
+
+    async def _send(self, method: str, path: str, body=None, params: Optional[Dict] = None) -> Response:
+        if telemetry.get_tracer() is None:
+            return await self._pool.request(method, path, body, params)
+        sent = len(json.dumps(body).encode("utf-8")) if body is not None else 0
+        with telemetry.span(telemetry.operation_name(method, path), path=path) as current:
+            try:
+                response = await self._pool.request(method, path, body, params)
+            except Exception:
+                telemetry.record_request(current, None, sent, 0)
+                raise
+            telemetry.record_request(current, response.status_code, sent, len(response.content))
+            return response
+
+    async def _json(self, method: str, path: str, body=None, params: Optional[Dict] = None,
+                    expected_status=(200,)):
+        response = await self.request(method, path, body, params)
+        if response.status_code not in expected_status:
+            raise RestError(f"Unexpected response from Weaviate: {response.text}", response.status_code)
+        return response.json() if response.content else None
+
+    async def wait_ready(self, timeout: float = DEFAULT_READY_TIMEOUT) -> None:
+        """
+        Poll the readiness endpoint until the server accepts requests.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                response = await self.request("GET", "/.well-known/ready")
+                if response.status_code == 200:
+                    return
+            except OSError as e:
+                logger.debug(f"Weaviate is not reachable yet: {e}")
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"Weaviate was not ready after {timeout:.0f}s.")
+            await asyncio.sleep(READY_POLL_INTERVAL)
+
+    async def get_schema(self) -> Dict:
+        return await self._json("GET", "/schema")
+
+    async def list_aliases(self) -> Dict[str, str]:
+        response = await self.request("GET", "/aliases")
+        if response.status_code != 200:
+            return {}
+        return {a["alias"]: a["class"] for a in (response.json() or {}).get("aliases") or []}
+
+    async def create_class(self, class_definition: Dict) -> None:
+        await self._json("POST", "/schema", class_definition)
+
+    async def create_property(self, class_name: str, property_definition: Dict) -> None:
+        await self._json("POST", f"/schema/{class_name}/properties", property_definition)
+
+    async def delete_class(self, class_name: str) -> None:
+        await self._json("DELETE", f"/schema/{class_name}")
+
+    async def delete_alias(self, alias: str) -> None:
+        await self._json("DELETE", f"/aliases/{alias}", expected_status=(200, 204, 404))
+
+    async def list_objects(self, class_name: str, limit: int, after: Optional[str] = None) -> List[Dict]:
+        params = {"class": class_name, "limit": limit, "include": "vector"}
+        if after:
+            params["after"] = after
+        return ((await self._json("GET", "/objects", params=params)) or {}).get("objects") or []
+
+    async def batch_objects(self, objects: List[Dict]) -> List[Dict]:
+        return await self._json("POST", "/batch/objects", {"objects": objects}) or []
+
+
+async def run_data_migration_async(rest: AsyncRestClient, class_name: str, transform, batch_size: int,
+                                   checkpoints=None, checkpoint_key: Optional[str] = None) -> Dict:
+    """
+    Asynchronous counterpart of `weaviate_migrate.backfill.run_data_migration`.
+
+    The next page is read while the writes of up to `MAX_PENDING_WRITES`
+    earlier pages are in flight. A cursor is checkpointed only once its page
+    and every page before it have been written.
+    """
+    after = checkpoints.get(checkpoint_key) if checkpoints else None
+    stats = {"read": 0, "written": 0, "seconds": 0.0}
+    pending = deque()
+    start = time.perf_counter()
+
+    async def write(objects):
+        check_batch_results(class_name, await rest.batch_objects(batch_payload(class_name, objects)))
+
+    async def settle(keep):
+        while len(pending) > keep:
+            task, cursor = pending.popleft()
+            if task is not None:
+                await task
+            if checkpoints:
+                checkpoints.set(checkpoint_key, cursor)
+
+    try:
+        while True:
+            page = await rest.list_objects(class_name, batch_size, after)
+            if not page:
+                break
+            changed = []
+            for obj in page:
+                properties = transform(dict(obj.get("properties") or {}))
+                if properties is not None:
+                    changed.append(dict(obj, properties=properties))
+            stats["read"] += len(page)
+            stats["written"] += len(changed)
+            pending.append((asyncio.ensure_future(write(changed)) if changed else None, page[-1]["id"]))
+            await settle(MAX_PENDING_WRITES)
+            if len(page) < batch_size:
+                break
+            after = page[-1]["id"]
+        await settle(0)
+    finally:
+        for task, _ in pending:
+            if task is not None:
+                task.cancel()
+
+    if checkpoints:
+        checkpoints.clear(checkpoint_key)
+    stats["seconds"] = time.perf_counter() - start
+    return stats
+
+
+class AsyncExecutor(Executor):
+    """
+    Runs a graph of schema operations on an asyncio event loop.
+
+    Every operation is a task that starts as soon as its dependencies have
+    succeeded. Schema calls, readiness polling and data batches go through
+    one `AsyncRestClient`, which bounds the number of requests in flight.
+    Rebuilds keep their own worker threads and run in the default executor.
+
+    `execute` blocks like `Executor.execute`, so the executor can be used
+    anywhere the threaded one is.
+    """
+
+    def __init__(self, client, index, url: str, headers: Union[Dict, Callable[[], Dict], None] = None,
+                 concurrency: int = DEFAULT_CONCURRENCY, checkpoints=None,
+                 ready_timeout: float = DEFAULT_READY_TIMEOUT, transport: Optional[Transport] = None,
+                 ssl_context: Optional[ssl.SSLContext] = None, proxy: Optional[str] = None):
+        super().__init__(client, index, concurrency, checkpoints)
+        self.url = url
+        self.headers = headers
+        self.ready_timeout = ready_timeout
+        self.transport = transport
+        self.ssl_context = ssl_context
+        self.proxy = proxy
+
+    @classmethod
+    def from_client(cls, client, index, concurrency: int = DEFAULT_CONCURRENCY, checkpoints=None) -> "AsyncExecutor":
+        """
+        Build an executor that talks to the same server as a synchronous
+        client, with its retry policy, proxies and TLS settings. Its headers
+        are read for every request, so refreshed OIDC tokens are used.
+        """
+        connection = client._connection
+        session = getattr(connection, "_session", None)
+        proxies = getattr(connection, "_proxies", None) or getattr(session, "proxies", None)
+        ssl_settings = None
+        if session is not None and hasattr(session, "verify"):
+            ssl_settings = ssl_context(session.verify, getattr(session, "cert", None))
+        transport = transport_of(client)
+        return cls(
+            client, index, connection.url, functools.partial(request_headers, connection), concurrency, checkpoints,
+            transport=transport.fork() if transport is not None else None,
+            ssl_context=ssl_settings,
+            proxy=select_proxy(connection.url, proxies, getattr(session, "trust_env", False)),
+        )
+
+    async def _refresh(self, rest: AsyncRestClient) -> None:
+        self.index.load(await rest.get_schema())
+        self.index.aliases = await rest.list_aliases()
+        self.index.fetch_count += 1
+
+    async def _call_async(self, rest: AsyncRestClient, call: str, *args):
+        """
+        Make one call of an operation. Schema calls and data migrations go
+        through `rest`; rebuilds and tenant operations are made by the
+        synchronous client in the default executor.
+        """
+        if call == "data_migration":
+            return await run_data_migration_async(rest, *args)
+        if call in ("create_class", "create_property", "delete_class", "delete_alias"):
+            return await getattr(rest, call)(*args)
+        return await asyncio.get_running_loop().run_in_executor(None, functools.partial(self._call, call, *args))
+
+    async def _apply_async(self, rest: AsyncRestClient, operation: Operation) -> None:
+        steps = self._steps(operation)
+        result = None
+        while True:
+            try:
+                call, args = steps.send(result)
+            except StopIteration:
+                return
+            result = await self._call_async(rest, call, *args)
+
+    async def run_operation_async(self, rest: AsyncRestClient, operation: Operation) -> OperationResult:
+        start = time.perf_counter()
+        try:
+            with operation_span(operation):
+                try:
+                    await self._apply_async(rest, operation)
+                except Exception as e:
+                    if not is_conflict(e):
+                        raise
+                    await self._refresh(rest)
+                    if not self._exists(operation):
+                        raise
+        except Exception as e:
+            logger.error(f"{operation} failed: {e}")
+            return OperationResult(operation, FAILED, e, time.perf_counter() - start)
+        return OperationResult(operation, SUCCEEDED, duration=time.perf_counter() - start)
+
+    async def execute_async(self, operations: List[Operation]) -> ExecutionReport:
+        report = ExecutionReport()
+        loop = asyncio.get_running_loop()
+        outcomes = {op: loop.create_future() for op in operations}
+
+        # Operations on a dependency cycle would wait for each other forever.
+        waiting_on = {op: len(op.depends_on) for op in operations}
+        dependents = {op: [] for op in operations}
+        for op in operations:
+            for dependency in op.depends_on:
+                dependents[dependency].append(op)
+        ordered = deque(op for op in operations if waiting_on[op] == 0)
+        reachable = set()
+        while ordered:
+            op = ordered.popleft()
+            reachable.add(op)
+            for dependent in dependents[op]:
+                waiting_on[dependent] -= 1
+                if waiting_on[dependent] == 0:
+                    ordered.append(dependent)
+        for op in operations:
+            if op not in reachable:
+                outcomes[op].set_result(OperationResult(op, SKIPPED, ValueError("Dependency cycle.")))
+
+        async with AsyncRestClient(self.url, self.headers, self.concurrency, transport=self.transport,
+                                   ssl_context=self.ssl_context, proxy=self.proxy) as rest:
+            await rest.wait_ready(self.ready_timeout)
+
+            async def run(operation):
+                for dependency in operation.depends_on:
+                    result = await outcomes[dependency]
+                    if result.status != SUCCEEDED:
+                        outcomes[operation].set_result(OperationResult(operation, SKIPPED, result.error))
+                        return
+                outcomes[operation].set_result(await self.run_operation_async(rest, operation))
+
+            await asyncio.gather(*(run(op) for op in operations if op in reachable))
+
+        for op in operations:
+            report.add(outcomes[op].result())
+        return report
+
+    def execute(self, operations: List[Operation]) -> ExecutionReport:
+        return asyncio.run(self.execute_async(operations))
@@ -0,0 +1,158 @@
+import os
+import json
+import time
+import logging
+import threading
+import importlib
+from typing import Callable, Dict, Iterator, List, Optional
+from weaviate_migrate.rest import batch_objects
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 500
+LOCAL_CHECKPOINT_FILENAME = ".weaviate_checkpoints.json"
+
+
+class DataMigrationError(Exception):
+    """
+    Raised when the batch API rejects objects written by a data migration.
+    """
+
+
+def load_transform(path: str) -> Callable:
+    """
+    Resolve a transform given as `package.module:function`.
+    """
+    module_name, _, attribute = path.partition(":")
+    if not attribute:
+        raise ValueError(f"Transform must be given as 'module:function', got '{path}'.")
+    transform = importlib.import_module(module_name)
+    for name in attribute.split("."):
+        transform = getattr(transform, name)
+    return transform
+
+
+class CheckpointStore:
+    """
+    Cursor positions of running data migrations, persisted to a JSON file
+    after every chunk so an interrupted run resumes where it stopped.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, str]:
+        if not os.path.exists(self.path):
+            return {}
+        with open(self.path, "r") as f:
+            return json.load(f)
+
+    def _save(self, checkpoints: Dict[str, str]) -> None:
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(checkpoints, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            return self._load().get(key)
+
+    def set(self, key: str, cursor: str) -> None:
+        with self._lock:
+            checkpoints = self._load()
+            checkpoints[key] = cursor
+            self._save(checkpoints)
+
+    def clear(self, key: str) -> None:
+        with self._lock:
+            checkpoints = self._load()
+            if checkpoints.pop(key, None) is not None:
+                self._save(checkpoints)
+
+
+def iter_pages(client, class_name: str, batch_size: int = DEFAULT_BATCH_SIZE,
+               after: Optional[str] = None, with_vector: bool = True) -> Iterator[List[Dict]]:
+    """
+    Stream the objects of a class page by page using cursor pagination.
+
+    Only one page is held in memory at a time.
+    """
+    while True:
+        response = client.data_object.get(
+            class_name=class_name, limit=batch_size, after=after, with_vector=with_vector
+        )
+        objects = (response or {}).get("objects") or []
+        if not objects:
+            return
+        yield objects
+        if len(objects) < batch_size:
+            return
+        after = objects[-1]["id"]
+
+
+def batch_payload(class_name: str, objects: List[Dict]) -> List[Dict]:
+    """
+    Batch API items for objects read from a class, keeping their UUIDs and
+    vectors.
+    """
+    batch = []
+    for obj in objects:
+        item = {"class": class_name, "id": obj["id"], "properties": obj["properties"]}
+        if obj.get("vector") is not None:
+            item["vector"] = obj["vector"]
+        batch.append(item)
+    return batch
+
+
+def check_batch_results(class_name: str, results: List[Dict]) -> None:
+    errors = [
+        r["result"]["errors"] for r in results
+        if isinstance(r, dict) and (r.get("result") or {}).get("errors")
+    ]
+    if errors:
+        raise DataMigrationError(f"{len(errors)} object(s) of {class_name} failed to write: {errors[0]}")
+
+
+def write_batch(client, class_name: str, objects: List[Dict]) -> None:
+    """
+    Write objects through the batch API, keeping their UUIDs and vectors.
+    """
+    check_batch_results(class_name, batch_objects(client, batch_payload(class_name, objects)))
+
+
+def run_data_migration(client, class_name: str, transform: Callable, batch_size: int = DEFAULT_BATCH_SIZE,
+                       checkpoints: Optional[CheckpointStore] = None, checkpoint_key: Optional[str] = None) -> Dict:
+    """
+    Stream every object of a class through `transform` and write back the
+    ones it changes.
+
+    The transform receives an object's properties and returns the new
+    properties, or None to leave the object untouched. Objects are written
+    back with their UUIDs and stored vectors, so nothing is re-vectorized.
+    After each chunk the cursor is checkpointed; a later run with the same
+    key resumes after it.
+    """
+    after = checkpoints.get(checkpoint_key) if checkpoints else None
+    if after:
+        logger.info(f"Resuming data migration of {class_name} after {after}")
+
+    stats = {"read": 0, "written": 0, "seconds": 0.0}
+    start = time.perf_counter()
+    for page in iter_pages(client, class_name, batch_size, after):
+        changed = []
+        for obj in page:
+            properties = transform(dict(obj.get("properties") or {}))
+            if properties is not None:
+                changed.append(dict(obj, properties=properties))
+        if changed:
+            write_batch(client, class_name, changed)
+        stats["read"] += len(page)
+        stats["written"] += len(changed)
+        if checkpoints:
+            checkpoints.set(checkpoint_key, page[-1]["id"])
+
+    if checkpoints:
+        checkpoints.clear(checkpoint_key)
+    stats["seconds"] = time.perf_counter() - start
+    return stats
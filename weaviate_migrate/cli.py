@@ -0,0 +1,61 @@
+import sys
+import argparse
+import importlib
+from typing import List, Optional
+
+# Subcommand name, module defining `add_arguments(parser)` and `run(args)`,
+# and one-line help. Modules are imported only when their subcommand runs.
+COMMANDS = {
+    "migrate": ("weaviate_migrate.commands.migrate", "Apply pending migrations."),
+    "plan": ("weaviate_migrate.commands.plan", "Estimate the cost of the pending migrations."),
+    "fleet": ("weaviate_migrate.commands.fleet", "Apply pending migrations to many clusters in parallel."),
+    "makemigrations": ("weaviate_migrate.commands.makemigrations", "Generate a migration from a target schema."),
+    "squashmigrations": (
+        "weaviate_migrate.commands.squashmigrations", "Squash a range of migrations into one snapshot."
+    ),
+    "manifest": ("weaviate_migrate.manifest", "Generate or check the migration folder manifest."),
+    "django-makemigrations": (
+        "weaviate_migrate.commands.django_makemigrations", "Generate a migration from Django models."
+    ),
+    "django-sync": ("weaviate_migrate.commands.django_sync", "Load the rows of Django models into Weaviate."),
+}
+DEFAULT_COMMAND = "migrate"
+PROG = "weaviate-migrate"
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Top-level parser, listing the subcommands without importing them.
+    """
+    parser = argparse.ArgumentParser(
+        prog=PROG,
+        description="Schema migrations for Weaviate.",
+        epilog=f"Without a subcommand, the arguments are passed to `{DEFAULT_COMMAND}`.",
+    )
+    subparsers = parser.add_subparsers(title="commands", metavar="command")
+    for name, (_, help_text) in COMMANDS.items():
+        subparsers.add_parser(name, help=help_text, add_help=False)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if not argv or argv[0] in ("-h", "--help"):
+        build_parser().print_help()
+        return
+
+    if argv[0] in COMMANDS:
+        name, argv = argv[0], argv[1:]
+    else:
+        # `weaviate-migrate --url ...` predates the subcommands.
+        name = DEFAULT_COMMAND
+    module_name, help_text = COMMANDS[name]
+    module = importlib.import_module(module_name)
+
+    parser = argparse.ArgumentParser(prog=f"{PROG} {name}", description=help_text)
+    module.add_arguments(parser)
+    module.run(parser.parse_args(argv))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,47 +1,88 @@
 import os  
 import sys  
+import json
+import hashlib
 import argparse  
+from typing import Callable, Dict, List, Optional, Tuple
 from weaviate_migrate.commands.makemigrations import make_migrations  
-from weaviate import Client
-import weaviate
+from weaviate_migrate import transport
+from weaviate_migrate.schema_cache import DEFAULT_CACHE_TTL, SchemaCache
+
+FINGERPRINTS_FILENAME = ".django_fingerprints.json"
+# Bumped whenever the mapping from models to classes changes, so cached
+# fingerprints from an older version count as changed.
+FINGERPRINT_VERSION = 3
+
+DJANGO_TYPE_MAPPING = {  
+    'CharField': 'string',  
+    'TextField': 'text',  
+    'IntegerField': 'int',  
+    'BigIntegerField': 'int',  # Weaviate 'int' can handle both IntegerField and BigIntegerField ranges  
+    'SmallIntegerField': 'int',  
+    'PositiveIntegerField': 'int',  
+    'PositiveSmallIntegerField': 'int',  
+    'FloatField': 'number',  
+    'DecimalField': 'number',  
+    'BooleanField': 'boolean',  
+    'NullBooleanField': 'boolean',  
+    'DateField': 'date',  
+    'DateTimeField': 'date',  # Weaviate 'date' can handle both DateField and DateTimeField  
+    'TimeField': 'string',  # Weaviate does not have a dedicated TimeField, so 'string' is a reasonable alternative  
+    'EmailField': 'email',  
+    'URLField': 'string',  
+    'UUIDField': 'uuid',  
+    'BinaryField': 'blob',  
+    'ImageField': 'blob',  
+    'FileField': 'blob',  
+    'ForeignKey': 'cref',  # Requires additional handling for references  
+    'OneToOneField': 'cref',  # Requires additional handling for references  
+    'ManyToManyField': 'cref',  # Requires additional handling for references  
+}  
+
 
 def django_field_to_weaviate_type(field):  
     """  
     Convert a Django field type to a Weaviate data type.  
     """  
-    type_mapping = {  
-        'CharField': 'string',  
-        'TextField': 'text',  
-        'IntegerField': 'int',  
-        'BigIntegerField': 'int',  # Weaviate 'int' can handle both IntegerField and BigIntegerField ranges  
-        'SmallIntegerField': 'int',  
-        'PositiveIntegerField': 'int',  
-        'PositiveSmallIntegerField': 'int',  
-        'FloatField': 'number',  
-        'DecimalField': 'number',  
-        'BooleanField': 'boolean',  
-        'NullBooleanField': 'boolean',  
-        'DateField': 'date',  
-        'DateTimeField': 'date',  # Weaviate 'date' can handle both DateField and DateTimeField  
-        'TimeField': 'string',  # Weaviate does not have a dedicated TimeField, so 'string' is a reasonable alternative  
-        'EmailField': 'email',  
-        'URLField': 'string',  
-        'UUIDField': 'uuid',  
-        'BinaryField': 'blob',  
-        'ImageField': 'blob',  
-        'FileField': 'blob',  
-        'ForeignKey': 'cref',  # Requires additional handling for references  
-        'OneToOneField': 'cref',  # Requires additional handling for references  
-        'ManyToManyField': 'cref',  # Requires additional handling for references  
-    }  
-
-  
-    field_type = field.get_internal_type()  
-    if field_type in type_mapping:  
-        return type_mapping[field_type]  
-    else:  
-        return 'string'  # Default to 'string' for unsupported field types   
+    # Default to 'string' for unsupported field types
+    return DJANGO_TYPE_MAPPING.get(field.get_internal_type(), 'string')
   
+def property_name(field) -> str:
+    """
+    Name of the property a field maps to. Weaviate reserves `id` for the
+    object UUID, so a field of that name, usually the implicit primary key,
+    maps to `pk`, which Django forbids as a field name.
+    """
+    return "pk" if field.name == "id" else field.name
+
+
+RELATION_CARDINALITY = {
+    'ForeignKey': 'toOne',
+    'OneToOneField': 'toOne',
+    'ManyToManyField': 'many',
+}
+
+
+def reference_definitions(models: List) -> List[Dict]:
+    """
+    Cross-references between the classes of `models`: one per foreign key,
+    one-to-one or many-to-many field whose target is one of `models`.
+    """
+    selected = set(models)
+    definitions = []
+    for model in models:
+        for field in list(model._meta.fields) + list(model._meta.many_to_many):
+            cardinality = RELATION_CARDINALITY.get(field.get_internal_type())
+            if cardinality and field.related_model in selected:
+                definitions.append({
+                    "field_name": field.name,
+                    "source_class": model.__name__,
+                    "target_class": field.related_model.__name__,
+                    "cardinality": cardinality,
+                })
+    return definitions
+
+
 def add_cross_references(weaviate_schema, cross_references):  
     for cross_reference in cross_references:  
         field_name = cross_reference['field_name']  
@@ -62,85 +103,209 @@ def add_cross_references(weaviate_schema, cross_references):
 
 
 
-def generate_weaviate_schema_from_django_models(model_prefix):  
-    from django.apps import apps  
-  
-    weaviate_schema = []  
-  
-    for model in apps.get_models():  
-        if model.__module__ != __name__:  
-            continue  
-
-        # Check if model name starts with 'model_prefix'  
-        if not model.__name__.startswith(model_prefix):  
-            continue  
-
-        weaviate_class = {  
-            "class": model.__name__,  
-            "properties": []  
-        }  
-  
-        for field in model._meta.fields:  
-            if field.get_internal_type() == "ForeignKey":  
-                property_type = "cref"  
-            else:  
-                property_type = django_field_to_weaviate_type(field)  
-  
-            weaviate_property = {  
-                "name": field.name,  
-                "type": property_type  
-            }  
-            weaviate_class["properties"].append(weaviate_property)  
-  
-        weaviate_schema.append(weaviate_class)  
-  
-    return weaviate_schema  
+def _describe_field(field) -> Dict:
+    related_model = field.related_model
+    return {
+        "name": field.name,
+        "type": field.get_internal_type(),
+        "null": field.null,
+        "unique": field.unique,
+        "primaryKey": field.primary_key,
+        "to": related_model._meta.label if related_model is not None else None,
+    }
+
+
+def model_fingerprint(model) -> str:
+    """
+    Stable hash of everything the generated class depends on: the model's
+    fields and their types, its relations and its options.
+    """
+    meta = model._meta
+    description = {
+        "version": FINGERPRINT_VERSION,
+        "label": meta.label,
+        "class": model.__name__,
+        "options": {"dbTable": meta.db_table, "proxy": meta.proxy, "managed": meta.managed},
+        "fields": [_describe_field(f) for f in meta.fields],
+        "manyToMany": [_describe_field(f) for f in meta.many_to_many],
+    }
+    encoded = json.dumps(description, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def model_to_weaviate_class(model) -> Dict:
+    """
+    Class of a model. Relation fields are left to `add_cross_references`.
+    """
+    return {
+        "class": model.__name__,
+        "properties": [
+            {"name": property_name(field), "type": data_type}
+            for field in model._meta.fields
+            for data_type in [django_field_to_weaviate_type(field)]
+            if data_type != "cref"
+        ],
+    }
+
+
+def get_models(model_prefix: str = "", app_labels: Optional[List[str]] = None) -> List:
+    """
+    Models whose name starts with `model_prefix`, from the given apps only
+    when `app_labels` is set.
+    """
+    from django.apps import apps
+
+    if app_labels:
+        models = [m for label in app_labels for m in apps.get_app_config(label).get_models()]
+    else:
+        models = apps.get_models()
+    return [m for m in models if m.__name__.startswith(model_prefix)]
+
+
+def generate_weaviate_schema_from_django_models(model_prefix="", app_labels=None):  
+    return [model_to_weaviate_class(model) for model in get_models(model_prefix, app_labels)]
+
+
+class ModelFingerprints:
+    """
+    Fingerprints of the models the migration folder was last generated
+    from, kept next to the migrations in `.django_fingerprints.json`.
+
+    Models whose fingerprint is unchanged are skipped on the next run, so
+    regenerating only introspects, diffs and fetches the classes of models
+    that were added, changed or removed.
+    """
+
+    def __init__(self, migration_folder: str):
+        self.path = os.path.join(migration_folder, FINGERPRINTS_FILENAME)
+        self.entries = {}
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        if data.get("version") == FINGERPRINT_VERSION:
+            self.entries = data["models"]
+
+    def changes(self, models: List, model_prefix: str = "",
+                app_labels: Optional[List[str]] = None) -> Tuple[Dict, List[str]]:
+        """
+        Fingerprints of the models that are new or changed, by model label,
+        and labels of the previously seen models in scope that are gone.
+        """
+        changed = {}
+        for model in models:
+            fingerprint = model_fingerprint(model)
+            entry = self.entries.get(model._meta.label)
+            if entry is None or entry["fingerprint"] != fingerprint:
+                changed[model._meta.label] = {
+                    "fingerprint": fingerprint, "class": model.__name__, "appLabel": model._meta.app_label
+                }
+        present = {model._meta.label for model in models}
+        removed = [
+            label for label, entry in self.entries.items()
+            if label not in present
+            and entry["class"].startswith(model_prefix)
+            and (not app_labels or entry["appLabel"] in app_labels)
+        ]
+        return changed, sorted(removed)
+
+    def update(self, changed: Dict, removed: List[str]) -> None:
+        self.entries.update(changed)
+        for label in removed:
+            self.entries.pop(label, None)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"version": FINGERPRINT_VERSION, "models": self.entries}, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+
+def make_django_migrations(migration_folder: str, fetch_schema: Callable[[], Dict], model_prefix: str = "",
+                           app_labels: Optional[List[str]] = None,
+                           cross_references: Optional[List[Dict]] = None, allow_rebuild: bool = False) -> bool:
+    """
+    Write a migration for the models that changed since the last run.
+
+    Only the classes of added, changed or removed models are passed to
+    `make_migrations`, on both sides of the diff. `fetch_schema` returns the
+    live schema and is not called when no model changed. Cross-references
+    default to those derived from the models' relation fields, and classes
+    that need a rebuild are only rebuilt with `allow_rebuild`. Returns
+    whether a migration was written.
+    """
+    fingerprints = ModelFingerprints(migration_folder)
+    models = get_models(model_prefix, app_labels)
+    changed, removed = fingerprints.changes(models, model_prefix, app_labels)
+    if not changed and not removed:
+        print("No changes in Django models.")
+        return False
+
+    desired_classes = [model_to_weaviate_class(m) for m in models if m._meta.label in changed]
+    if cross_references is None:
+        cross_references = reference_definitions(models)
+    add_cross_references(desired_classes, cross_references)
+    class_names = {c["class"] for c in desired_classes} | {fingerprints.entries[label]["class"] for label in removed}
+
+    existing_schema = fetch_schema() or {}
+    existing_classes = [c for c in existing_schema.get("classes") or [] if c["class"] in class_names]
+
+    make_migrations(
+        None, migration_folder, {"classes": desired_classes}, {"classes": existing_classes}, allow_rebuild
+    )
+    fingerprints.update(changed, removed)
+    return True
   
   
-def main():  
-    parser = argparse.ArgumentParser(description="Create Weaviate migrations based on Django models.")  
+def add_arguments(parser):  
     parser.add_argument("--url", required=True, help="Weaviate URL.")  
     parser.add_argument("--api-key", required=True, help="Weaviate API key.")  
     parser.add_argument("--folder", required=True, help="Migrations folder.")  
     parser.add_argument("--django-settings", required=True, help="Path to Django settings module.")  
-    parser.add_argument("--model-prefix", required=True, help="Model prefix to designate weaviate models.")  
-    args = parser.parse_args()  
-  
+    parser.add_argument("--model-prefix", default="", help="Model prefix to designate weaviate models.")  
+    parser.add_argument(
+        "--app-label", action="append", dest="app_labels",
+        help="Only introspect the models of this app; can be repeated."
+    )
+    parser.add_argument(
+        "--rebuild", action="store_true",
+        help="Generate rebuild_class operations for classes with changed or removed properties."
+    )
+    parser.add_argument("--refresh", action="store_true", help="Ignore the cached schema and refetch it.")
+    parser.add_argument(
+        "--cache-ttl", type=float, default=DEFAULT_CACHE_TTL,
+        help="Seconds a cached schema is reused for without asking the server; 0 disables the cache "
+             "(default: %(default)s)."
+    )
+    transport.add_arguments(parser)
+
+
+def run(args):  
 
     import django  
     django.setup()  
-  
-    # Generate Weaviate schema from Django models  
-    weaviate_schema = generate_weaviate_schema_from_django_models(args.model_prefix)  
-
-    cross_references = [  
-        {  
-            "field_name": "hasParagraphs",  
-            "source_class": "SourceClass",  
-            "target_class": "TargetClass",  
-            "cardinality": "many"  
-        },  
-        {  
-            "field_name": "relatedItem",  
-            "source_class": "AnotherSourceClass",  
-            "target_class": "AnotherTargetClass",  
-            "cardinality": "toOne"  
-        }  
-    ]  
-
-    # Add cross-references between classes  
-    add_cross_references(weaviate_schema, cross_references)  
-
-    if args.api_key:
-        auth_config = weaviate.auth.AuthApiKey(
-            api_key=args.api_key)
-
-        client = Client(args.url, auth_client_secret=auth_config)  
-    else:
-        client = Client(args.url)
-    
-    # Create migrations based on the generated schema  
-    make_migrations(client, args.folder, weaviate_schema)  
+
+    def fetch_schema():
+        import weaviate
+        from weaviate import Client
+
+        if args.api_key:
+            auth_config = weaviate.auth.AuthApiKey(
+                api_key=args.api_key)
+
+            client = Client(args.url, auth_client_secret=auth_config)  
+        else:
+            client = Client(args.url)
+        client = transport.configure(client, args)
+        return SchemaCache(ttl=args.cache_ttl).fetch(client, args.url, refresh=args.refresh)
+
+    # Create migrations for the models that changed since the last run
+    make_django_migrations(args.folder, fetch_schema, args.model_prefix, args.app_labels, allow_rebuild=args.rebuild)
+
+
+def main():  
+    parser = argparse.ArgumentParser(description="Create Weaviate migrations based on Django models.")  
+    add_arguments(parser)  
+    run(parser.parse_args())  
   
   
 if __name__ == "__main__":  
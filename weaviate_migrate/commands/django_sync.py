@@ -0,0 +1,682 @@
+import os
+import json
+import time
+import uuid
+import base64
+import logging
+import argparse
+import datetime
+import functools
+import multiprocessing
+from collections import deque
+from decimal import Decimal
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, ALL_COMPLETED, FIRST_COMPLETED, wait
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+from weaviate_migrate import transport
+from weaviate_migrate.backfill import DEFAULT_BATCH_SIZE, check_batch_results, iter_pages
+from weaviate_migrate.commands.django_makemigrations import (
+    RELATION_CARDINALITY, django_field_to_weaviate_type, get_models, property_name, reference_definitions,
+)
+from weaviate_migrate.ledger import SYNC_STATE_CLASS
+from weaviate_migrate.rest import batch_delete_objects, batch_objects, batch_references, class_exists
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 2000
+LOCAL_SYNC_STATE_FILENAME = ".weaviate_sync_state.json"
+# Reconciliation compares the objects in 16 ** RECONCILE_PREFIX_LENGTH UUID
+# ranges, one per UUID prefix.
+RECONCILE_PREFIX_LENGTH = 2
+# Namespace of the UUIDs of synced rows: the same row always maps to the same
+# object, so re-running a sync overwrites instead of duplicating.
+DJANGO_UUID_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, "https://github.com/TonyLLondon/weaviate-migrate/django")
+
+BEACON_PREFIX = "weaviate://localhost"
+
+# (property name, attribute name, Weaviate data type) of a synced field.
+SyncField = Tuple[str, str, str]
+# Data type of a synced toOne reference, followed by the target model label.
+REFERENCE_TYPE_PREFIX = "cref:"
+
+
+def object_uuid(model_label: str, pk) -> str:
+    """
+    Deterministic UUID of the object synced from a row.
+    """
+    return str(uuid.uuid5(DJANGO_UUID_NAMESPACE, f"{model_label.lower()}:{pk}"))
+
+
+def connect_client(url: str, api_key: Optional[str] = None, max_retries: int = transport.DEFAULT_MAX_RETRIES,
+                   max_concurrency: int = transport.DEFAULT_MAX_CONCURRENCY):
+    """
+    A client whose requests are retried and adaptively limited. Each worker
+    process connects with its own transport.
+    """
+    return transport.connect(url, api_key, max_retries, max_concurrency)
+
+
+def to_weaviate_value(value, data_type: str):
+    """
+    Convert a value read from the database to its JSON form for `data_type`.
+    """
+    if value is None:
+        return None
+    if data_type.startswith(REFERENCE_TYPE_PREFIX):
+        return [{"beacon": label_beacon(data_type[len(REFERENCE_TYPE_PREFIX):], value)}]
+    if data_type == "date":
+        if not isinstance(value, datetime.datetime):
+            value = datetime.datetime.combine(value, datetime.time())
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=datetime.timezone.utc)
+        return value.isoformat()
+    if data_type in ("string", "text", "email", "uuid"):
+        return value.isoformat() if isinstance(value, datetime.time) else str(value)
+    if data_type == "number":
+        return float(value)
+    if data_type == "blob":
+        return base64.b64encode(bytes(value)).decode("ascii") if isinstance(value, (bytes, memoryview)) else value
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+def sync_fields(model, targets=()) -> List[SyncField]:
+    """
+    Fields of a model that are synced as properties, with the same types
+    `weaviate-django-makemigrations` gives them.
+
+    Foreign keys and one-to-one fields to one of `targets` are synced as
+    the beacon of their target, so rewriting an object keeps its toOne
+    references. Many-to-many references live outside the row; see
+    `many_to_many_fields`.
+    """
+    targets = set(targets)
+    fields = []
+    for field in model._meta.fields:
+        data_type = django_field_to_weaviate_type(field)
+        if data_type != "cref":
+            fields.append((property_name(field), field.attname, data_type))
+        elif field.related_model in targets:
+            attname = field.attname if field.target_field.primary_key else f"{field.name}__pk"
+            fields.append((field.name, attname, f"{REFERENCE_TYPE_PREFIX}{field.related_model._meta.label}"))
+    return fields
+
+
+def many_to_many_fields(model, targets=()) -> List:
+    """
+    Many-to-many fields of a model to one of `targets`. Writing an object
+    drops their references, which are added back by the batch reference
+    API.
+    """
+    return [
+        field for field in model._meta.many_to_many
+        if RELATION_CARDINALITY.get(field.get_internal_type()) and field.related_model in set(targets)
+    ]
+
+
+def iter_row_batches(model, attnames: List[str], batch_size: int = DEFAULT_BATCH_SIZE,
+                     chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[List[tuple]]:
+    """
+    Stream the rows of a model as value tuples, `batch_size` rows at a time.
+
+    The queryset is read with a server-side cursor where the database
+    supports one, fetching `chunk_size` rows per round trip, so memory does
+    not grow with the size of the table.
+    """
+    rows = model._default_manager.order_by().values_list(*attnames).iterator(chunk_size=chunk_size)
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def rows_to_objects(class_name: str, model_label: str, fields: List[SyncField], pk_index: int,
+                    rows: List[tuple]) -> List[Dict]:
+    return [
+        {
+            "class": class_name,
+            "id": object_uuid(model_label, row[pk_index]),
+            "properties": {
+                name: to_weaviate_value(value, data_type) for (name, _, data_type), value in zip(fields, row)
+                if value is not None or not data_type.startswith(REFERENCE_TYPE_PREFIX)
+            },
+        }
+        for row in rows
+    ]
+
+
+_worker_client = None
+
+
+def _init_worker(connect: Callable) -> None:
+    global _worker_client
+    _worker_client = connect()
+
+
+def _write_rows(class_name: str, model_label: str, fields: List[SyncField], pk_index: int,
+                rows: List[tuple], client=None) -> int:
+    """
+    Convert and write one batch of rows. Runs in a worker process, where
+    the client is the one created by `_init_worker`.
+    """
+    client = client or _worker_client
+    objects = rows_to_objects(class_name, model_label, fields, pk_index, rows)
+    check_batch_results(class_name, batch_objects(client, objects))
+    return len(rows)
+
+
+def sync_model(model, client=None, pool: Optional[ProcessPoolExecutor] = None, workers: int = 0,
+               batch_size: int = DEFAULT_BATCH_SIZE, chunk_size: int = DEFAULT_CHUNK_SIZE, targets=()) -> Dict:
+    """
+    Write every row of a model to its class, with its toOne references to
+    `targets`.
+
+    Rows are converted and written by `pool` when it is given, with at most
+    twice `workers` batches in flight, or in this process with `client`
+    otherwise. Returns the number of rows, the elapsed seconds and the rate.
+    """
+    fields = sync_fields(model, targets)
+    attnames = [attname for _, attname, _ in fields]
+    pk_index = attnames.index(model._meta.pk.attname)
+    args = (model.__name__, model._meta.label, fields, pk_index)
+
+    rows = 0
+    in_flight = set()
+
+    def drain(return_when):
+        nonlocal in_flight, rows
+        done, in_flight = wait(in_flight, return_when=return_when)
+        for future in done:
+            rows += future.result()
+
+    start = time.perf_counter()
+    for batch in iter_row_batches(model, attnames, batch_size, chunk_size):
+        if pool is None:
+            rows += _write_rows(*args, batch, client=client)
+            continue
+        in_flight.add(pool.submit(_write_rows, *args, batch))
+        if len(in_flight) >= max(workers, 1) * 2:
+            drain(FIRST_COMPLETED)
+    if in_flight:
+        drain(ALL_COMPLETED)
+
+    seconds = time.perf_counter() - start
+    return {"rows": rows, "seconds": seconds, "rowsPerSecond": rows / seconds if seconds else 0.0}
+
+
+def label_beacon(model_label: str, pk) -> str:
+    return f"{BEACON_PREFIX}/{model_label.rsplit('.', 1)[-1]}/{object_uuid(model_label, pk)}"
+
+
+def beacon(model, pk) -> str:
+    return label_beacon(model._meta.label, pk)
+
+
+def iter_reference_pairs(model, field, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                         pks: Optional[List] = None) -> Iterator[tuple]:
+    """
+    Stream the `(source pk, target pk)` pairs of a relation field, only
+    those of the rows `pks` when it is given.
+
+    Foreign keys and one-to-one fields are read from the model's own table.
+    Many-to-many pairs are read from the through table, so neither side is
+    loaded into memory.
+    """
+    if field.many_to_many:
+        through = field.remote_field.through
+        source = through._meta.get_field(field.m2m_field_name()).attname
+        target = through._meta.get_field(field.m2m_reverse_field_name()).attname
+        pairs = through._default_manager.order_by()
+        if pks is not None:
+            pairs = pairs.filter(**{f"{source}__in": pks})
+        pairs = pairs.values_list(source, target)
+    else:
+        target = field.attname if field.target_field.primary_key else f"{field.name}__pk"
+        pairs = model._default_manager.order_by().filter(**{f"{field.attname}__isnull": False})
+        if pks is not None:
+            pairs = pairs.filter(pk__in=pks)
+        pairs = pairs.values_list("pk", target)
+    return pairs.iterator(chunk_size=chunk_size)
+
+
+def iter_reference_batches(model, field, batch_size: int = DEFAULT_BATCH_SIZE,
+                           chunk_size: int = DEFAULT_CHUNK_SIZE, pks: Optional[List] = None) -> Iterator[List[Dict]]:
+    target = field.related_model
+    batch = []
+    for source_pk, target_pk in iter_reference_pairs(model, field, chunk_size, pks):
+        batch.append({"from": f"{beacon(model, source_pk)}/{field.name}", "to": beacon(target, target_pk)})
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _write_references(client, class_name: str, references: List[Dict]) -> int:
+    check_batch_results(class_name, batch_references(client, references))
+    return len(references)
+
+
+def backfill_references(models: List, client, workers: int = 1, batch_size: int = DEFAULT_BATCH_SIZE,
+                        chunk_size: int = DEFAULT_CHUNK_SIZE) -> Dict[str, Dict]:
+    """
+    Add the many-to-many cross-references between `models`, as
+    `weaviate-django-makemigrations` defines them, to the synced objects.
+    Foreign keys and one-to-one fields are written with the objects by
+    `sync_models`.
+
+    Pairs are mapped to the objects' deterministic UUIDs and added through
+    the batch reference API by up to `workers` concurrent requests, with at
+    most twice that many batches in memory. Returns the stats per
+    `label.field`.
+    """
+    by_class = {model.__name__: model for model in models}
+    results = {}
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+        for definition in reference_definitions(models):
+            model = by_class[definition["source_class"]]
+            field = model._meta.get_field(definition["field_name"])
+            if not field.many_to_many:
+                continue
+            references = 0
+            in_flight = set()
+
+            def drain(return_when):
+                nonlocal in_flight, references
+                done, in_flight = wait(in_flight, return_when=return_when)
+                for future in done:
+                    references += future.result()
+
+            start = time.perf_counter()
+            for batch in iter_reference_batches(model, field, batch_size, chunk_size):
+                in_flight.add(pool.submit(_write_references, client, model.__name__, batch))
+                if len(in_flight) >= max(workers, 1) * 2:
+                    drain(FIRST_COMPLETED)
+            if in_flight:
+                drain(ALL_COMPLETED)
+            seconds = time.perf_counter() - start
+
+            key = f"{model._meta.label}.{field.name}"
+            results[key] = {
+                "references": references, "seconds": seconds,
+                "referencesPerSecond": references / seconds if seconds else 0.0,
+            }
+            print(
+                f"Referenced {key}: {references} references in {seconds:.1f}s "
+                f"({results[key]['referencesPerSecond']:.0f} references/s)"
+            )
+    return results
+
+
+def _state_value(value):
+    """
+    JSON form of a watermark value. Datetimes keep their full precision so
+    the next keyset query resumes exactly after the last row.
+    """
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, (Decimal, uuid.UUID)):
+        return str(value)
+    return value
+
+
+class FileSyncState:
+    """
+    Sync state per model label, kept in a local JSON file: the incremental
+    watermark and the range digests of the last reconciliation.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def _load(self) -> Dict:
+        if not os.path.exists(self.path):
+            return {}
+        with open(self.path, "r") as f:
+            return json.load(f)
+
+    def get(self, model_label: str) -> Optional[Dict]:
+        return self._load().get(model_label)
+
+    def set(self, model_label: str, state: Dict) -> None:
+        states = self._load()
+        states[model_label] = state
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(states, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+class WeaviateSyncState:
+    """
+    Sync state stored in Weaviate, one object of a bookkeeping class per
+    model keyed by a UUID derived from its label.
+    """
+
+    def __init__(self, client, class_name: str = SYNC_STATE_CLASS):
+        self.client = client
+        self.class_name = class_name
+
+    def class_definition(self) -> Dict:
+        return {
+            "class": self.class_name,
+            "description": "Incremental sync state of weaviate-django-sync.",
+            "vectorizer": "none",
+            "properties": [
+                {"name": "model", "dataType": ["text"]},
+                {"name": "state", "dataType": ["text"]},
+            ],
+        }
+
+    def ensure(self) -> None:
+        """
+        Create the bookkeeping class unless it exists, with a lookup of the
+        class rather than a fetch of the whole schema.
+        """
+        if not class_exists(self.client, self.class_name):
+            self.client.schema.create_class(self.class_definition())
+
+    def object_uuid(self, model_label: str) -> str:
+        return str(uuid.uuid5(uuid.NAMESPACE_URL, f"weaviate-migrate/sync/{model_label}"))
+
+    def get(self, model_label: str) -> Optional[Dict]:
+        obj = self.client.data_object.get_by_id(self.object_uuid(model_label), class_name=self.class_name)
+        return json.loads(obj["properties"]["state"]) if obj else None
+
+    def set(self, model_label: str, state: Dict) -> None:
+        check_batch_results(self.class_name, batch_objects(self.client, [{
+            "class": self.class_name,
+            "id": self.object_uuid(model_label),
+            "properties": {"model": model_label, "state": json.dumps(state)},
+        }]))
+
+
+def sync_model_incremental(model, client, state_store, watermark_field: Optional[str] = None,
+                           pool: Optional[ProcessPoolExecutor] = None, workers: int = 0,
+                           batch_size: int = DEFAULT_BATCH_SIZE, targets=()) -> Dict:
+    """
+    Write the rows of a model that changed since the last incremental run.
+
+    Rows are read in keyset order on `(watermark_field, pk)`, defaulting to
+    the primary key for append-only tables, one `batch_size` page per query.
+    The watermark is saved after each page is written, in page order, so an
+    interrupted run resumes after the last written page. Rows whose
+    watermark field is NULL are only written by a full sync.
+
+    Objects are written with their toOne references to `targets`, and the
+    many-to-many references of each written page are added back.
+    """
+    from django.db.models import Q
+
+    meta = model._meta
+    fields = sync_fields(model, targets)
+    many_to_many = many_to_many_fields(model, targets)
+    attnames = [attname for _, attname, _ in fields]
+    pk_index = attnames.index(meta.pk.attname)
+    field = meta.get_field(watermark_field) if watermark_field else meta.pk
+    if field.attname not in attnames:
+        raise ValueError(f"{meta.label}.{field.name} cannot be used as a watermark.")
+    field_index = attnames.index(field.attname)
+    args = (model.__name__, meta.label, fields, pk_index)
+
+    state = state_store.get(meta.label) or {}
+    if state.get("field") == field.attname:
+        value, last_pk = state.get("value"), state.get("pk")
+    else:
+        value, last_pk = None, None
+    ordering = [field.attname] if field.primary_key else [field.attname, "pk"]
+
+    rows = 0
+    in_flight = deque()
+
+    def settle():
+        nonlocal rows
+        future, (mark, mark_pk), pks = in_flight.popleft()
+        rows += future.result() if pool is not None else future
+        for relation in many_to_many:
+            for references in iter_reference_batches(model, relation, batch_size, pks=pks):
+                _write_references(client, model.__name__, references)
+        state.update(field=field.attname, value=_state_value(mark), pk=_state_value(mark_pk))
+        state_store.set(meta.label, state)
+
+    start = time.perf_counter()
+    while True:
+        queryset = model._default_manager.order_by(*ordering)
+        if value is not None:
+            if field.primary_key:
+                queryset = queryset.filter(pk__gt=value)
+            else:
+                queryset = queryset.filter(
+                    Q(**{f"{field.attname}__gt": value}) | Q(**{field.attname: value, "pk__gt": last_pk})
+                )
+        page = list(queryset.values_list(*attnames)[:batch_size])
+        if not page:
+            break
+        value, last_pk = page[-1][field_index], page[-1][pk_index]
+        pks = [row[pk_index] for row in page]
+        if pool is None:
+            in_flight.append((_write_rows(*args, page, client=client), (value, last_pk), pks))
+        else:
+            in_flight.append((pool.submit(_write_rows, *args, page), (value, last_pk), pks))
+        if len(in_flight) >= max(workers, 1) * 2 or pool is None:
+            settle()
+        if len(page) < batch_size:
+            break
+    while in_flight:
+        settle()
+
+    seconds = time.perf_counter() - start
+    return {"rows": rows, "seconds": seconds, "rowsPerSecond": rows / seconds if seconds else 0.0}
+
+
+def range_digests(model, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Dict[str, List]:
+    """
+    Count and XOR digest of the object UUIDs of a model's rows, per UUID
+    prefix. Only primary keys are read.
+    """
+    label = model._meta.label
+    digests = {}
+    for pk in model._default_manager.order_by().values_list("pk", flat=True).iterator(chunk_size=chunk_size):
+        object_id = object_uuid(label, pk)
+        prefix = object_id[:RECONCILE_PREFIX_LENGTH]
+        count, digest = digests.get(prefix, (0, 0))
+        digests[prefix] = (count + 1, digest ^ uuid.UUID(object_id).int)
+    return {prefix: [count, format(digest, "032x")] for prefix, (count, digest) in sorted(digests.items())}
+
+
+def range_object_ids(model, prefix: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Set[str]:
+    """
+    Object UUIDs of a model's rows that start with `prefix`. Only primary
+    keys are read.
+    """
+    label = model._meta.label
+    pks = model._default_manager.order_by().values_list("pk", flat=True).iterator(chunk_size=chunk_size)
+    return {object_id for object_id in (object_uuid(label, pk) for pk in pks) if object_id.startswith(prefix)}
+
+
+def iter_object_ranges(client, class_name: str, batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[Tuple[str, List]]:
+    """
+    Stream the object UUIDs of a class one UUID prefix at a time, as
+    `(prefix, ids)`. Cursor pagination lists objects in UUID order, so only
+    one range is held in memory.
+    """
+    prefix, ids = None, []
+    for page in iter_pages(client, class_name, batch_size, with_vector=False):
+        for obj in page:
+            object_prefix = obj["id"][:RECONCILE_PREFIX_LENGTH]
+            if object_prefix != prefix:
+                if ids:
+                    yield prefix, ids
+                prefix, ids = object_prefix, []
+            ids.append(obj["id"])
+    if ids:
+        yield prefix, ids
+
+
+def reconcile_deletions(model, client, batch_size: int = DEFAULT_BATCH_SIZE,
+                        chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """
+    Delete the objects of rows that no longer exist, returning how many.
+
+    The object UUIDs of the table are hashed per UUID range, reading only
+    the primary keys. The class is then listed range by range and each
+    range's hash compared with the table's. Only the ranges that differ
+    have the table's UUIDs read, and their objects without a row are
+    deleted `batch_size` at a time.
+    """
+    digests = range_digests(model, chunk_size)
+    deleted = 0
+    stale = []
+    for prefix, ids in iter_object_ranges(client, model.__name__, batch_size):
+        digest = 0
+        for object_id in ids:
+            digest ^= uuid.UUID(object_id).int
+        if digests.get(prefix) == [len(ids), format(digest, "032x")]:
+            continue
+        present = range_object_ids(model, prefix, chunk_size)
+        stale.extend(object_id for object_id in ids if object_id not in present)
+        while len(stale) >= batch_size:
+            deleted += batch_delete_objects(client, model.__name__, stale[:batch_size])
+            stale = stale[batch_size:]
+    if stale:
+        deleted += batch_delete_objects(client, model.__name__, stale)
+    return deleted
+
+
+def sync_models(models: List, connect: Callable, workers: int = 0, batch_size: int = DEFAULT_BATCH_SIZE,
+                chunk_size: int = DEFAULT_CHUNK_SIZE, state_store=None, incremental: bool = False,
+                watermark_field: Optional[str] = None, reconcile: bool = False) -> Dict[str, Dict]:
+    """
+    Sync the rows of each model in turn, returning the stats per model label.
+    Objects carry their toOne references to the other models; many-to-many
+    references are added by `backfill_references` after a full sync, and
+    kept for the rows an incremental sync rewrites.
+
+    With `incremental`, only rows changed since the last incremental run
+    are written, keeping their state in `state_store`, and with
+    `reconcile` the objects of deleted rows are removed.
+    `connect` creates a client; with `workers` it is also called once in
+    each worker process, so it must be picklable.
+    """
+    if incremental and state_store is None:
+        raise ValueError("An incremental sync needs a sync state store.")
+    results = {}
+    client = connect()
+    if workers:
+        # Workers start lazily, on the first batches, while the parent's
+        # server-side cursor is open. Spawned rather than forked, they share
+        # neither its database connections nor that cursor; they only talk
+        # to Weaviate.
+        pool = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker, initargs=(connect,),
+        )
+    else:
+        pool = None
+    try:
+        for model in models:
+            if not incremental:
+                stats = sync_model(model, client, pool, workers, batch_size, chunk_size, models)
+            else:
+                stats = sync_model_incremental(
+                    model, client, state_store, watermark_field, pool, workers, batch_size, models
+                )
+            message = (
+                f"Synced {model._meta.label}: {stats['rows']} rows in {stats['seconds']:.1f}s "
+                f"({stats['rowsPerSecond']:.0f} rows/s)"
+            )
+            if reconcile:
+                stats["deleted"] = reconcile_deletions(model, client, batch_size, chunk_size)
+                message += f", {stats['deleted']} deleted"
+            results[model._meta.label] = stats
+            print(message)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return results
+
+
+def add_arguments(parser):
+    parser.add_argument("--url", required=True, help="Weaviate URL.")
+    parser.add_argument("--api-key", help="Weaviate API key (optional).")
+    parser.add_argument("--django-settings", help="Django settings module, if DJANGO_SETTINGS_MODULE is not set.")
+    parser.add_argument("--model-prefix", default="", help="Model prefix to designate weaviate models.")
+    parser.add_argument(
+        "--app-label", action="append", dest="app_labels",
+        help="Only sync the models of this app; can be repeated."
+    )
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Rows per batch request.")
+    parser.add_argument(
+        "--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Rows fetched per database round trip."
+    )
+    parser.add_argument(
+        "--workers", type=int, default=os.cpu_count() or 1,
+        help="Worker processes writing batches; 0 writes from this process (default: %(default)s)."
+    )
+    parser.add_argument(
+        "--incremental", action="store_true", help="Only sync rows changed since the last incremental run."
+    )
+    parser.add_argument(
+        "--watermark-field",
+        help="Field tracking row changes, e.g. updated_at (default: the primary key, for append-only tables)."
+    )
+    parser.add_argument(
+        "--reconcile", action="store_true", help="Delete the objects of rows that no longer exist."
+    )
+    parser.add_argument(
+        "--references", action="store_true",
+        help="After a full sync, add the cross-references of many-to-many fields."
+    )
+    parser.add_argument(
+        "--state", choices=["weaviate", "local"], default="weaviate",
+        help="Where the sync state is kept (default: %(default)s)."
+    )
+    parser.add_argument(
+        "--state-file", default=LOCAL_SYNC_STATE_FILENAME,
+        help="Path of the local sync state file (default: %(default)s)."
+    )
+    transport.add_arguments(parser)
+
+
+def run(args):
+    if args.django_settings:
+        os.environ.setdefault("DJANGO_SETTINGS_MODULE", args.django_settings)
+
+    import django
+    django.setup()
+
+    if args.references and args.incremental:
+        # Adding a reference an object already holds duplicates it. An
+        # incremental sync adds back the references of the rows it rewrites.
+        raise SystemExit("--references needs a full sync; an incremental sync keeps the references it rewrites.")
+
+    models = get_models(args.model_prefix, args.app_labels)
+    connect = functools.partial(connect_client, args.url, args.api_key, args.max_retries, args.max_concurrency)
+
+    state_store = None
+    if args.incremental:
+        if args.state == "local":
+            state_store = FileSyncState(args.state_file)
+        else:
+            state_store = WeaviateSyncState(connect())
+            state_store.ensure()
+    sync_models(
+        models, connect, args.workers, args.batch_size, args.chunk_size,
+        state_store, args.incremental, args.watermark_field, args.reconcile,
+    )
+    if args.references:
+        backfill_references(models, connect(), args.workers, args.batch_size, args.chunk_size)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load the rows of Django models into their Weaviate classes.")
+    add_arguments(parser)
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
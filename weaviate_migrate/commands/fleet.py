@@ -0,0 +1,227 @@
+import io
+import os
+import sys
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import redirect_stdout
+from typing import Callable, Dict, List, Optional
+from weaviate_migrate import transport
+from weaviate_migrate.commands.migrate import migrate
+from weaviate_migrate.executor import FAILED, SKIPPED, SUCCEEDED
+from weaviate_migrate.ledger import WeaviateLedger
+from weaviate_migrate.schema_cache import SchemaCache
+
+DEFAULT_PARALLELISM = 4
+# Lines of a cluster's migrate output kept in the report.
+OUTPUT_TAIL = 50
+
+
+def load_inventory(path: str) -> List[Dict]:
+    """
+    Read the clusters of an inventory file.
+
+    The file is JSON: a list of clusters, or an object with a `clusters`
+    list. Each cluster has a unique `name` and a `url`, and optionally
+    `api_key_env`, the environment variable holding its API key, and
+    `canary`, to migrate it in the first wave. Keys themselves never appear
+    in the inventory.
+    """
+    with open(path, "r") as f:
+        inventory = json.load(f)
+    clusters = inventory["clusters"] if isinstance(inventory, dict) else inventory
+    names = set()
+    for cluster in clusters:
+        if not cluster.get("name") or not cluster.get("url"):
+            raise ValueError(f"Every cluster in {path} needs a name and a url: {cluster}")
+        if cluster["name"] in names:
+            raise ValueError(f"Cluster {cluster['name']} is listed twice in {path}.")
+        names.add(cluster["name"])
+    return clusters
+
+
+def cluster_api_key(cluster: Dict) -> Optional[str]:
+    variable = cluster.get("api_key_env")
+    if not variable:
+        return None
+    if not os.environ.get(variable):
+        raise ValueError(f"Environment variable {variable} with the API key of {cluster['name']} is not set.")
+    return os.environ[variable]
+
+
+class _RecordingLedger(WeaviateLedger):
+    """
+    A ledger that remembers what it recorded, i.e. what this run applied.
+    """
+
+    def __init__(self, client):
+        super().__init__(client)
+        self.recorded = []
+
+    def record(self, name: str, checksum: str) -> None:
+        super().record(name, checksum)
+        self.recorded.append(name)
+
+
+def migrate_cluster(cluster: Dict, migration_folder: str, options: Dict,
+                    connect: Callable = transport.connect) -> Dict:
+    """
+    Apply the pending migrations of `migration_folder` to one cluster,
+    returning its report entry. Never raises: a failure is reported.
+
+    `options` are the keyword arguments of `migrate` plus `max_retries` and
+    `max_concurrency` of the transport. `connect(url, api_key, max_retries,
+    max_concurrency)` creates the client.
+    """
+    options = dict(options)
+    max_retries = options.pop("max_retries", transport.DEFAULT_MAX_RETRIES)
+    max_concurrency = options.pop("max_concurrency", transport.DEFAULT_MAX_CONCURRENCY)
+    result = {"name": cluster["name"], "url": cluster["url"], "status": FAILED, "applied": [], "error": None}
+    output = io.StringIO()
+    start = time.perf_counter()
+    try:
+        client = connect(cluster["url"], cluster_api_key(cluster), max_retries, max_concurrency)
+        ledger = _RecordingLedger(client)
+        try:
+            with redirect_stdout(output):
+                migrate(client, migration_folder, ledger, **options)
+        finally:
+            if not options.get("dry_run"):
+                # Even a failed run may have changed the schema.
+                SchemaCache().invalidate(cluster["url"])
+        result["applied"] = ledger.recorded
+        result["status"] = SUCCEEDED
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["seconds"] = round(time.perf_counter() - start, 3)
+    result["output"] = output.getvalue().splitlines()[-OUTPUT_TAIL:]
+    return result
+
+
+def _waves(clusters: List[Dict], canaries: Optional[List[str]]) -> List[List[Dict]]:
+    is_canary = (lambda c: c["name"] in canaries) if canaries else (lambda c: bool(c.get("canary")))
+    first = [c for c in clusters if is_canary(c)]
+    rest = [c for c in clusters if not is_canary(c)]
+    return [wave for wave in (first, rest) if wave]
+
+
+def _print_result(result: Dict) -> None:
+    if result["status"] == SUCCEEDED:
+        detail = f"{len(result['applied'])} migration(s) applied"
+    else:
+        detail = result["error"]
+    print(f"{result['name']}: {result['status']} in {result['seconds']:.1f}s ({detail})", flush=True)
+
+
+def apply_fleet(clusters: List[Dict], migration_folder: str, parallelism: int = DEFAULT_PARALLELISM,
+                canaries: Optional[List[str]] = None, options: Optional[Dict] = None,
+                connect: Callable = transport.connect) -> List[Dict]:
+    """
+    Migrate every cluster, `parallelism` at a time, returning one report
+    entry per cluster in inventory order.
+
+    Each cluster is migrated in a worker process, so its output, failures
+    and client state stay apart from the others; a failing cluster does
+    not stop the rest. Canary clusters, those named in `canaries` or
+    flagged in the inventory, are migrated first, and if one of them fails
+    the others are skipped. `connect` must be picklable.
+    """
+    if parallelism < 1:
+        raise ValueError("Parallelism must be at least 1.")
+    if not os.path.isdir(migration_folder):
+        raise ValueError(f"Migration folder {migration_folder} does not exist.")
+    results = {}
+    aborted = None
+    with ProcessPoolExecutor(max_workers=min(parallelism, len(clusters) or 1)) as pool:
+        waves = _waves(clusters, canaries)
+        for number, wave in enumerate(waves):
+            if aborted:
+                for cluster in wave:
+                    results[cluster["name"]] = {
+                        "name": cluster["name"], "url": cluster["url"], "status": SKIPPED, "applied": [],
+                        "error": aborted, "seconds": 0.0, "output": [],
+                    }
+                continue
+            futures = {
+                pool.submit(migrate_cluster, cluster, migration_folder, options or {}, connect): cluster
+                for cluster in wave
+            }
+            for future in as_completed(futures):
+                cluster = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # The worker process itself died.
+                    result = {"name": cluster["name"], "url": cluster["url"], "status": FAILED, "applied": [],
+                              "error": f"{type(e).__name__}: {e}", "seconds": 0.0, "output": []}
+                results[cluster["name"]] = result
+                _print_result(result)
+            failed_canaries = [c["name"] for c in wave if results[c["name"]]["status"] != SUCCEEDED]
+            if number == 0 and len(waves) > 1 and failed_canaries:
+                aborted = f"Canary cluster(s) failed: {', '.join(failed_canaries)}"
+    return [results[cluster["name"]] for cluster in clusters]
+
+
+def fleet_report(results: List[Dict], seconds: float) -> Dict:
+    return {
+        "seconds": round(seconds, 3),
+        "succeeded": sum(r["status"] == SUCCEEDED for r in results),
+        "failed": sum(r["status"] == FAILED for r in results),
+        "skipped": sum(r["status"] == SKIPPED for r in results),
+        "clusters": results,
+    }
+
+
+def add_arguments(parser):
+    parser.add_argument("--inventory", required=True, help="JSON file listing the clusters to migrate.")
+    parser.add_argument("--folder", default="migrations", help="Path to the migration folder.")
+    parser.add_argument(
+        "--parallelism", type=int, default=DEFAULT_PARALLELISM,
+        help="Clusters migrated at the same time (default: %(default)s)."
+    )
+    parser.add_argument(
+        "--canary", action="append", dest="canaries",
+        help="Migrate this cluster first, and the others only if it succeeds; can be repeated. "
+             "Overrides the canary flags of the inventory."
+    )
+    parser.add_argument(
+        "--concurrency", type=int, help="Parallel schema operations within each cluster."
+    )
+    parser.add_argument(
+        "--backend", choices=["sync", "async"], default="sync",
+        help="Apply each cluster's plan with worker threads or on an asyncio event loop."
+    )
+    parser.add_argument("--dry-run", action="store_true", help="Print each cluster's plan without applying it.")
+    parser.add_argument("--report", help="Write the per-cluster report to this JSON file.")
+    transport.add_arguments(parser)
+
+
+def run(args):
+    clusters = load_inventory(args.inventory)
+    options = {
+        "concurrency": args.concurrency, "backend": args.backend, "dry_run": args.dry_run,
+        "max_retries": args.max_retries, "max_concurrency": args.max_concurrency,
+    }
+    start = time.perf_counter()
+    results = apply_fleet(clusters, args.folder, args.parallelism, args.canaries, options)
+    report = fleet_report(results, time.perf_counter() - start)
+    print(
+        f"{report['succeeded']} succeeded, {report['failed']} failed, {report['skipped']} skipped "
+        f"of {len(results)} cluster(s) in {report['seconds']:.1f}s"
+    )
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(report, f, indent=2)
+    if report["failed"] or report["skipped"]:
+        sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply migrations to a fleet of Weaviate clusters.")
+    add_arguments(parser)
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,27 @@
 import os
 import json
-from weaviate import Client
 import argparse
-from typing import Dict, List
+from typing import Dict, List, Optional
 import logging
+from weaviate_migrate import telemetry, transport
+from weaviate_migrate.commands.migrate import load_migration
+from weaviate_migrate.ledger import LEDGER_CLASS, SYNC_STATE_CLASS, list_migration_files, resolve_squashed
+from weaviate_migrate.manifest import MIGRATION_FILE_RE, Manifest, register_migration
+from weaviate_migrate.planner import replay_migrations
+from weaviate_migrate.schema_cache import DEFAULT_CACHE_TTL, SchemaCache
 logger = logging.getLogger(__name__)
 MIGRATION_FILE_PATTERN = "{:04d}_migration.json"
 
-def get_schema(client: Client) -> Dict:
+def __getattr__(name):
+    # `weaviate` takes most of a second to import, so it is only loaded by
+    # the code paths that talk to a server. `Client` stays importable here.
+    if name == "Client":
+        from weaviate import Client
+        return Client
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def get_schema(client) -> Dict:
     """
     Get the current schema from Weaviate.
     """
@@ -22,9 +36,74 @@ def save_schema(schema, migration_path):
         json.dump(schema, f, indent=2)
 
 
+PROPERTY_FIELDS = (
+    "dataType",
+    "tokenization",
+    "indexFilterable",
+    "indexSearchable",
+    "moduleConfig",
+)
+CLASS_FIELDS = (
+    "moduleConfig",
+    "vectorIndexConfig",
+    "shardingConfig",
+    "replicationConfig",
+)
+# Description Weaviate gives the properties its auto-schema creates when an
+# object is written with an unknown field.
+AUTO_SCHEMA_DESCRIPTION = "This property was generated by Weaviate's auto-schema feature"
+
+
+def _matches(current, target) -> bool:
+    """
+    Whether the current value satisfies the target one.
+
+    Settings the target leaves out are not compared, so defaults filled in
+    by Weaviate (e.g. the full `vectorIndexConfig`) do not count as changes.
+    """
+    if target is None:
+        return True
+    if isinstance(target, dict) and isinstance(current, dict):
+        return all(_matches(current.get(k), v) for k, v in target.items())
+    return current == target
+
+
+def _changed_fields(current: Dict, target: Dict, fields) -> List[str]:
+    return [f for f in fields if not _matches(current.get(f), target.get(f))]
+
+
+def class_unchanged(current: Dict, target: Dict) -> bool:
+    """
+    Whether a live class already satisfies its target definition, in one
+    pass over the fields the diff compares and only the keys the target
+    specifies. Properties are compared pairwise in order; a reordered class
+    takes the full walk of `calculate_schema_diff`, which reports nothing
+    for it either.
+    """
+    current_props = current.get("properties") or []
+    target_props = target.get("properties") or []
+    if len(current_props) != len(target_props):
+        return False
+    for field in CLASS_FIELDS:
+        if field in target and not _matches(current.get(field), target[field]):
+            return False
+    for current_prop, target_prop in zip(current_props, target_props):
+        if current_prop["name"] != target_prop["name"]:
+            return False
+        for field in PROPERTY_FIELDS:
+            if field in target_prop and not _matches(current_prop.get(field), target_prop[field]):
+                return False
+    return True
+
+
 def calculate_schema_diff(current_schema: Dict, target_schema: Dict) -> Dict:
     """Calculates the difference between two Weaviate schemas.
 
+    Classes present on both sides are first checked with `class_unchanged`,
+    which ignores the settings the target leaves to server defaults;
+    unchanged classes are skipped without building their property maps.
+    Only classes and properties with differences appear in the result.
+
     Args:
         current_schema (Dict): The current Weaviate schema. Can be empty.
         target_schema (Dict): The target Weaviate schema. Can be empty.
@@ -33,70 +112,162 @@ def calculate_schema_diff(current_schema: Dict, target_schema: Dict) -> Dict:
         Dict: The schema diff containing:
             - classes_to_add: List of classes to add
             - classes_to_remove: List of classes to remove
+            - class_changes: Dict of changed class-level settings per class
             - properties_to_add: Dict of properties to add per class
             - properties_to_remove: Dict of properties to remove per class
-            - properties_to_change: Dict of properties to change per class
+            - properties_to_change: Dict per class mapping each changed
+              property to the list of its changed fields
     """
     migration_diff = {
         "classes_to_add": [],
         "classes_to_remove": [],
+        "class_changes": {},
         "properties_to_add": {},
         "properties_to_remove": {},
         "properties_to_change": {},
     }
 
-    # Handle empty current schema
-    if not current_schema:
-        migration_diff["classes_to_add"] = [
-            c["class"] for c in target_schema["classes"]
-        ]
-        return migration_diff
+    current_classes = {c["class"]: c for c in (current_schema or {}).get("classes") or []}
+    target_classes = {c["class"]: c for c in (target_schema or {}).get("classes") or []}
 
-    # Handle empty target schema
-    if not target_schema:
-        migration_diff["classes_to_remove"] = [
-            c["class"] for c in current_schema["classes"]
-        ]
-        return migration_diff
+    # Find classes to add and remove
+    migration_diff["classes_to_add"] = sorted(target_classes.keys() - current_classes.keys())
+    migration_diff["classes_to_remove"] = sorted(current_classes.keys() - target_classes.keys())
+
+    # Find changes in classes that exist in both schemas
+    for class_name in sorted(target_classes.keys() & current_classes.keys()):
+        current_class = current_classes[class_name]
+        target_class = target_classes[class_name]
+        if current_class == target_class or class_unchanged(current_class, target_class):
+            continue
+
+        class_changes = _changed_fields(current_class, target_class, CLASS_FIELDS)
+        if class_changes:
+            migration_diff["class_changes"][class_name] = class_changes
+
+        current_props = {p["name"]: p for p in current_class.get("properties") or []}
+        target_props = {p["name"]: p for p in target_class.get("properties") or []}
+
+        props_to_add = [p for p in target_props if p not in current_props]
+        props_to_remove = [p for p in current_props if p not in target_props]
+        props_to_change = {}
+        for name, target_prop in target_props.items():
+            if name in current_props:
+                changed = _changed_fields(current_props[name], target_prop, PROPERTY_FIELDS)
+                if changed:
+                    props_to_change[name] = changed
+
+        if props_to_add:
+            migration_diff["properties_to_add"][class_name] = props_to_add
+        if props_to_remove:
+            migration_diff["properties_to_remove"][class_name] = props_to_remove
+        if props_to_change:
+            migration_diff["properties_to_change"][class_name] = props_to_change
 
-    # Get all class names
-    current_classes = {c["class"] for c in current_schema["classes"]}
-    target_classes = {c["class"] for c in target_schema["classes"]}
+    return migration_diff
 
-    # Find classes to add and remove
-    classes_to_add = target_classes - current_classes
-    classes_to_remove = current_classes - target_classes
-    migration_diff["classes_to_add"] = list(classes_to_add)
-    migration_diff["classes_to_remove"] = list(classes_to_remove)
-
-    # Get properties for all classes that exist in both schemas
-    current_props = {
-        c["class"]: c["properties"]
-        for c in current_schema["classes"]
-        if c["class"] in target_classes
+def is_auto_created(property_definition: Dict) -> bool:
+    return (property_definition.get("description") or "").startswith(AUTO_SCHEMA_DESCRIPTION)
+
+
+def rebuild_operations(migration_diff: Dict, target_schema: Dict,
+                       current_schema: Optional[Dict] = None) -> List[Dict]:
+    """
+    `rebuild_class` operations for the classes whose changes Weaviate cannot
+    apply in place: changed or removed properties. Properties of
+    `current_schema` that Weaviate's auto-schema created are not counted as
+    removed.
+    """
+    target_classes = {c["class"]: c for c in target_schema.get("classes") or []}
+    auto_created = {
+        (c["class"], p["name"]) for c in (current_schema or {}).get("classes") or []
+        for p in c.get("properties") or [] if is_auto_created(p)
     }
-    target_props = {
-        c["class"]: c["properties"]
-        for c in target_schema["classes"]
-        if c["class"] in target_classes
+    removed = {
+        class_name for class_name, property_names in migration_diff["properties_to_remove"].items()
+        if any((class_name, name) not in auto_created for name in property_names)
     }
+    rebuilt = sorted(migration_diff["properties_to_change"].keys() | removed)
+    return [
+        {"type": "rebuild_class", "class": class_name, "definition": target_classes[class_name]}
+        for class_name in rebuilt
+    ]
 
-    # Find properties to add, remove or change
-    for class_name in target_classes & current_classes:
-        current_class_props = {p["name"] for p in current_props[class_name]}
-        target_class_props = {p["name"] for p in target_props[class_name]}
 
-        props_to_add = target_class_props - current_class_props
-        props_to_remove = current_class_props - target_class_props
-        props_to_change = target_class_props & current_class_props
+def added_definitions(migration_diff: Dict, target_schema: Dict) -> List[Dict]:
+    """
+    Definitions of the classes and properties the diff adds, in the
+    `classes` format `migrate` applies and the offline replay reads.
+    """
+    target_classes = {c["class"]: c for c in target_schema.get("classes") or []}
+    classes = [target_classes[class_name] for class_name in migration_diff["classes_to_add"]]
+    for class_name, property_names in sorted(migration_diff["properties_to_add"].items()):
+        target_props = {p["name"]: p for p in target_classes[class_name].get("properties") or []}
+        classes.append({"class": class_name, "properties": [target_props[name] for name in property_names]})
+    return classes
 
-        migration_diff["properties_to_add"][class_name] = list(props_to_add)
-        migration_diff["properties_to_remove"][class_name] = list(props_to_remove)
-        migration_diff["properties_to_change"][class_name] = list(props_to_change)
 
-    return migration_diff
+def replayable(migration: Dict) -> Dict:
+    """
+    The migration in the format `replay_migrations` reads.
 
-def make_migrations(client, migration_folder: str, desired_schema: Dict) -> None:
+    Diff files name the classes and properties they add; those whose
+    definitions the file does not carry, as in files written by older
+    versions, are replayed with their names only. The classes a diff
+    removes are not replayed as deletions, since `migrate` leaves them in
+    place.
+    """
+    if not any(key in migration for key in ("classes_to_add", "properties_to_add")):
+        return migration
+    classes = list(migration.get("classes") or [])
+    described = {c["class"] for c in classes}
+    described_properties = {(c["class"], p["name"]) for c in classes for p in c.get("properties") or []}
+    for class_name in migration.get("classes_to_add") or []:
+        if class_name not in described:
+            classes.append({"class": class_name, "properties": []})
+    for class_name, property_names in (migration.get("properties_to_add") or {}).items():
+        missing = [name for name in property_names if (class_name, name) not in described_properties]
+        if missing:
+            classes.append({"class": class_name, "properties": [{"name": name} for name in missing]})
+    return dict(migration, classes=classes)
+
+
+def next_migration_number(migration_folder: str) -> int:
+    """
+    Number of the next migration, from the manifest when there is one.
+    """
+    manifest = Manifest.load(migration_folder)
+    if manifest is not None:
+        return manifest.next_id()
+    migration_files = list_migration_files(migration_folder)
+    return int(MIGRATION_FILE_RE.match(migration_files[-1]).group(1)) + 1 if migration_files else 1
+
+
+def replay_schema(migration_folder: str) -> Dict:
+    """
+    Compute the schema the migration folder produces, without a server.
+    """
+    manifest = Manifest.load(migration_folder)
+    migrations = [
+        (migration_file, manifest.load_migration(migration_folder, migration_file) if manifest
+         else load_migration(os.path.join(migration_folder, migration_file)))
+        for migration_file in list_migration_files(migration_folder)
+    ]
+    migrations = [(migration_file, replayable(migration)) for migration_file, migration in migrations]
+    return replay_migrations(resolve_squashed(migrations, {})).to_schema()
+
+
+def make_migrations(client, migration_folder: str, desired_schema: Dict,
+                    existing_schema: Optional[Dict] = None, allow_rebuild: bool = False) -> None:
+    """
+    Write a migration from the existing schema to `desired_schema`.
+
+    The existing schema is fetched from `client` unless it is passed in,
+    e.g. from the schema cache or replayed from the migration folder.
+    Rebuilding a class copies all of its objects, so classes whose changes
+    need a rebuild are only rebuilt with `allow_rebuild`; otherwise they
+    are reported and left out.
+    """
     logger.info("Generating schema migration...")
     
     if not os.path.exists(migration_folder):
@@ -104,31 +275,46 @@ def make_migrations(client, migration_folder: str, desired_schema: Dict) -> None
     if not desired_schema:
         raise ValueError("Desired schema is empty.")
     
-    try: 
-        existing_schema = get_schema(client) 
-    except Exception as e:
-        logger.error(f"Could not get existing schema: {e}")
-        raise e 
+    if existing_schema is None:
+        try: 
+            with telemetry.span("fetch_schema"):
+                existing_schema = get_schema(client) 
+        except Exception as e:
+            logger.error(f"Could not get existing schema: {e}")
+            raise e 
+
+    # The bookkeeping classes of the migration ledger and of the Django sync
+    # are not part of the user schema.
+    if existing_schema and existing_schema.get("classes"):
+        existing_schema = dict(existing_schema, classes=[
+            c for c in existing_schema["classes"] if c["class"] not in (LEDGER_CLASS, SYNC_STATE_CLASS)
+        ])
     
-    migration_diff = calculate_schema_diff(existing_schema, desired_schema)
+    with telemetry.span("diff_schema"):
+        migration_diff = calculate_schema_diff(existing_schema, desired_schema)
+        classes = added_definitions(migration_diff, desired_schema)
+        operations = rebuild_operations(migration_diff, desired_schema, existing_schema)
+    if operations and not allow_rebuild:
+        for operation in operations:
+            logger.warning(f"{operation['class']} has changed or removed properties, which need a rebuild_class "
+                           f"that copies every object into a new class; pass --rebuild to generate it.")
+        operations = []
+    if classes:
+        migration_diff["classes"] = classes
+    if operations:
+        migration_diff["operations"] = operations
     
-    migration_files = sorted(os.listdir(migration_folder))
-    if migration_files:
-        last_migration = migration_files[-1]
-        last_migration_number = int(last_migration.split("_")[0]) 
-    else: 
-        last_migration_number = 0
-        
-    new_migration_number = last_migration_number + 1
+    new_migration_number = next_migration_number(migration_folder)
     new_migration_filename = MIGRATION_FILE_PATTERN.format(new_migration_number)
     new_migration_path = os.path.join(migration_folder, new_migration_filename)
     
-    save_schema(migration_diff, new_migration_path) 
+    with telemetry.span("save_migration", migration=new_migration_filename):
+        save_schema(migration_diff, new_migration_path) 
+    register_migration(migration_folder, new_migration_filename)
     print(f"Created new migration file: {new_migration_path}")
 
 
-def main():
-    parser = argparse.ArgumentParser(description="Weaviate schema migration tool.")
+def add_arguments(parser):
     parser.add_argument("--url", default="http://localhost:8080", help="Weaviate URL.")
     parser.add_argument(
         "--folder", default="migrations", help="Path to the migration folder."
@@ -136,17 +322,52 @@ def main():
     parser.add_argument("--api-key", help="Weaviate API key (optional).")
     parser.add_argument("--api-token", help="Weaviate API token (optional).")
     parser.add_argument("--target-schema-file", help="Path to the target schema file.")
+    parser.add_argument(
+        "--offline", action="store_true",
+        help="Diff against the schema replayed from the migration folder instead of the live schema."
+    )
+    parser.add_argument(
+        "--rebuild", action="store_true",
+        help="Generate rebuild_class operations for classes with changed or removed properties."
+    )
+    parser.add_argument("--refresh", action="store_true", help="Ignore the cached schema and refetch it.")
+    parser.add_argument(
+        "--cache-ttl", type=float, default=DEFAULT_CACHE_TTL,
+        help="Seconds a cached schema is reused for without asking the server; 0 disables the cache "
+             "(default: %(default)s)."
+    )
+    transport.add_arguments(parser)
+    telemetry.add_arguments(parser)
+
+
+def run(args):
+    with telemetry.session(args, "makemigrations"):
+        _run(args)
 
-    args = parser.parse_args()
 
+def _run(args):
     # Load the target schema from a file
     with open(args.target_schema_file, "r") as f:
         target_schema = json.load(f)
 
+    if args.offline:
+        make_migrations(None, args.folder, target_schema, replay_schema(args.folder), args.rebuild)
+        return
+
+    from weaviate import Client
+
     # Set up the Weaviate client
-    client = Client(args.url, auth_client_secret=args.api_token)
+    client = transport.configure(Client(args.url, auth_client_secret=args.api_token), args)
+
+    with telemetry.span("fetch_schema", refresh=args.refresh):
+        existing_schema = SchemaCache(ttl=args.cache_ttl).fetch(client, args.url, refresh=args.refresh)
+    make_migrations(client, args.folder, target_schema, existing_schema, args.rebuild)
 
-    make_migrations(client, args.folder, target_schema)
+
+def main():
+    parser = argparse.ArgumentParser(description="Weaviate schema migration tool.")
+    add_arguments(parser)
+    run(parser.parse_args())
 
 
 if __name__ == "__main__":
@@ -1,7 +1,38 @@
 import os
+import sys
 import json
-from weaviate import Client
 import argparse
+from weaviate_migrate import telemetry, transport
+from weaviate_migrate.schema_index import SchemaIndex
+from weaviate_migrate.backfill import LOCAL_CHECKPOINT_FILENAME, CheckpointStore
+from weaviate_migrate.executor import (
+    DEFAULT_CONCURRENCY,
+    Executor,
+    MigrationError,
+    SUCCEEDED,
+)
+from weaviate_migrate.manifest import Manifest
+from weaviate_migrate.schema_cache import SchemaCache
+from weaviate_migrate.planner import compile_plan
+from weaviate_migrate.ledger import (
+    LOCAL_LEDGER_FILENAME,
+    FileLedger,
+    WeaviateLedger,
+    is_up_to_date,
+    list_migration_files,
+    migration_checksum,
+    pending_migrations,
+    resolve_squashed,
+)
+
+def __getattr__(name):
+    # `weaviate` takes most of a second to import, so it is only loaded by
+    # the code paths that talk to a server. `Client` stays importable here.
+    if name == "Client":
+        from weaviate import Client
+        return Client
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 def load_migration(migration_path):
     """
@@ -10,56 +41,221 @@ def load_migration(migration_path):
     with open(migration_path, 'r') as f:
         return json.load(f)
 
-def apply_migration(client, schema):  
-    """  
-    Apply a migration to the Weaviate instance.  
-    """  
-    current_schema = client.schema.get()  
-  
-    for class_definition in schema['classes']:  
-        class_name = class_definition['class']  
-        if not any(c['class'] == class_name for c in current_schema['classes']):  
-            client.schema.create_class(class_definition)  
-            print(f"Created class: {class_name}")  
-  
-        for property_definition in class_definition['properties']:  
-            property_name = property_definition['name']  
-            if not any(any(p['name'] == property_name for p in c['properties']) for c in current_schema['classes']):  
-                client.schema.create_property(class_name, property_definition)  
-                print(f"Created property: {property_name}")  
-
-
-def migrate(client, migration_folder):  
+def apply_migration(client, schema, index=None, checkpoints=None, migration_file=None):
+    """
+    Apply a single migration to the Weaviate instance, without a ledger.
+
+    The migration is compiled by `compile_plan` and run by an `Executor`,
+    like the files `migrate` applies. Existence checks go through a
+    `SchemaIndex`; when none is given it is built from
+    `client.schema.get()`. Data migrations checkpoint their progress to
+    `checkpoints` when given. Raises `MigrationError` if an operation fails.
+    """
+    if index is None:
+        index = SchemaIndex.from_client(client)
+    plan = compile_plan([(migration_file, schema)], index)
+    report = Executor(client, index, 1, checkpoints).execute(plan.operations)
+    _print_report(report)
+    if report.failed:
+        raise MigrationError(report)
+
+
+def pending_plan(client, migration_folder, ledger=None, ensure_ledger=True):
+    """
+    Load the pending migrations of a folder and compile their plan against
+    the live schema.
+
+    Returns the schema index, the migrations the ledger has applied, the
+    folder's manifest (or None), the pending migrations and their plan.
+    The ledger's bookkeeping class is created if `ensure_ledger` is set.
+    """
+
+    index = SchemaIndex.from_client(client)
+    manifest = Manifest.load(migration_folder)
+    applied = {}
+    if ledger is None:
+        migration_files = list_migration_files(migration_folder)
+    else:
+        if ensure_ledger:
+            ledger.ensure(index)
+        if ledger.exists(index):
+            applied = ledger.applied()
+        migration_files = pending_migrations(migration_folder, applied)
+
+    if manifest is not None:
+        for name, checksum in applied.items():
+            if checksum and manifest.checksum(name) not in (None, checksum):
+                print(f"Warning: {name} was edited after it was applied.")
+    migrations = []
+    for migration_file in migration_files:
+        with telemetry.span("load_migration", migration=migration_file):
+            if manifest is not None:
+                migrations.append((migration_file, manifest.load_migration(migration_folder, migration_file)))
+            else:
+                migrations.append((migration_file, load_migration(os.path.join(migration_folder, migration_file))))
+    migrations = resolve_squashed(migrations, applied)
+    with telemetry.span("compile_plan", migrations=len(migrations)):
+        plan = compile_plan(migrations, index)
+
+    return index, applied, manifest, migrations, plan
+
+
+def migrate(client, migration_folder, ledger=None, concurrency=None, dry_run=False, checkpoint_path=None,
+            backend="sync"):  
     """
     Apply all migration files to the Weaviate instance.
+
+    The schema is fetched once per run and kept current as operations are
+    applied; the returned index carries the number of fetches made. When a
+    ledger is given, only migrations missing from it are loaded and applied,
+    and each one is recorded once it succeeds.
+
+    The pending files are compiled into one optimized plan (see
+    `compile_plan`) and run by an `Executor` with `concurrency` workers, one
+    by default. With `dry_run` the plan is printed and nothing is applied.
+    Data migrations checkpoint their progress to `checkpoint_path` (a file
+    in the migration folder by default) so an interrupted run resumes.
+
+    When the folder has a manifest, files are listed from it and each body
+    is checked against its hash as it is loaded.
+
+    With `backend="async"` the plan runs on an `AsyncExecutor` instead,
+    which overlaps up to `concurrency` requests (8 by default) over one
+    pooled HTTP connection.
     """
 
     if not os.path.exists(migration_folder):
         print(f"Migration folder '{migration_folder}' does not exist.")
         return
 
-    migration_files = sorted(os.listdir(migration_folder))
+    index, applied, manifest, migrations, plan = pending_plan(client, migration_folder, ledger, not dry_run)
 
-    for migration_file in migration_files:
-        migration_path = os.path.join(migration_folder, migration_file)
-        schema = load_migration(migration_path)
-        apply_migration(client, schema)
+    if dry_run:
+        print(plan.describe())
+        return index
+
+    checkpoints = CheckpointStore(checkpoint_path or os.path.join(migration_folder, LOCAL_CHECKPOINT_FILENAME))
+    if backend == "async":
+        from weaviate_migrate.aio import AsyncExecutor
+        executor = AsyncExecutor.from_client(client, index, concurrency or DEFAULT_CONCURRENCY, checkpoints)
+    elif backend == "sync":
+        executor = Executor(client, index, concurrency or 1, checkpoints)
+    else:
+        raise ValueError(f"Unknown backend: {backend}")
+    _execute_plan(executor, migration_folder, migrations, applied, plan, ledger, manifest)
+    print(f"Remote calls: {plan.remote_calls} ({plan.saved_calls} saved by plan optimization)")
+    print(f"Schema fetches: {index.fetch_count}")
+    return index
+
+
+def _checksum(migration_folder, migration_file, manifest):
+    if manifest is not None and manifest.checksum(migration_file):
+        return manifest.checksum(migration_file)
+    migration_path = os.path.join(migration_folder, migration_file)
+    return migration_checksum(migration_path) if os.path.exists(migration_path) else None
+
+
+def _print_report(report):
+    for result in report.results.values():
+        if result.status == SUCCEEDED:
+            print(f"Done: {result.operation} ({result.duration:.2f}s)")
+        else:
+            print(f"{result.status.capitalize()}: {result.operation} ({result.error})")
+
+
+def _execute_plan(executor, migration_folder, migrations, applied, plan, ledger, manifest=None):
+    report = executor.execute(plan.operations)
+    _print_report(report)
+
+    for migration_file, migration in migrations:
+        # Files are recorded in order: a later file may build on a failed one.
+        if not report.migration_succeeded(migration_file):
+            break
+        if ledger is not None:
+            ledger.record(migration_file, _checksum(migration_folder, migration_file, manifest))
+            # A squashed migration also marks the originals it replaces.
+            for replaced in migration.get('replaces', []):
+                if replaced not in applied:
+                    ledger.record(replaced, _checksum(migration_folder, replaced, manifest))
         print(f"Applied migration: {migration_file}")
 
-def main():
-    parser = argparse.ArgumentParser(description="Weaviate schema migration tool.")
+    if report.failed:
+        raise MigrationError(report)
+
+
+def add_arguments(parser):
     parser.add_argument("--url", required=True, default="http://localhost:8080", help="Weaviate URL.")
     parser.add_argument("--folder", default="migrations", help="Path to the migration folder.")
     parser.add_argument("--api-key", help="Weaviate API key (optional).")  
     parser.add_argument("--api-token", help="Weaviate API token (optional).")  
-    args = parser.parse_args()
+    parser.add_argument(
+        "--ledger", choices=["weaviate", "local"], default="weaviate",
+        help="Where to record applied migrations: a bookkeeping class in Weaviate or a local file."
+    )
+    parser.add_argument("--ledger-file", help="Path to the local ledger file (defaults to the migration folder).")
+    parser.add_argument(
+        "--concurrency", type=int,
+        help="Apply independent schema operations in parallel with this many workers."
+    )
+    parser.add_argument(
+        "--backend", choices=["sync", "async"], default="sync",
+        help="Apply the plan with worker threads or on an asyncio event loop."
+    )
+    parser.add_argument("--dry-run", action="store_true", help="Print the optimized plan without applying it.")
+    parser.add_argument("--check", action="store_true", help="Only check whether all migrations are applied; exit 1 if not.")
+    transport.add_arguments(parser)
+    telemetry.add_arguments(parser)
+
+
+def _exit_check(up_to_date):
+    print("Migrations are up to date." if up_to_date else "There are unapplied migrations.")
+    sys.exit(0 if up_to_date else 1)
+
+
+def run(args):
+    with telemetry.session(args, "migrate"):
+        _run(args)
+
+
+def _run(args):
+    ledger = None
+    if args.ledger == "local":
+        ledger = FileLedger(args.ledger_file or os.path.join(args.folder, LOCAL_LEDGER_FILENAME))
+        # A local ledger answers --check and no-op runs without connecting,
+        # or even importing the client.
+        up_to_date = is_up_to_date(ledger, args.folder)
+        if args.check:
+            _exit_check(up_to_date)
+        if up_to_date:
+            print("Migrations are up to date.")
+            return
+
+    from weaviate import Client
 
     # Set up the Weaviate client  
-    client = Client(args.url, api_key=args.api_key)  
+    client = transport.configure(Client(args.url, api_key=args.api_key), args)
     if args.api_key and args.api_token:  
         client.authenticate(args.api_key, args.api_token)  
 
-    migrate(client, args.folder)  
+    if ledger is None:
+        ledger = WeaviateLedger(client)
+
+    if args.check:
+        _exit_check(is_up_to_date(ledger, args.folder))
+
+    try:
+        migrate(client, args.folder, ledger, args.concurrency, args.dry_run, backend=args.backend)
+    finally:
+        if not args.dry_run:
+            # Even a failed run may have changed the schema.
+            SchemaCache().invalidate(args.url)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Weaviate schema migration tool.")
+    add_arguments(parser)
+    run(parser.parse_args())
+
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,158 @@
+import os
+import sys
+import json
+import argparse
+from typing import Dict, List, Optional
+from weaviate_migrate import telemetry, transport
+from weaviate_migrate.commands.migrate import pending_plan
+from weaviate_migrate.cost import (
+    COSTS,
+    DEFAULT_CONCURRENCY,
+    METADATA,
+    Throughput,
+    estimate,
+    fetch_class_stats,
+    format_duration,
+)
+from weaviate_migrate.ledger import LOCAL_LEDGER_FILENAME, FileLedger, WeaviateLedger
+
+COST_LABELS = {"metadata": "metadata only", "reindex": "reindex", "copy": "data copy"}
+
+
+def plan_costs(client, migration_folder: str, ledger=None, throughput: Optional[Throughput] = None,
+               concurrency: int = DEFAULT_CONCURRENCY) -> Dict:
+    """
+    Estimate what applying the pending migrations of a folder costs.
+
+    The pending migrations are compiled into the plan `migrate` would run.
+    The object counts and shards of the existing classes it touches are
+    fetched `concurrency` at a time, and each operation is classified as
+    metadata only, a reindex of its class or a copy of it, with its
+    duration estimated from `throughput`. Nothing is changed on the server.
+    """
+    if not os.path.exists(migration_folder):
+        raise ValueError(f"Migration folder {migration_folder} does not exist.")
+    throughput = throughput or Throughput()
+    index, _, _, migrations, plan = pending_plan(client, migration_folder, ledger, ensure_ledger=False)
+    with telemetry.span("fetch_class_stats"):
+        stats = fetch_class_stats(
+            client, (index.resolve(op.class_name) for op in plan.operations if index.has_class(op.class_name)),
+            concurrency,
+        )
+    estimates = estimate(plan.operations, index, stats, throughput)
+    seconds = [e["seconds"] for e in estimates]
+    return {
+        "migrations": [name for name, _ in migrations],
+        "operations": estimates,
+        "costs": {cost: sum(e["cost"] == cost for e in estimates) for cost in COSTS},
+        "seconds": None if None in seconds else sum(seconds),
+        "throughput": {
+            "callSeconds": throughput.call_seconds, "reindexRate": throughput.reindex_rate,
+            "copyRate": throughput.copy_rate, "tenantRate": throughput.tenant_rate,
+            "measured": sorted(throughput.measured),
+        },
+    }
+
+
+def violations(report: Dict, max_cost: Optional[str] = None, max_seconds: Optional[float] = None) -> List[str]:
+    """
+    Why the plan exceeds the given limits, if it does. An operation whose
+    duration is unknown exceeds any duration limit.
+    """
+    problems = []
+    if max_cost is not None:
+        allowed = COSTS[:COSTS.index(max_cost) + 1]
+        for entry in report["operations"]:
+            if entry["cost"] not in allowed:
+                problems.append(f"{entry['operation']} requires a {COST_LABELS[entry['cost']]}")
+    if max_seconds is not None:
+        if report["seconds"] is None:
+            problems.append("The duration of the plan is unknown")
+        elif report["seconds"] > max_seconds:
+            problems.append(
+                f"The plan is estimated to take {format_duration(report['seconds'])}, "
+                f"more than {format_duration(max_seconds)}"
+            )
+    return problems
+
+
+def describe(report: Dict) -> str:
+    lines = []
+    for number, entry in enumerate(report["operations"], 1):
+        line = f"{number:4d}. [{entry['migration']}] {entry['operation']}: {COST_LABELS[entry['cost']]}"
+        if entry["cost"] != METADATA:
+            objects = "unknown number of" if entry["objects"] is None else f"{entry['objects']:,}"
+            line += f", {objects} objects in {entry['shards']} shard(s)"
+        line += f", ~{format_duration(entry['seconds'])}"
+        lines.append(line)
+        if entry["readonlyShards"]:
+            lines.append(f"      warning: read-only shards {', '.join(entry['readonlyShards'])}")
+    costs = report["costs"]
+    measured = report["throughput"]["measured"]
+    lines.append(
+        f"{len(report['operations'])} operations ({costs['metadata']} metadata only, {costs['reindex']} reindex, "
+        f"{costs['copy']} data copy), estimated ~{format_duration(report['seconds'])} run one at a time; "
+        f"rates {'measured: ' + ', '.join(measured) if measured else 'are defaults'}"
+    )
+    return "\n".join(lines)
+
+
+def add_arguments(parser):
+    parser.add_argument("--url", required=True, help="Weaviate URL.")
+    parser.add_argument("--folder", default="migrations", help="Path to the migration folder.")
+    parser.add_argument("--api-key", help="Weaviate API key (optional).")
+    parser.add_argument(
+        "--ledger", choices=["weaviate", "local"], default="weaviate",
+        help="Where applied migrations are recorded: a bookkeeping class in Weaviate or a local file."
+    )
+    parser.add_argument("--ledger-file", help="Path to the local ledger file (defaults to the migration folder).")
+    parser.add_argument(
+        "--throughput",
+        help="JSON metrics file of an earlier `migrate --metrics-file` run to take the rates from."
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+        help="Classes whose object counts and shards are fetched at the same time (default: %(default)s)."
+    )
+    parser.add_argument(
+        "--max-cost", choices=COSTS,
+        help="Exit 1 if an operation costs more than this: metadata < reindex < copy."
+    )
+    parser.add_argument("--max-seconds", type=float, help="Exit 1 if the plan is estimated to take longer.")
+    parser.add_argument("--json", action="store_true", help="Print the estimates as JSON.")
+    transport.add_arguments(parser)
+    telemetry.add_arguments(parser)
+
+
+def run(args):
+    with telemetry.session(args, "plan"):
+        _run(args)
+
+
+def _run(args):
+    from weaviate import Client
+
+    client = transport.configure(Client(args.url, api_key=args.api_key), args)
+    if args.ledger == "local":
+        ledger = FileLedger(args.ledger_file or os.path.join(args.folder, LOCAL_LEDGER_FILENAME))
+    else:
+        ledger = WeaviateLedger(client)
+    throughput = Throughput.from_file(args.throughput) if args.throughput else None
+
+    report = plan_costs(client, args.folder, ledger, throughput, args.concurrency)
+    print(json.dumps(report, indent=2) if args.json else describe(report))
+    problems = violations(report, args.max_cost, args.max_seconds)
+    for problem in problems:
+        print(f"Over the limit: {problem}", file=sys.stderr)
+    if problems:
+        sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Estimate the cost of the pending migrations.")
+    add_arguments(parser)
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+import os
+import json
+import argparse
+from typing import Dict, Optional
+from weaviate_migrate.commands.migrate import load_migration
+from weaviate_migrate.ledger import MIGRATION_FILE_RE, list_migration_files
+from weaviate_migrate.manifest import Manifest, register_migration
+from weaviate_migrate.planner import replay_migrations
+from weaviate_migrate.schema_index import SchemaIndex
+from weaviate_migrate.tenants import TENANT_OPERATIONS
+
+SQUASHED_FILE_PATTERN = "{:04d}_squashed_{:04d}.json"
+
+
+def migration_number(filename: str) -> int:
+    return int(MIGRATION_FILE_RE.match(filename).group(1))
+
+
+def squash_migrations(migration_folder: str, start: Optional[int] = None, end: Optional[int] = None) -> Dict:
+    """
+    Fold a range of migration files into a single snapshot migration.
+
+    The schema is computed in memory by replaying the files; no server is
+    involved. The snapshot creates every class the range touches in its
+    final form, deletes the pre-existing classes the range removes, runs
+    the range's data migrations and tenant operations, and lists the files
+    it replaces under `replaces`.
+    """
+    manifest = Manifest.load(migration_folder)
+    migration_files = list_migration_files(migration_folder)
+    if start is None:
+        start = migration_number(migration_files[0]) if migration_files else 1
+    if end is None:
+        end = migration_number(migration_files[-1]) if migration_files else start
+
+    before = []
+    squashed = []
+    for migration_file in migration_files:
+        number = migration_number(migration_file)
+        if number > end:
+            break
+        if manifest is not None:
+            migration = manifest.load_migration(migration_folder, migration_file)
+        else:
+            migration = load_migration(os.path.join(migration_folder, migration_file))
+        if number < start:
+            before.append((migration_file, migration))
+        elif number <= end:
+            if migration.get("replaces"):
+                raise ValueError(f"{migration_file} is already a squashed migration.")
+            squashed.append((migration_file, migration))
+    if not squashed:
+        raise ValueError(f"No migrations to squash between {start} and {end}.")
+
+    base = replay_migrations(before)
+    base_classes = set(base.classes)
+    final = replay_migrations(squashed, SchemaIndex(base.to_schema()))
+
+    touched = []
+    # Data migrations and tenant entries are not part of the schema: they
+    # are carried over as they are, in order, except those a later delete or
+    # rebuild of the class undoes. They run once the snapshot's classes
+    # exist.
+    carried = []
+    for migration_file, migration in squashed:
+        touched.extend(c["class"] for c in migration.get("classes", []))
+        for entry in migration.get("operations", []):
+            if entry["type"] == "data_migration" or entry["type"] in TENANT_OPERATIONS:
+                carried.append(entry)
+                continue
+            if entry["type"] in ("delete_class", "rebuild_class"):
+                carried = [e for e in carried if e["class"] != entry["class"]]
+            if entry["type"] == "delete_class" and entry["class"] in base_classes \
+                    and final.has_class(entry["class"]):
+                raise ValueError(
+                    f"Cannot squash: {entry['class']} is deleted and recreated in {migration_file}."
+                )
+            if entry["type"] == "rebuild_class" and entry["class"] in base_classes:
+                raise ValueError(
+                    f"Cannot squash: {entry['class']} is rebuilt in {migration_file}."
+                )
+            if entry["type"] == "rebuild_class":
+                touched.append(entry["class"])
+
+    final_schema = {c["class"]: c for c in final.to_schema()["classes"]}
+    classes = [final_schema[name] for name in dict.fromkeys(touched) if name in final_schema]
+    deleted = sorted(name for name in base_classes if not final.has_class(name))
+
+    snapshot = {
+        "replaces": [migration_file for migration_file, _ in squashed],
+        "classes": classes,
+    }
+    operations = [{"type": "delete_class", "class": name} for name in deleted]
+    operations += [e for e in carried if final.has_class(e["class"])]
+    if operations:
+        snapshot["operations"] = operations
+    return snapshot
+
+
+def write_squashed_migration(migration_folder: str, start: Optional[int] = None, end: Optional[int] = None) -> str:
+    snapshot = squash_migrations(migration_folder, start, end)
+    first, last = snapshot["replaces"][0], snapshot["replaces"][-1]
+    filename = SQUASHED_FILE_PATTERN.format(migration_number(first), migration_number(last))
+    migration_path = os.path.join(migration_folder, filename)
+    with open(migration_path, "w") as f:
+        json.dump(snapshot, f, indent=2)
+    register_migration(migration_folder, filename)
+    return migration_path
+
+
+def add_arguments(parser):
+    parser.add_argument("--folder", default="migrations", help="Path to the migration folder.")
+    parser.add_argument("--start", type=int, help="First migration number to squash (defaults to the first).")
+    parser.add_argument("--end", type=int, help="Last migration number to squash (defaults to the last).")
+
+
+def run(args):
+    migration_path = write_squashed_migration(args.folder, args.start, args.end)
+    print(f"Created squashed migration: {migration_path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Squash Weaviate migrations into a single snapshot migration.")
+    add_arguments(parser)
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
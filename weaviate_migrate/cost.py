@@ -0,0 +1,175 @@
+import json
+import math
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
+from weaviate_migrate.executor import Operation
+from weaviate_migrate.rest import aggregate_count, list_shards
+from weaviate_migrate.tenants import DEFAULT_BATCH_SIZE as DEFAULT_TENANT_BATCH_SIZE
+from weaviate_migrate.tenants import DEFAULT_WORKERS as DEFAULT_TENANT_WORKERS
+from weaviate_migrate.tenants import TENANT_OPERATIONS
+
+# Cost classes, cheapest first.
+METADATA = "metadata"  # Online schema change; no object is touched.
+REINDEX = "reindex"  # Every object of the class is rewritten in place.
+COPY = "copy"  # Every object of the class is copied to a new class.
+COSTS = (METADATA, REINDEX, COPY)
+
+DEFAULT_CONCURRENCY = 8
+# Conservative rates used when no earlier run was measured.
+DEFAULT_CALL_SECONDS = 0.05
+DEFAULT_REINDEX_RATE = 2000.0
+DEFAULT_COPY_RATE = 1000.0
+DEFAULT_TENANT_RATE = 1000.0
+
+
+def classify(operation: Operation) -> str:
+    if operation.kind == "rebuild_class":
+        return COPY
+    if operation.kind == "data_migration":
+        return REINDEX
+    return METADATA
+
+
+class Throughput:
+    """
+    Rates the estimates are based on: seconds per schema call, objects per
+    second rewritten by data migrations and copied by rebuilds, and tenants
+    changed per second.
+    """
+
+    def __init__(self, call_seconds: float = DEFAULT_CALL_SECONDS, reindex_rate: float = DEFAULT_REINDEX_RATE,
+                 copy_rate: float = DEFAULT_COPY_RATE, tenant_rate: float = DEFAULT_TENANT_RATE,
+                 measured: Iterable[str] = ()):
+        self.call_seconds = call_seconds
+        self.reindex_rate = reindex_rate
+        self.copy_rate = copy_rate
+        self.tenant_rate = tenant_rate
+        self.measured = set(measured)
+
+    @classmethod
+    def from_report(cls, report: Dict) -> "Throughput":
+        """
+        Rates measured by an earlier run, from the JSON report
+        `migrate --metrics-file` writes. Rates the run did not exercise keep
+        their defaults.
+        """
+        totals = {}
+        for span in report.get("spans") or []:
+            attributes = span.get("attributes") or {}
+            if span["name"] != "operation" or span.get("error"):
+                continue
+            kind = attributes.get("kind")
+            if kind in ("create_class", "create_property", "delete_class"):
+                key, amount = "call_seconds", 1
+            elif kind == "data_migration":
+                key, amount = "reindex_rate", attributes.get("objects", 0)
+            elif kind == "rebuild_class":
+                key, amount = "copy_rate", attributes.get("objects", 0)
+            elif kind in TENANT_OPERATIONS:
+                key, amount = "tenant_rate", attributes.get("tenants", 0)
+            else:
+                continue
+            entry = totals.setdefault(key, [0, 0.0])
+            entry[0] += amount
+            entry[1] += span["duration"]
+
+        rates = {}
+        for key, (amount, seconds) in totals.items():
+            if not amount or not seconds:
+                continue
+            rates[key] = seconds / amount if key == "call_seconds" else amount / seconds
+        return cls(measured=rates, **rates)
+
+    @classmethod
+    def from_file(cls, path: str) -> "Throughput":
+        with open(path, "r") as f:
+            return cls.from_report(json.load(f))
+
+    def source(self, key: str) -> str:
+        return "measured" if key in self.measured else "default"
+
+
+def fetch_class_stats(client, class_names: Iterable[str],
+                      concurrency: int = DEFAULT_CONCURRENCY) -> Dict[str, Dict]:
+    """
+    Object count and shards of each class, fetched `concurrency` at a
+    time. The count is None when the server cannot aggregate the class,
+    e.g. a multi-tenant one.
+    """
+    class_names = sorted(set(class_names))
+
+    def fetch(class_name):
+        return {"objects": aggregate_count(client, class_name), "shards": list_shards(client, class_name)}
+
+    if not class_names:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(concurrency, len(class_names))) as pool:
+        return dict(zip(class_names, pool.map(fetch, class_names)))
+
+
+def _objects(operation: Operation, index, stats: Dict[str, Dict], created: set) -> Optional[int]:
+    if operation.class_name in created or not index.has_class(operation.class_name):
+        # Created by this plan: it holds no objects yet.
+        return 0
+    return (stats.get(index.resolve(operation.class_name)) or {}).get("objects")
+
+
+def estimate(operations: List[Operation], index, stats: Dict[str, Dict], throughput: Throughput) -> List[Dict]:
+    """
+    Cost class, affected objects and estimated seconds of each operation.
+
+    `stats` are the class statistics of `fetch_class_stats`, keyed by
+    physical class. The seconds are None when the object count of a class
+    that has to be rewritten or copied is unknown.
+    """
+    estimates = []
+    created = set()
+    for operation in operations:
+        cost = classify(operation)
+        objects = _objects(operation, index, stats, created) if cost != METADATA else None
+        seconds = throughput.call_seconds
+        if cost == REINDEX:
+            seconds = None if objects is None else seconds + objects / throughput.reindex_rate
+        elif cost == COPY:
+            # The copy plus the calls around it: creating the shadow class,
+            # counting both classes, the alias and the drop.
+            seconds = None if objects is None else seconds * 5 + objects / throughput.copy_rate
+        elif operation.kind in TENANT_OPERATIONS:
+            entry = operation.definition
+            tenants = len(entry["tenants"])
+            requests = math.ceil(tenants / entry.get("batch_size", DEFAULT_TENANT_BATCH_SIZE))
+            rounds = math.ceil(requests / entry.get("workers", DEFAULT_TENANT_WORKERS))
+            seconds = throughput.call_seconds * (rounds + 1)
+            if "tenant_rate" in throughput.measured:
+                seconds = max(seconds, tenants / throughput.tenant_rate)
+        if operation.kind == "create_class":
+            created.add(operation.class_name)
+        elif operation.kind == "delete_class":
+            created.discard(operation.class_name)
+        shards = (stats.get(index.resolve(operation.class_name)) or {}).get("shards") or []
+        estimates.append({
+            "operation": str(operation),
+            "migration": operation.migration,
+            "class": operation.class_name,
+            "cost": cost,
+            "objects": objects,
+            "shards": len(shards),
+            "readonlyShards": sorted(s["name"] for s in shards if s.get("status") == "READONLY"),
+            "seconds": seconds,
+        })
+    return estimates
+
+
+def format_duration(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return "unknown"
+    if seconds < 1:
+        return "<1s"
+    seconds = round(seconds)
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    if hours:
+        return f"{hours}h {minutes:02d}m"
+    if minutes:
+        return f"{minutes}m {seconds:02d}s"
+    return f"{seconds}s"
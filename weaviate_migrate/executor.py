@@ -0,0 +1,308 @@
+import time
+import threading
+import functools
+import contextvars
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Dict, Generator, List, Optional, Set, Tuple
+from weaviate_migrate import telemetry
+from weaviate_migrate.backfill import DEFAULT_BATCH_SIZE, load_transform, run_data_migration
+from weaviate_migrate.rebuild import DEFAULT_WORKERS, rebuild_class
+from weaviate_migrate.rest import delete_alias
+from weaviate_migrate.tenants import TENANT_OPERATIONS, apply_tenant_operation
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONCURRENCY = 8
+
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+SKIPPED = "skipped"
+
+
+class MigrationError(Exception):
+    """
+    Raised when one or more operations of a migration run failed.
+    """
+
+    def __init__(self, report: "ExecutionReport"):
+        self.report = report
+        failed = ", ".join(str(r.operation) for r in report.failed)
+        super().__init__(f"{len(report.failed)} operation(s) failed: {failed}")
+
+
+def is_conflict(error) -> bool:
+    """
+    Whether a failed schema call was rejected because the object already
+    exists, i.e. the local copy of the schema is stale.
+    """
+    return getattr(error, "status_code", None) == 422
+
+
+def reference_targets(property_definition: Dict) -> Set[str]:
+    """
+    Classes a property points to: its `refClass` or, in Weaviate's own
+    notation, any capitalised entry of its `dataType`.
+    """
+    targets = set()
+    if property_definition.get("refClass"):
+        targets.add(property_definition["refClass"])
+    for data_type in property_definition.get("dataType") or []:
+        if data_type[:1].isupper():
+            targets.add(data_type)
+    return targets
+
+
+class Operation:
+    """
+    A single remote schema call and the operations it has to wait for.
+
+    Operations are built by `weaviate_migrate.planner.compile_plan`.
+    `migration` is the file the call comes from; `migrations` also holds
+    the later files whose entries were folded into it.
+    """
+
+    def __init__(self, kind: str, class_name: str, definition: Dict, migration: Optional[str] = None):
+        self.kind = kind
+        self.class_name = class_name
+        self.definition = definition
+        self.migration = migration
+        self.migrations = {migration} if migration is not None else set()
+        self.requires = set()
+        self.depends_on = []
+
+    @property
+    def key(self) -> Tuple:
+        if self.kind == "create_property":
+            return (self.kind, self.class_name, self.definition["name"])
+        return (self.kind, self.class_name)
+
+    def __repr__(self):
+        return f"Operation({', '.join(self.key)})"
+
+    def __str__(self):
+        if self.kind == "create_property":
+            return f"{self.kind} {self.class_name}.{self.definition['name']}"
+        if self.kind == "data_migration":
+            return f"{self.kind} {self.class_name} ({self.definition['transform']})"
+        if self.kind in TENANT_OPERATIONS:
+            return f"{self.kind} {self.class_name} ({len(self.definition['tenants'])} tenants)"
+        return f"{self.kind} {self.class_name}"
+
+
+class OperationResult:
+    def __init__(self, operation: Operation, status: str, error: Optional[Exception] = None, duration: float = 0.0):
+        self.operation = operation
+        self.status = status
+        self.error = error
+        self.duration = duration
+
+
+class ExecutionReport:
+    """
+    Per-operation outcome of an executor run.
+    """
+
+    def __init__(self):
+        self.results = {}
+
+    def add(self, result: OperationResult) -> None:
+        self.results[result.operation] = result
+
+    def _with_status(self, status) -> List[OperationResult]:
+        return [r for r in self.results.values() if r.status == status]
+
+    @property
+    def succeeded(self) -> List[OperationResult]:
+        return self._with_status(SUCCEEDED)
+
+    @property
+    def failed(self) -> List[OperationResult]:
+        return self._with_status(FAILED)
+
+    @property
+    def skipped(self) -> List[OperationResult]:
+        return self._with_status(SKIPPED)
+
+    def migration_succeeded(self, migration: str) -> bool:
+        """
+        Whether every operation carrying an entry of `migration`, including
+        operations other files' entries were folded into, succeeded.
+        """
+        return all(
+            r.status == SUCCEEDED for op, r in self.results.items()
+            if migration in op.migrations
+        )
+
+
+def operation_span(operation: Operation):
+    return telemetry.span(
+        "operation", operation=str(operation), kind=operation.kind, migration=operation.migration
+    )
+
+
+class Executor:
+    """
+    Runs a graph of schema operations on a bounded thread pool.
+
+    An operation is submitted once everything it depends on has succeeded.
+    When an operation fails, everything that depends on it, directly or
+    transitively, is skipped and reported as such; independent operations
+    keep running.
+    """
+
+    def __init__(self, client, index, concurrency: int = DEFAULT_CONCURRENCY, checkpoints=None):
+        if concurrency < 1:
+            raise ValueError("Concurrency must be at least 1.")
+        self.client = client
+        self.index = index
+        self.concurrency = concurrency
+        self.checkpoints = checkpoints
+        self._lock = threading.Lock()
+
+    def _steps(self, operation: Operation) -> Generator[Tuple[str, tuple], object, None]:
+        """
+        What an operation does, as a generator of the calls it makes to the
+        server. Each `(call, args)` it yields is made by the executor and
+        the result sent back, so the threaded and asyncio executors share
+        these semantics and differ only in how calls are made.
+        """
+        if operation.kind == "create_class":
+            yield "create_class", (operation.definition,)
+            with self._lock:
+                self.index.add_class(operation.definition)
+        elif operation.kind == "create_property":
+            yield "create_property", (self.index.resolve(operation.class_name), operation.definition)
+            with self._lock:
+                self.index.add_property(operation.class_name, operation.definition)
+        elif operation.kind == "data_migration":
+            entry = operation.definition
+            stats = yield "data_migration", (
+                self.index.resolve(operation.class_name), load_transform(entry["transform"]),
+                entry.get("batch_size", DEFAULT_BATCH_SIZE), self.checkpoints,
+                f"{operation.migration}:{operation.class_name}:{entry['transform']}",
+            )
+            telemetry.annotate(objects=stats["read"])
+            logger.info(f"{operation}: {stats['written']} of {stats['read']} objects updated")
+        elif operation.kind == "rebuild_class":
+            entry = operation.definition
+            transform = load_transform(entry["transform"]) if entry.get("transform") else None
+            stats = yield "rebuild_class", (
+                operation.class_name, entry["definition"],
+                entry.get("batch_size", DEFAULT_BATCH_SIZE), entry.get("workers", DEFAULT_WORKERS), transform,
+            )
+            with self._lock:
+                self.index.remove_class(operation.class_name)
+                self.index.add_class(stats["definition"])
+                self.index.aliases[operation.class_name] = stats["shadow"]
+            telemetry.annotate(objects=stats["copied"])
+            logger.info(f"{operation}: {stats['copied']} objects at {stats['objects_per_second']:.0f} objects/s")
+        elif operation.kind in TENANT_OPERATIONS:
+            stats = yield "tenant_operation", (self.index.resolve(operation.class_name), operation.definition)
+            telemetry.annotate(tenants=stats["changed"], requests=stats["chunks"])
+            logger.info(f"{operation}: {stats['changed']} changed in {stats['chunks']} requests, "
+                        f"{stats['unchanged']} already done")
+        elif operation.kind == "delete_class":
+            physical_class = self.index.resolve(operation.class_name)
+            yield "delete_class", (physical_class,)
+            if physical_class != operation.class_name:
+                yield "delete_alias", (operation.class_name,)
+            with self._lock:
+                self.index.remove_class(operation.class_name)
+        else:
+            raise ValueError(f"Unknown operation: {operation.kind}")
+
+    def _call(self, call: str, *args):
+        """
+        Make one call of an operation through the synchronous client.
+        """
+        calls = {
+            "create_class": self.client.schema.create_class,
+            "create_property": self.client.schema.create_property,
+            "delete_class": self.client.schema.delete_class,
+            "delete_alias": functools.partial(delete_alias, self.client),
+            "data_migration": functools.partial(run_data_migration, self.client),
+            "rebuild_class": functools.partial(rebuild_class, self.client),
+            "tenant_operation": functools.partial(apply_tenant_operation, self.client),
+        }
+        return calls[call](*args)
+
+    def _apply(self, operation: Operation) -> None:
+        steps = self._steps(operation)
+        result = None
+        while True:
+            try:
+                call, args = steps.send(result)
+            except StopIteration:
+                return
+            result = self._call(call, *args)
+
+    def _exists(self, operation: Operation) -> bool:
+        if operation.kind in ("delete_class", "data_migration", "rebuild_class") \
+                or operation.kind in TENANT_OPERATIONS:
+            return False
+        if operation.kind == "create_class":
+            return self.index.has_class(operation.class_name)
+        return self.index.has_property(operation.class_name, operation.definition["name"])
+
+    def run_operation(self, operation: Operation) -> OperationResult:
+        start = time.perf_counter()
+        try:
+            with operation_span(operation):
+                try:
+                    self._apply(operation)
+                except Exception as e:
+                    if not is_conflict(e):
+                        raise
+                    with self._lock:
+                        self.index.refresh(self.client)
+                        if not self._exists(operation):
+                            raise
+        except Exception as e:
+            logger.error(f"{operation} failed: {e}")
+            return OperationResult(operation, FAILED, e, time.perf_counter() - start)
+        return OperationResult(operation, SUCCEEDED, duration=time.perf_counter() - start)
+
+    def execute(self, operations: List[Operation]) -> ExecutionReport:
+        report = ExecutionReport()
+        waiting_on = {op: len(op.depends_on) for op in operations}
+        dependents = {op: [] for op in operations}
+        for op in operations:
+            for dependency in op.depends_on:
+                dependents[dependency].append(op)
+
+        def skip(operation, cause):
+            if operation in report.results:
+                return
+            report.add(OperationResult(operation, SKIPPED, cause))
+            for dependent in dependents[operation]:
+                skip(dependent, cause)
+
+        ready = deque(op for op in operations if waiting_on[op] == 0)
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            while ready or running:
+                while ready:
+                    operation = ready.popleft()
+                    # Each operation's spans nest under the span that started the run.
+                    context = contextvars.copy_context()
+                    running[pool.submit(context.run, self.run_operation, operation)] = operation
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    operation = running.pop(future)
+                    result = future.result()
+                    report.add(result)
+                    if result.status != SUCCEEDED:
+                        for dependent in dependents[operation]:
+                            skip(dependent, result.error)
+                        continue
+                    for dependent in dependents[operation]:
+                        waiting_on[dependent] -= 1
+                        if waiting_on[dependent] == 0 and dependent not in report.results:
+                            ready.append(dependent)
+
+        for operation in operations:
+            if operation not in report.results:
+                report.add(OperationResult(operation, SKIPPED, ValueError("Dependency cycle.")))
+        return report
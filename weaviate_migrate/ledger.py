@@ -0,0 +1,200 @@
+import os
+import json
+import uuid
+import hashlib
+import logging
+from datetime import datetime, timezone
+from typing import Dict, List, Tuple
+from weaviate_migrate.manifest import MIGRATION_FILE_RE, Manifest, ManifestError, scan_migration_files
+from weaviate_migrate.rest import class_exists
+
+logger = logging.getLogger(__name__)
+
+LEDGER_CLASS = "WeaviateMigration"
+# Bookkeeping class of the incremental state of `weaviate-django-sync`.
+SYNC_STATE_CLASS = "WeaviateSyncState"
+LOCAL_LEDGER_FILENAME = ".weaviate_migrations.json"
+LEDGER_PAGE_SIZE = 10000
+
+
+def list_migration_files(migration_folder: str) -> List[str]:
+    """
+    List migration filenames in apply order without reading them.
+
+    Only files named like `0001_name.json` are migrations; anything else in
+    the folder (such as the local ledger) is ignored. When the folder has a
+    manifest, the list comes from it, and a migration file missing from the
+    manifest raises `ManifestError` instead of being skipped. Only
+    filenames are compared; no file is read.
+    """
+    manifest = Manifest.load(migration_folder)
+    if manifest is None:
+        return scan_migration_files(migration_folder)
+    filenames = manifest.filenames()
+    unlisted = sorted(set(scan_migration_files(migration_folder)) - set(filenames))
+    if unlisted:
+        raise ManifestError(
+            f"{', '.join(unlisted)} {'is' if len(unlisted) == 1 else 'are'} not in the manifest; "
+            f"register {'it' if len(unlisted) == 1 else 'them'} with `weaviate-manifest`."
+        )
+    return filenames
+
+
+def migration_checksum(migration_path: str) -> str:
+    """
+    SHA-256 of a migration file's content.
+    """
+    with open(migration_path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class WeaviateLedger:
+    """
+    Applied-migrations ledger stored as objects of a bookkeeping class in
+    Weaviate, one object per migration keyed by a UUID derived from its name.
+    """
+
+    def __init__(self, client, class_name: str = LEDGER_CLASS):
+        self.client = client
+        self.class_name = class_name
+
+    def class_definition(self) -> Dict:
+        return {
+            "class": self.class_name,
+            "description": "Migrations applied by weaviate-migrate.",
+            "vectorizer": "none",
+            "properties": [
+                {"name": "name", "dataType": ["text"]},
+                {"name": "checksum", "dataType": ["text"]},
+                {"name": "appliedAt", "dataType": ["date"]},
+            ],
+        }
+
+    def ensure(self, index) -> None:
+        """
+        Create the bookkeeping class unless the schema index already has it.
+        """
+        if not index.has_class(self.class_name):
+            class_definition = self.class_definition()
+            self.client.schema.create_class(class_definition)
+            index.add_class(class_definition)
+
+    def exists(self, index=None) -> bool:
+        """
+        Whether the bookkeeping class exists, from the schema index when one
+        is given or with a lookup of the class otherwise.
+        """
+        if index is None:
+            return class_exists(self.client, self.class_name)
+        return index.has_class(self.class_name)
+
+    def object_uuid(self, name: str) -> str:
+        return str(uuid.uuid5(uuid.NAMESPACE_URL, f"weaviate-migrate/{name}"))
+
+    def applied(self) -> Dict[str, str]:
+        """
+        Return applied migration names mapped to their checksums.
+
+        A ledger of up to `LEDGER_PAGE_SIZE` entries is read in one request.
+        When the bookkeeping class does not exist, the server rejects that
+        request (404 or 422) and nothing has been applied.
+        """
+        applied = {}
+        after = None
+        while True:
+            try:
+                response = self.client.data_object.get(
+                    class_name=self.class_name, limit=LEDGER_PAGE_SIZE, after=after
+                )
+            except Exception as e:
+                if after is not None or getattr(e, "status_code", None) not in (404, 422):
+                    raise
+                return applied
+            objects = (response or {}).get("objects") or []
+            for obj in objects:
+                properties = obj.get("properties", {})
+                applied[properties["name"]] = properties.get("checksum")
+            if len(objects) < LEDGER_PAGE_SIZE:
+                return applied
+            after = objects[-1]["id"]
+
+    def record(self, name: str, checksum: str) -> None:
+        self.client.data_object.create(
+            {"name": name, "checksum": checksum, "appliedAt": _now()},
+            self.class_name,
+            uuid=self.object_uuid(name),
+        )
+
+
+class FileLedger:
+    """
+    Applied-migrations ledger kept in a local JSON file, for clusters where
+    the bookkeeping class cannot be created.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def ensure(self, index) -> None:
+        pass
+
+    def exists(self, index=None) -> bool:
+        return True
+
+    def _load(self) -> Dict:
+        if not os.path.exists(self.path):
+            return {}
+        with open(self.path, "r") as f:
+            return json.load(f).get("applied", {})
+
+    def applied(self) -> Dict[str, str]:
+        return {name: entry.get("checksum") for name, entry in self._load().items()}
+
+    def record(self, name: str, checksum: str) -> None:
+        applied = self._load()
+        applied[name] = {"checksum": checksum, "appliedAt": _now()}
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"applied": applied}, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+def pending_migrations(migration_folder: str, applied: Dict[str, str]) -> List[str]:
+    """
+    Migration filenames in the folder that are not yet in the ledger.
+    """
+    return [f for f in list_migration_files(migration_folder) if f not in applied]
+
+
+def resolve_squashed(migrations: List[Tuple[str, Dict]], applied: Dict[str, str]) -> List[Tuple[str, Dict]]:
+    """
+    Choose between squashed migrations and the files they replace.
+
+    A squashed migration (one with a `replaces` list) stands in for its
+    originals. If only some of the originals were applied, the squash is
+    skipped and the remaining originals are applied instead.
+    """
+    skip = set()
+    for name, migration in migrations:
+        replaces = migration.get("replaces") or []
+        applied_replaces = [r for r in replaces if r in applied]
+        if applied_replaces and len(applied_replaces) < len(replaces):
+            skip.add(name)
+        else:
+            skip.update(replaces)
+    return [(name, migration) for name, migration in migrations if name not in skip]
+
+
+def is_up_to_date(ledger, migration_folder: str) -> bool:
+    """
+    Check whether every migration in the folder has been applied. A cluster
+    without a ledger has applied none.
+
+    Costs one ledger read and a directory listing; no migration file is
+    opened.
+    """
+    return not pending_migrations(migration_folder, ledger.applied())
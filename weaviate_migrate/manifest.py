@@ -0,0 +1,195 @@
+import os
+import re
+import sys
+import json
+import hashlib
+import argparse
+from typing import Dict, List, Optional
+
+MANIFEST_FILENAME = "manifest.json"
+MANIFEST_VERSION = 1
+MIGRATION_FILE_RE = re.compile(r"^(\d+)_.*\.json$")
+
+
+class ManifestError(Exception):
+    """
+    Raised when a migration file does not match its manifest entry.
+    """
+
+
+def scan_migration_files(migration_folder: str) -> List[str]:
+    """
+    List migration filenames in apply order by scanning the folder.
+
+    Only files named like `0001_name.json` are migrations; anything else in
+    the folder is ignored.
+    """
+    migration_files = []
+    for filename in os.listdir(migration_folder):
+        match = MIGRATION_FILE_RE.match(filename)
+        if match:
+            migration_files.append((int(match.group(1)), filename))
+    return [filename for _, filename in sorted(migration_files)]
+
+
+def _sha256(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+class Manifest:
+    """
+    Index of a migration folder: the ID, filename, size and SHA-256 of every
+    migration, in apply order.
+
+    Commands read the manifest instead of listing and parsing the folder.
+    Migration bodies are only read when they are needed, and are checked
+    against their hash when they are.
+    """
+
+    def __init__(self, entries: Optional[List[Dict]] = None):
+        self.entries = list(entries or [])
+        self._by_filename = {e["filename"]: e for e in self.entries}
+
+    @classmethod
+    def build(cls, migration_folder: str) -> "Manifest":
+        """
+        Build a manifest by hashing every migration file in the folder.
+        """
+        manifest = cls()
+        for filename in scan_migration_files(migration_folder):
+            manifest.add(migration_folder, filename)
+        return manifest
+
+    @classmethod
+    def load(cls, migration_folder: str) -> Optional["Manifest"]:
+        """
+        Read the folder's manifest, or return None if it has none.
+        """
+        try:
+            with open(os.path.join(migration_folder, MANIFEST_FILENAME), "r") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        if data.get("version") != MANIFEST_VERSION:
+            raise ManifestError(f"Unsupported manifest version: {data.get('version')}.")
+        return cls(data["migrations"])
+
+    def save(self, migration_folder: str) -> str:
+        path = os.path.join(migration_folder, MANIFEST_FILENAME)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"version": MANIFEST_VERSION, "migrations": self.entries}, f, indent=2)
+        os.replace(tmp_path, path)
+        return path
+
+    def add(self, migration_folder: str, filename: str) -> Dict:
+        """
+        Register a migration file, or refresh its entry if it is already
+        registered.
+        """
+        match = MIGRATION_FILE_RE.match(filename)
+        if not match:
+            raise ManifestError(f"{filename} is not a migration filename.")
+        with open(os.path.join(migration_folder, filename), "rb") as f:
+            content = f.read()
+        entry = {"id": int(match.group(1)), "filename": filename, "size": len(content), "sha256": _sha256(content)}
+        if filename in self._by_filename:
+            self.entries[self.entries.index(self._by_filename[filename])] = entry
+        else:
+            self.entries.append(entry)
+            self.entries.sort(key=lambda e: (e["id"], e["filename"]))
+        self._by_filename[filename] = entry
+        return entry
+
+    def filenames(self) -> List[str]:
+        return [e["filename"] for e in self.entries]
+
+    def checksum(self, filename: str) -> Optional[str]:
+        entry = self._by_filename.get(filename)
+        return entry["sha256"] if entry else None
+
+    def next_id(self) -> int:
+        return max((e["id"] for e in self.entries), default=0) + 1
+
+    def read(self, migration_folder: str, filename: str) -> bytes:
+        """
+        Read a migration file and check it against its entry.
+        """
+        entry = self._by_filename.get(filename)
+        if entry is None:
+            raise ManifestError(f"{filename} is not in the manifest.")
+        with open(os.path.join(migration_folder, filename), "rb") as f:
+            content = f.read()
+        if len(content) != entry["size"] or _sha256(content) != entry["sha256"]:
+            raise ManifestError(f"{filename} does not match its manifest entry; it was edited after it was added.")
+        return content
+
+    def load_migration(self, migration_folder: str, filename: str) -> Dict:
+        return json.loads(self.read(migration_folder, filename))
+
+    def verify(self, migration_folder: str) -> List[str]:
+        """
+        Problems with the folder: files that are missing, do not match
+        their hash, or are not in the manifest. Files whose size changed
+        are reported without being hashed, and nothing is parsed.
+        """
+        problems = []
+        for entry in self.entries:
+            path = os.path.join(migration_folder, entry["filename"])
+            if not os.path.exists(path):
+                problems.append(f"{entry['filename']} is missing.")
+                continue
+            try:
+                if os.path.getsize(path) != entry["size"]:
+                    raise ManifestError(f"{entry['filename']} changed size.")
+                self.read(migration_folder, entry["filename"])
+            except ManifestError as e:
+                problems.append(str(e))
+        for filename in scan_migration_files(migration_folder):
+            if filename not in self._by_filename:
+                problems.append(f"{filename} is not in the manifest.")
+        return problems
+
+
+def register_migration(migration_folder: str, filename: str) -> Manifest:
+    """
+    Add a new migration file to the folder's manifest, creating the manifest
+    from the folder's contents if there is none yet.
+    """
+    manifest = Manifest.load(migration_folder)
+    if manifest is None:
+        manifest = Manifest.build(migration_folder)
+    else:
+        manifest.add(migration_folder, filename)
+    manifest.save(migration_folder)
+    return manifest
+
+
+def add_arguments(parser):
+    parser.add_argument("--folder", default="migrations", help="Path to the migration folder.")
+    parser.add_argument(
+        "--check", action="store_true",
+        help="Check the folder against its manifest instead of regenerating it; exit 1 on mismatch."
+    )
+
+
+def run(args):
+    if args.check:
+        manifest = Manifest.load(args.folder)
+        problems = manifest.verify(args.folder) if manifest else [f"{args.folder} has no {MANIFEST_FILENAME}."]
+        for problem in problems:
+            print(problem)
+        sys.exit(1 if problems else 0)
+
+    path = Manifest.build(args.folder).save(args.folder)
+    print(f"Wrote manifest: {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate or check the manifest of a migration folder.")
+    add_arguments(parser)
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+from typing import Dict, Iterable, List, Tuple
+from weaviate_migrate.executor import Operation, reference_targets
+from weaviate_migrate.schema_index import SchemaIndex
+from weaviate_migrate.tenants import TENANT_OPERATIONS
+
+
+class Plan:
+    """
+    The optimized operations for a set of pending migrations, with counters
+    comparing it to applying the files literally.
+    """
+
+    def __init__(self):
+        self.operations = []
+        self.naive_calls = 0
+        self.folded = 0
+        self.cancelled = 0
+        self.deduplicated = 0
+
+    @property
+    def remote_calls(self) -> int:
+        return len(self.operations)
+
+    @property
+    def saved_calls(self) -> int:
+        return self.naive_calls - self.remote_calls
+
+    def describe(self) -> str:
+        """
+        Render the plan for a dry run.
+        """
+        lines = []
+        positions = {op: number for number, op in enumerate(self.operations, 1)}
+        for number, operation in enumerate(self.operations, 1):
+            line = f"{number:4d}. [{operation.migration}] {operation}"
+            if operation.kind == "create_class":
+                line += f" ({len(operation.definition.get('properties', []))} properties)"
+            if operation.depends_on:
+                after = ", ".join(str(positions[d]) for d in operation.depends_on)
+                line += f" after {after}"
+            lines.append(line)
+        lines.append(
+            f"{self.remote_calls} remote calls instead of {self.naive_calls} "
+            f"({self.saved_calls} saved: {self.folded} folded, {self.cancelled} cancelled; "
+            f"{self.deduplicated} no-ops dropped)"
+        )
+        return "\n".join(lines)
+
+
+def _literal_operations(migrations: Iterable[Tuple[str, Dict]], index, plan: Plan) -> List[Operation]:
+    """
+    The calls applying each file in turn would make, skipping entries that
+    are no-ops against the schema as it evolves.
+    """
+    # Work with the names migrations use, i.e. aliases rather than the
+    # classes behind them.
+    logical = {physical: alias for alias, physical in index.aliases.items()}
+    classes = {logical.get(c, c) for c in index.classes}
+    properties = {(logical.get(c, c), p) for c, p in index.properties}
+    operations = []
+
+    for migration, schema in migrations:
+        for class_definition in schema.get("classes", []):
+            class_name = class_definition["class"]
+            class_properties = class_definition.get("properties", [])
+            if class_name not in classes:
+                classes.add(class_name)
+                properties.update((class_name, p["name"]) for p in class_properties)
+                operations.append(Operation(
+                    "create_class", class_name,
+                    dict(class_definition, properties=list(class_properties)), migration
+                ))
+                continue
+            plan.deduplicated += 1
+            for property_definition in class_properties:
+                key = (class_name, property_definition["name"])
+                if key in properties:
+                    plan.deduplicated += 1
+                    continue
+                properties.add(key)
+                operations.append(Operation("create_property", class_name, property_definition, migration))
+
+        for entry in schema.get("operations", []):
+            class_name = entry["class"]
+            if entry["type"] == "delete_class":
+                if class_name not in classes:
+                    plan.deduplicated += 1
+                    continue
+                classes.discard(class_name)
+                properties = {p for p in properties if p[0] != class_name}
+                operations.append(Operation("delete_class", class_name, entry, migration))
+            elif entry["type"] == "data_migration" or entry["type"] in TENANT_OPERATIONS:
+                operations.append(Operation(entry["type"], class_name, entry, migration))
+            elif entry["type"] == "rebuild_class":
+                definition = dict(entry["definition"], **{"class": class_name})
+                new_properties = definition.get("properties") or []
+                properties = {p for p in properties if p[0] != class_name}
+                properties.update((class_name, p["name"]) for p in new_properties)
+                if class_name in classes:
+                    operations.append(Operation("rebuild_class", class_name, dict(entry, definition=definition), migration))
+                else:
+                    # Nothing to copy: the rebuild is a plain creation.
+                    classes.add(class_name)
+                    operations.append(Operation(
+                        "create_class", class_name, dict(definition, properties=list(new_properties)), migration
+                    ))
+            else:
+                raise ValueError(f"Unknown operation type: {entry['type']}")
+
+    plan.naive_calls = len(operations)
+    return operations
+
+
+def _link(operations: List[Operation]) -> None:
+    """
+    Record which operations each one has to wait for.
+    """
+    latest = {}
+    touching = {}
+    # A reference may point to a class only created by a later migration.
+    first_created = {}
+    for operation in operations:
+        if operation.kind == "create_class":
+            first_created.setdefault(operation.class_name, operation)
+
+    for operation in operations:
+        class_name = operation.class_name
+        if operation.kind == "create_property":
+            operation.requires = {class_name} | reference_targets(operation.definition)
+        elif operation.kind in ("data_migration", "rebuild_class") or operation.kind in TENANT_OPERATIONS:
+            operation.requires = {class_name}
+        for required in sorted(operation.requires):
+            creator = latest.get(required, first_created.get(required))
+            if creator is not None and creator is not operation:
+                operation.depends_on.append(creator)
+        if operation.kind == "create_class" and class_name in latest:
+            operation.depends_on.append(latest[class_name])
+        # Deletes, data migrations and tenant changes wait for every earlier
+        # change to the class, e.g. a backfill for the property it fills in.
+        if operation.kind in ("delete_class", "data_migration", "rebuild_class") \
+                or operation.kind in TENANT_OPERATIONS:
+            for other in touching.get(class_name, []):
+                if other not in operation.depends_on:
+                    operation.depends_on.append(other)
+        if operation.kind in ("create_class", "delete_class", "rebuild_class"):
+            latest[class_name] = operation
+            touching[class_name] = [operation]
+        else:
+            for required in operation.requires:
+                touching.setdefault(required, []).append(operation)
+
+
+def compile_plan(migrations: Iterable[Tuple[str, Dict]], index) -> Plan:
+    """
+    Compile pending migration files into an optimized operation graph.
+
+    Entries that are already satisfied are dropped, properties added to a
+    class created in the same run are folded into its creation, and classes
+    created and then deleted within the run are never created. A class
+    creation that references another new class waits for it; references to
+    classes created later in the plan stay separate property operations so
+    the graph has no cycles.
+    """
+    plan = Plan()
+    created = {}
+    position = {}
+    kept = []
+
+    def foldable(class_name, property_definition):
+        # Only fold references to classes that already exist or are created
+        # earlier in the plan, so class creations never wait on each other
+        # in a cycle.
+        for target in reference_targets(property_definition) - {class_name}:
+            if target in created:
+                if position[target] > position.get(class_name, len(position)):
+                    return False
+            elif not index.has_class(target):
+                return False
+        return True
+
+    def create(operation):
+        class_name = operation.class_name
+        inline, deferred = [], []
+        for property_definition in operation.definition["properties"]:
+            (inline if foldable(class_name, property_definition) else deferred).append(property_definition)
+        operation.definition["properties"] = inline
+        for property_definition in inline:
+            operation.requires |= reference_targets(property_definition) - {class_name}
+        created[class_name] = operation
+        position.setdefault(class_name, len(position))
+        kept.append(operation)
+        for property_definition in deferred:
+            deferred_operation = Operation("create_property", class_name, property_definition, operation.migration)
+            deferred_operation.migrations |= operation.migrations
+            kept.append(deferred_operation)
+
+    def cancel(class_name):
+        # Drop the pending calls on a class, returning the files they came
+        # from: whatever replaces them now carries those files.
+        nonlocal kept
+        cancelled, remaining = [], []
+        for op in kept:
+            (cancelled if op.class_name == class_name and op.kind != "delete_class" else remaining).append(op)
+        kept = remaining
+        plan.cancelled += len(cancelled)
+        return set().union(*(op.migrations for op in cancelled))
+
+    for operation in _literal_operations(migrations, index, plan):
+        class_name = operation.class_name
+        if operation.kind == "create_class":
+            create(operation)
+        elif operation.kind == "rebuild_class" and class_name in created:
+            # The class holds no data yet: create it with the new definition.
+            migrations_replaced = cancel(class_name)
+            definition = operation.definition["definition"]
+            creation = Operation(
+                "create_class", class_name,
+                dict(definition, properties=list(definition.get("properties") or [])), operation.migration
+            )
+            creation.migrations |= migrations_replaced
+            create(creation)
+        elif operation.kind == "create_property":
+            if class_name in created and foldable(class_name, operation.definition):
+                creator = created[class_name]
+                creator.definition["properties"].append(operation.definition)
+                creator.requires |= reference_targets(operation.definition) - {class_name}
+                creator.migrations |= operation.migrations
+                plan.folded += 1
+            else:
+                kept.append(operation)
+        elif operation.kind == "delete_class":
+            migrations_replaced = cancel(class_name)
+            if class_name in created:
+                # Created and deleted within this run: neither call is needed.
+                del created[class_name]
+                plan.cancelled += 1
+            else:
+                operation.migrations |= migrations_replaced
+                kept.append(operation)
+        else:
+            kept.append(operation)
+
+    _link(kept)
+    plan.operations = kept
+    return plan
+
+
+def build_operations(migrations: Iterable[Tuple[str, Dict]], index) -> List[Operation]:
+    """
+    The operation graph for the given migrations; see `compile_plan`.
+    """
+    return compile_plan(migrations, index).operations
+
+
+def replay_migrations(migrations: Iterable[Tuple[str, Dict]], index=None):
+    """
+    Compute the schema a sequence of migrations produces, purely in memory.
+
+    Starts from `index` (an empty schema by default) and updates it in place.
+    """
+    if index is None:
+        index = SchemaIndex()
+    for operation in _literal_operations(migrations, index, Plan()):
+        if operation.kind == "create_class":
+            index.add_class(operation.definition)
+        elif operation.kind == "create_property":
+            index.add_property(operation.class_name, operation.definition)
+        elif operation.kind == "delete_class":
+            index.remove_class(operation.class_name)
+        elif operation.kind == "rebuild_class":
+            index.remove_class(operation.class_name)
+            index.add_class(operation.definition["definition"])
+    return index
@@ -0,0 +1,19 @@
+from django.apps import AppConfig
+
+
+class WeaviateSyncConfig(AppConfig):
+    """
+    Keeps Weaviate in sync with the models selected by `WEAVIATE_SYNC`,
+    from their `post_save` and `post_delete` signals.
+    """
+
+    name = "weaviate_migrate.realtime"
+    label = "weaviate_realtime"
+    verbose_name = "Weaviate sync"
+
+    def ready(self):
+        from django.conf import settings
+        from weaviate_migrate.realtime.signals import connect_signals
+
+        if getattr(settings, "WEAVIATE_SYNC", None):
+            connect_signals(settings.WEAVIATE_SYNC)
@@ -0,0 +1,175 @@
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+from weaviate_migrate.backfill import check_batch_results
+from weaviate_migrate.rest import batch_objects
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_FLUSH_INTERVAL = 1.0
+DEFAULT_MAX_PENDING = 10000
+
+UPSERT = "upsert"
+DELETE = "delete"
+
+
+class SyncQueue:
+    """
+    Bounded in-process queue of object writes, flushed to Weaviate by a
+    background thread.
+
+    Writes are keyed by class and UUID, and a write to an object that is
+    already pending replaces it, so an object saved many times between two
+    flushes is written once. A batch is sent when `batch_size` objects are
+    pending, or when the oldest pending write is `flush_interval` seconds
+    old. Upserts go through the batch API; deletes are sent one by one.
+
+    With `resolve`, upserts are queued with any payload, and the background
+    thread turns the payloads of each batch into the objects to write with
+    `resolve(payloads)` just before sending it. Payloads it returns no
+    object for are not written.
+
+    `put` never blocks on Weaviate. When `max_pending` distinct objects are
+    already waiting, new writes are dropped and counted, keeping memory and
+    the latency of the calling thread bounded during write spikes; an
+    incremental sync catches the dropped rows up.
+    """
+
+    def __init__(self, connect: Callable, batch_size: int = DEFAULT_BATCH_SIZE,
+                 flush_interval: float = DEFAULT_FLUSH_INTERVAL, max_pending: int = DEFAULT_MAX_PENDING,
+                 resolve: Optional[Callable[[List], List[Dict]]] = None):
+        self.connect = connect
+        self.resolve = resolve
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.stats = {"written": 0, "deleted": 0, "coalesced": 0, "dropped": 0, "failed": 0}
+        self._pending = OrderedDict()
+        self._in_flight = 0
+        self._flushing = False
+        self._closed = False
+        self._condition = threading.Condition()
+        self._thread = None
+        self._client = None
+
+    def start(self) -> "SyncQueue":
+        self._thread = threading.Thread(target=self._run, name="weaviate-sync", daemon=True)
+        self._thread.start()
+        return self
+
+    def put(self, class_name: str, object_id: str, operation: str = UPSERT, obj: Optional[Dict] = None) -> bool:
+        """
+        Queue an upsert of `obj` or a delete of the object, returning False
+        if the write was dropped because the queue is full.
+        """
+        key = (class_name, object_id)
+        with self._condition:
+            entry = self._pending.get(key)
+            if entry is not None:
+                # Keep the object's place in the queue and its age.
+                self._pending[key] = (operation, obj, entry[2])
+                self.stats["coalesced"] += 1
+                return True
+            if self._closed or len(self._pending) >= self.max_pending:
+                self.stats["dropped"] += 1
+                if self.stats["dropped"] == 1 or self.stats["dropped"] % 1000 == 0:
+                    logger.warning(f"Weaviate sync queue is full; {self.stats['dropped']} write(s) dropped so far")
+                return False
+            self._pending[key] = (operation, obj, time.monotonic())
+            if len(self._pending) >= self.batch_size or len(self._pending) == 1:
+                self._condition.notify()
+            return True
+
+    def __len__(self) -> int:
+        with self._condition:
+            return len(self._pending) + self._in_flight
+
+    def _due(self) -> bool:
+        if not self._pending:
+            return False
+        if self._flushing or self._closed or len(self._pending) >= self.batch_size:
+            return True
+        _, _, enqueued_at = next(iter(self._pending.values()))
+        return time.monotonic() - enqueued_at >= self.flush_interval
+
+    def _take_batch(self):
+        with self._condition:
+            while not self._due():
+                if self._closed:
+                    return None
+                timeout = None
+                if self._pending:
+                    _, _, enqueued_at = next(iter(self._pending.values()))
+                    timeout = max(self.flush_interval - (time.monotonic() - enqueued_at), 0)
+                self._condition.wait(timeout)
+            batch = []
+            while self._pending and len(batch) < self.batch_size:
+                (class_name, object_id), (operation, obj, _) = self._pending.popitem(last=False)
+                batch.append((class_name, object_id, operation, obj))
+            self._in_flight = len(batch)
+            return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._take_batch()
+            if batch is None:
+                return
+            try:
+                self._write(batch)
+            except Exception as e:
+                self.stats["failed"] += len(batch)
+                logger.error(f"Could not write {len(batch)} object(s) to Weaviate: {e}")
+            with self._condition:
+                self._in_flight = 0
+                self._condition.notify_all()
+
+    def _write(self, batch) -> None:
+        if self._client is None:
+            self._client = self.connect()
+        upserts = [obj for _, _, operation, obj in batch if operation == UPSERT]
+        if upserts and self.resolve is not None:
+            upserts = self.resolve(upserts)
+        if upserts:
+            results = batch_objects(self._client, upserts)
+            check_batch_results(", ".join(sorted({obj["class"] for obj in upserts})), results)
+            self.stats["written"] += len(upserts)
+        for class_name, object_id, operation, _ in batch:
+            if operation == DELETE:
+                try:
+                    self._client.data_object.delete(object_id, class_name=class_name)
+                    self.stats["deleted"] += 1
+                except Exception as e:
+                    self.stats["failed"] += 1
+                    logger.error(f"Could not delete {class_name} {object_id} from Weaviate: {e}")
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Write everything pending now and wait for it, returning False if
+        `timeout` seconds passed first.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            self._flushing = True
+            self._condition.notify_all()
+            try:
+                while self._pending or self._in_flight:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        return False
+                    self._condition.wait(remaining)
+                return True
+            finally:
+                self._flushing = False
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """
+        Write what is pending and stop the background thread.
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
@@ -0,0 +1,183 @@
+import atexit
+import functools
+from typing import Dict, List, Optional, Tuple
+from weaviate_migrate.commands.django_makemigrations import get_models
+from weaviate_migrate.commands.django_sync import (
+    beacon, connect_client, iter_reference_pairs, many_to_many_fields, object_uuid, rows_to_objects, sync_fields,
+)
+from weaviate_migrate.realtime.queue import (
+    DEFAULT_BATCH_SIZE, DEFAULT_FLUSH_INTERVAL, DEFAULT_MAX_PENDING, DELETE, UPSERT, SyncQueue,
+)
+
+DISPATCH_UID = "weaviate_migrate.realtime"
+
+_queue: Optional[SyncQueue] = None
+_connected = []
+_connected_through = []
+
+
+def get_queue() -> Optional[SyncQueue]:
+    """
+    The queue the signal handlers write to, once `connect_signals` ran.
+    """
+    return _queue
+
+
+@functools.lru_cache(maxsize=None)
+def _model_fields(model, targets: frozenset = frozenset()):
+    fields = sync_fields(model, targets)
+    pk_index = [attname for _, attname, _ in fields].index(model._meta.pk.attname)
+    return fields, pk_index, many_to_many_fields(model, targets)
+
+
+def resolve_objects(rows: List[Tuple], targets=()) -> List[Dict]:
+    """
+    Batch API objects, as `weaviate-django-sync` writes them, for queued
+    `(model, pk)` rows, with their references to `targets`.
+
+    Runs on the queue's thread, so saving a row makes no query for it: each
+    model's rows are read in one query, and their many-to-many references,
+    which the upsert would otherwise drop, in one query per field. Rows
+    deleted since they were queued are left out.
+    """
+    from django.db import close_old_connections
+
+    pks_by_model = {}
+    for model, pk in rows:
+        pks_by_model.setdefault(model, []).append(pk)
+    objects = []
+    try:
+        for model, pks in pks_by_model.items():
+            fields, pk_index, many_to_many = _model_fields(model, frozenset(targets))
+            values = model._default_manager.order_by().filter(pk__in=pks).values_list(
+                *(attname for _, attname, _ in fields)
+            )
+            model_objects = rows_to_objects(model.__name__, model._meta.label, fields, pk_index, list(values))
+            by_id = {obj["id"]: obj for obj in model_objects}
+            for field in many_to_many:
+                for obj in model_objects:
+                    obj["properties"][field.name] = []
+                for source_pk, target_pk in iter_reference_pairs(model, field, pks=pks):
+                    by_id[object_uuid(model._meta.label, source_pk)]["properties"][field.name].append(
+                        {"beacon": beacon(field.related_model, target_pk)}
+                    )
+            objects.extend(model_objects)
+    finally:
+        # The queue's thread holds its own database connection.
+        close_old_connections()
+    return objects
+
+
+def resolve_queued(rows: List[Tuple]) -> List[Dict]:
+    """
+    `resolve_objects` for the rows the signal handlers queue, with their
+    references to the other connected models.
+    """
+    return resolve_objects(rows, _connected)
+
+
+def _enqueue_upsert(model, pk, using=None):
+    from django.db import transaction
+
+    object_id = object_uuid(model._meta.label, pk)
+    # Rolled back saves are not synced.
+    transaction.on_commit(lambda: _queue.put(model.__name__, object_id, UPSERT, (model, pk)), using=using)
+
+
+def _enqueue_save(sender, instance, raw=False, **kwargs):
+    if raw or _queue is None:
+        return
+    _enqueue_upsert(type(instance), instance.pk, kwargs.get("using"))
+
+
+def _enqueue_delete(sender, instance, **kwargs):
+    if _queue is None:
+        return
+    from django.db import transaction
+
+    model = type(instance)
+    class_name, object_id = model.__name__, object_uuid(model._meta.label, instance.pk)
+    transaction.on_commit(lambda: _queue.put(class_name, object_id, DELETE), using=kwargs.get("using"))
+
+
+def _enqueue_m2m_change(sender, instance, action, reverse, model, pk_set, **kwargs):
+    if _queue is None or action not in ("post_add", "post_remove", "pre_clear", "post_clear"):
+        return
+    using = kwargs.get("using")
+    if not reverse:
+        if action != "pre_clear":
+            _enqueue_upsert(type(instance), instance.pk, using)
+        return
+    # `instance` is a target: the objects whose references changed are the
+    # `model` rows in `pk_set`. A clear does not pass them, so they are read
+    # before the links are removed.
+    if action == "post_clear":
+        return
+    if action == "pre_clear":
+        field = next(f for f in model._meta.many_to_many if f.remote_field.through is sender)
+        source = sender._meta.get_field(field.m2m_field_name()).attname
+        target = sender._meta.get_field(field.m2m_reverse_field_name()).attname
+        pk_set = sender._default_manager.filter(**{target: instance.pk}).values_list(source, flat=True)
+    for pk in pk_set:
+        _enqueue_upsert(model, pk, using)
+
+
+def connect_signals(config: Dict, queue: Optional[SyncQueue] = None) -> List:
+    """
+    Sync the models selected by `config` on save and delete, and on changes
+    to their many-to-many relations between them, returning them.
+
+    `config` is the `WEAVIATE_SYNC` setting: `URL` and `API_KEY` of the
+    cluster, `MODEL_PREFIX` and `APP_LABELS` selecting models as
+    `weaviate-django-makemigrations` does, and the queue's `BATCH_SIZE`,
+    `FLUSH_INTERVAL` and `MAX_PENDING`. Writes go to `queue` when it is
+    given, which must be created with `resolve=resolve_queued`, or to a new
+    queue flushed when the process exits.
+    """
+    from django.db.models.signals import m2m_changed, post_delete, post_save
+
+    global _queue
+    disconnect_signals()
+    if queue is None:
+        queue = SyncQueue(
+            functools.partial(connect_client, config["URL"], config.get("API_KEY")),
+            resolve=resolve_queued,
+            batch_size=config.get("BATCH_SIZE", DEFAULT_BATCH_SIZE),
+            flush_interval=config.get("FLUSH_INTERVAL", DEFAULT_FLUSH_INTERVAL),
+            max_pending=config.get("MAX_PENDING", DEFAULT_MAX_PENDING),
+        ).start()
+        atexit.register(queue.close)
+    _queue = queue
+
+    models = get_models(config.get("MODEL_PREFIX", ""), config.get("APP_LABELS"))
+    for model in models:
+        post_save.connect(_enqueue_save, sender=model, dispatch_uid=(DISPATCH_UID, model._meta.label))
+        post_delete.connect(_enqueue_delete, sender=model, dispatch_uid=(DISPATCH_UID, model._meta.label))
+        for field in many_to_many_fields(model, models):
+            through = field.remote_field.through
+            m2m_changed.connect(
+                _enqueue_m2m_change, sender=through, dispatch_uid=(DISPATCH_UID, through._meta.label)
+            )
+            _connected_through.append(through)
+    _connected.extend(models)
+    return models
+
+
+def disconnect_signals() -> None:
+    """
+    Stop syncing on save and delete, and close the queue the handlers
+    wrote to after flushing it.
+    """
+    from django.db.models.signals import m2m_changed, post_delete, post_save
+
+    global _queue
+    for model in _connected:
+        post_save.disconnect(sender=model, dispatch_uid=(DISPATCH_UID, model._meta.label))
+        post_delete.disconnect(sender=model, dispatch_uid=(DISPATCH_UID, model._meta.label))
+    for through in _connected_through:
+        m2m_changed.disconnect(sender=through, dispatch_uid=(DISPATCH_UID, through._meta.label))
+    _connected.clear()
+    _connected_through.clear()
+    if _queue is not None:
+        _queue.close()
+    _queue = None
@@ -0,0 +1,138 @@
+import re
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor, ALL_COMPLETED, FIRST_COMPLETED, wait
+from typing import Callable, Dict, Optional
+from weaviate_migrate.backfill import DEFAULT_BATCH_SIZE, iter_pages, write_batch
+from weaviate_migrate.rest import aliases_supported, get_alias, set_alias
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = 4
+VERSIONED_CLASS_RE = re.compile(r"^(.*)_v(\d+)$")
+
+
+class RebuildError(Exception):
+    """
+    Raised when a rebuilt class does not match its source.
+    """
+
+
+def count_objects(client, class_name: str) -> int:
+    """
+    Number of objects in a class, from an aggregate query.
+    """
+    result = client.query.aggregate(class_name).with_meta_count().do()
+    return result["data"]["Aggregate"][class_name][0]["meta"]["count"]
+
+
+def shadow_class_name(class_name: str, physical_class: str) -> str:
+    """
+    Next versioned name for a class: `Article` and `Article_v2` are followed
+    by `Article_v2` and `Article_v3`.
+    """
+    match = VERSIONED_CLASS_RE.match(physical_class)
+    version = int(match.group(2)) + 1 if match and match.group(1) == class_name else 2
+    return f"{class_name}_v{version}"
+
+
+def copy_objects(client, source: str, target: str, definition: Dict, batch_size: int = DEFAULT_BATCH_SIZE,
+                 workers: int = DEFAULT_WORKERS, transform: Optional[Callable] = None) -> int:
+    """
+    Copy every object of `source` into `target`, keeping UUIDs and vectors.
+
+    Pages are read with cursor pagination and written by up to `workers`
+    concurrent batch requests. At most twice that many pages are held in
+    memory, whatever the size of the class. Properties the target definition
+    does not have are dropped; `transform` may convert the rest.
+    """
+    names = {p["name"] for p in definition.get("properties") or []}
+    copied = 0
+    in_flight = set()
+
+    def drain(return_when):
+        nonlocal in_flight
+        done, in_flight = wait(in_flight, return_when=return_when)
+        for future in done:
+            future.result()
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for page in iter_pages(client, source, batch_size):
+            objects = []
+            for obj in page:
+                properties = {k: v for k, v in (obj.get("properties") or {}).items() if k in names}
+                if transform is not None:
+                    properties = transform(properties)
+                objects.append(dict(obj, properties=properties))
+            in_flight.add(pool.submit(write_batch, client, target, objects))
+            copied += len(objects)
+            if len(in_flight) >= workers * 2:
+                drain(FIRST_COMPLETED)
+        if in_flight:
+            drain(ALL_COMPLETED)
+    return copied
+
+
+def rebuild_class(client, class_name: str, definition: Dict, batch_size: int = DEFAULT_BATCH_SIZE,
+                  workers: int = DEFAULT_WORKERS, transform: Optional[Callable] = None) -> Dict:
+    """
+    Rebuild a class under a new definition without re-vectorizing it.
+
+    A shadow class is created with the new definition, objects are copied
+    across with their vectors, and the object counts are compared. Then the
+    alias named after the class is pointed at the shadow and the old class
+    is dropped. When the counts differ, the shadow class is left in place
+    for inspection and nothing is swapped.
+
+    The server must support aliases; this is checked before anything is
+    created. If the class is not behind an alias yet, the alias cannot take
+    its name while it exists, so the old class is dropped only once the
+    shadow holds a verified copy of every object. Should the alias then
+    fail, a `RebuildError` names the shadow class holding the data.
+
+    Writes to the class should be paused while it is rebuilt.
+    """
+    if not aliases_supported(client):
+        raise RebuildError(f"Cannot rebuild {class_name}: the server does not support aliases.")
+    physical_class = get_alias(client, class_name) or class_name
+    shadow = shadow_class_name(class_name, physical_class)
+    shadow_definition = dict(definition, **{"class": shadow})
+
+    client.schema.create_class(shadow_definition)
+    start = time.perf_counter()
+    copied = copy_objects(client, physical_class, shadow, definition, batch_size, workers, transform)
+    seconds = time.perf_counter() - start
+
+    source_count = count_objects(client, physical_class)
+    target_count = count_objects(client, shadow)
+    if source_count != target_count:
+        raise RebuildError(
+            f"{shadow} has {target_count} objects but {physical_class} has {source_count}; "
+            f"{shadow} was left in place."
+        )
+
+    if physical_class != class_name:
+        set_alias(client, class_name, shadow)
+        client.schema.delete_class(physical_class)
+    else:
+        # A class and an alias cannot share a name.
+        client.schema.delete_class(physical_class)
+        try:
+            set_alias(client, class_name, shadow)
+        except Exception as e:
+            raise RebuildError(
+                f"{physical_class} was dropped but the alias {class_name} could not be created ({e}); "
+                f"its objects are in {shadow}."
+            ) from e
+
+    stats = {
+        "source": physical_class,
+        "shadow": shadow,
+        "definition": shadow_definition,
+        "copied": copied,
+        "seconds": seconds,
+        "objects_per_second": copied / seconds if seconds else 0.0,
+    }
+    logger.info(f"Rebuilt {class_name} as {shadow}: {copied} objects at {stats['objects_per_second']:.0f} objects/s")
+    return stats
+
@@ -0,0 +1,151 @@
+from typing import Dict, List, Optional
+
+
+class RestError(Exception):
+    """
+    Raised when a raw REST call returns an unexpected status code.
+    """
+
+    def __init__(self, message: str, status_code: int):
+        super().__init__(f"{message} (status {status_code})")
+        self.status_code = status_code
+
+
+def request(client, method: str, path: str, body: Optional[Dict] = None):
+    """
+    Make a raw REST call through the client's connection, for endpoints the
+    client library has no wrapper for. `path` is relative to `/v1`.
+    """
+    connection = client._connection
+    if method == "get" or (method == "delete" and body is None):
+        return getattr(connection, method)(path=path)
+    return getattr(connection, method)(path=path, weaviate_object=body)
+
+
+def _json(response, *expected_status):
+    if response.status_code not in expected_status:
+        raise RestError(f"Unexpected response from Weaviate: {response.text}", response.status_code)
+    return response.json() if response.content else None
+
+
+def list_aliases(client) -> Dict[str, str]:
+    """
+    Map of alias name to the class it points to. Servers without alias
+    support report none.
+    """
+    response = request(client, "get", "/aliases")
+    if getattr(response, "status_code", None) != 200:
+        return {}
+    return {a["alias"]: a["class"] for a in (response.json() or {}).get("aliases") or []}
+
+
+def aliases_supported(client) -> bool:
+    """
+    Whether the server has the alias API (Weaviate 1.32 and later).
+    """
+    return getattr(request(client, "get", "/aliases"), "status_code", None) == 200
+
+
+def class_exists(client, class_name: str) -> bool:
+    return getattr(request(client, "get", f"/schema/{class_name}"), "status_code", None) == 200
+
+
+def get_alias(client, alias: str) -> Optional[str]:
+    response = request(client, "get", f"/aliases/{alias}")
+    if response.status_code == 404:
+        return None
+    return _json(response, 200)["class"]
+
+
+def set_alias(client, alias: str, class_name: str) -> None:
+    """
+    Point an alias at a class, creating the alias if needed.
+    """
+    if get_alias(client, alias) is None:
+        _json(request(client, "post", "/aliases", {"alias": alias, "class": class_name}), 200)
+    else:
+        _json(request(client, "put", f"/aliases/{alias}", {"class": class_name}), 200)
+
+
+def delete_alias(client, alias: str) -> None:
+    _json(request(client, "delete", f"/aliases/{alias}"), 200, 204, 404)
+
+
+def batch_objects(client, objects: List[Dict]) -> List[Dict]:
+    """
+    Write objects in one batch request and return the per-object results.
+
+    Unlike `client.batch`, this keeps no shared buffer, so concurrent
+    callers can each send their own batch.
+    """
+    return _json(request(client, "post", "/batch/objects", {"objects": objects}), 200) or []
+
+
+def batch_delete_objects(client, class_name: str, ids: List[str]) -> int:
+    """
+    Delete objects of a class by UUID in one batch request, returning how
+    many were deleted. Weaviate caps the objects one request deletes at its
+    QUERY_MAXIMUM_RESULTS, 10000 by default.
+    """
+    body = {
+        "match": {"class": class_name, "where": {"path": ["id"], "operator": "ContainsAny", "valueTextArray": ids}},
+        "output": "minimal",
+    }
+    result = _json(request(client, "delete", "/batch/objects", body), 200) or {}
+    return (result.get("results") or {}).get("successful", 0)
+
+
+def batch_references(client, references: List[Dict]) -> List[Dict]:
+    """
+    Add cross-references in one batch request and return the per-reference
+    results. Each reference has a `from` beacon ending in the property name
+    and a `to` beacon.
+    """
+    return _json(request(client, "post", "/batch/references", references), 200) or []
+
+
+def list_tenants(client, class_name: str) -> Dict[str, str]:
+    """
+    Map of tenant name to activity status for a multi-tenant class.
+    """
+    tenants = _json(request(client, "get", f"/schema/{class_name}/tenants"), 200) or []
+    return {t["name"]: t.get("activityStatus", "HOT") for t in tenants}
+
+
+def add_tenants(client, class_name: str, tenants: List[Dict]) -> None:
+    """
+    Add tenants, each a `name` and optionally an `activityStatus`, in one
+    request.
+    """
+    _json(request(client, "post", f"/schema/{class_name}/tenants", tenants), 200)
+
+
+def update_tenants(client, class_name: str, tenants: List[Dict]) -> None:
+    """
+    Set the `activityStatus` of tenants in one request.
+    """
+    _json(request(client, "put", f"/schema/{class_name}/tenants", tenants), 200)
+
+
+def delete_tenants(client, class_name: str, names: List[str]) -> None:
+    _json(request(client, "delete", f"/schema/{class_name}/tenants", names), 200, 204)
+
+
+def aggregate_count(client, class_name: str) -> Optional[int]:
+    """
+    Number of objects in a class from an aggregate query, or None when the
+    server cannot count it, e.g. for a multi-tenant class.
+    """
+    query = {"query": f"{{Aggregate{{{class_name}{{meta{{count}}}}}}}}"}
+    result = _json(request(client, "post", "/graphql", query), 200) or {}
+    if result.get("errors"):
+        return None
+    rows = ((result.get("data") or {}).get("Aggregate") or {}).get(class_name) or []
+    return rows[0]["meta"]["count"] if rows else None
+
+
+def list_shards(client, class_name: str) -> List[Dict]:
+    """
+    The shards of a class with their `name` and `status`.
+    """
+    return _json(request(client, "get", f"/schema/{class_name}/shards"), 200) or []
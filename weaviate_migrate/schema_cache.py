@@ -0,0 +1,106 @@
+import os
+import json
+import time
+import hashlib
+import logging
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"), "weaviate-migrate"
+)
+# The cache is off unless a TTL is given: a stale schema produces a wrong
+# diff without any warning.
+DEFAULT_CACHE_TTL = 0
+
+
+def schema_hash(schema: Dict) -> str:
+    """
+    Canonical content hash of a schema.
+
+    Classes are ordered by name and their properties by name, so schemas
+    that differ only in ordering share a hash.
+    """
+    classes = []
+    for class_definition in sorted((schema or {}).get("classes") or [], key=lambda c: c["class"]):
+        classes.append(dict(class_definition, properties=sorted(
+            class_definition.get("properties") or [], key=lambda p: p["name"]
+        )))
+    encoded = json.dumps(classes, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class SchemaCache:
+    """
+    On-disk cache of the last schema fetched from each cluster, one JSON
+    file per cluster URL.
+
+    Weaviate exposes no cheap marker of a schema change, so an entry is
+    reused for `ttl` seconds without asking the server and may be stale:
+    the TTL bounds how long a change made outside of this tool can go
+    unnoticed. With the default TTL of 0 nothing is cached. `migrate`
+    invalidates the entry of the cluster it changes, and an entry whose
+    schema no longer matches its stored hash is refetched.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, ttl: float = DEFAULT_CACHE_TTL):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+
+    def path(self, url: str) -> str:
+        key = hashlib.sha256(url.rstrip("/").encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"schema-{key}.json")
+
+    def get(self, url: str) -> Optional[Dict]:
+        try:
+            with open(self.path(url), "r") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get("url") != url.rstrip("/"):
+            return None
+        return entry
+
+    def put(self, url: str, schema: Dict) -> Dict:
+        entry = {
+            "url": url.rstrip("/"),
+            "hash": schema_hash(schema),
+            "fetchedAt": time.time(),
+            "schema": schema,
+        }
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self.path(url)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+        return entry
+
+    def invalidate(self, url: str) -> None:
+        try:
+            os.remove(self.path(url))
+        except FileNotFoundError:
+            pass
+
+    def is_valid(self, entry: Dict) -> bool:
+        if time.time() - entry.get("fetchedAt", 0) >= self.ttl:
+            return False
+        return entry.get("hash") == schema_hash(entry.get("schema"))
+
+    def fetch(self, client, url: str, refresh: bool = False) -> Dict:
+        """
+        Return the live schema, from the cache while its entry is younger
+        than the TTL. A cache hit makes no request at all.
+        """
+        if self.ttl <= 0:
+            return client.schema.get()
+        entry = None if refresh else self.get(url)
+        if entry is not None and self.is_valid(entry):
+            age = time.time() - entry["fetchedAt"]
+            logger.info(f"Using the schema of {url} cached {age:.0f}s ago ({entry['hash'][:12]}); "
+                        f"pass --refresh after changes made outside of weaviate-migrate")
+            return entry["schema"]
+        schema = client.schema.get()
+        self.put(url, schema)
+        return schema
@@ -0,0 +1,98 @@
+from typing import Dict, Optional
+from weaviate_migrate.rest import list_aliases
+
+
+class SchemaIndex:
+    """
+    In-memory index of a Weaviate schema.
+
+    Classes are keyed by name and properties by (class, name), so existence
+    checks while applying a migration are O(1) instead of scanning every
+    class in the schema. Lookups accept alias names and resolve them to the
+    class the alias points to.
+    """
+
+    def __init__(self, schema: Optional[Dict] = None):
+        self.classes = {}
+        self.properties = {}
+        self.aliases = {}
+        self.fetch_count = 0
+        if schema:
+            self.load(schema)
+
+    @classmethod
+    def from_client(cls, client) -> "SchemaIndex":
+        """
+        Build an index from the live schema of a Weaviate instance.
+        """
+        index = cls()
+        index.refresh(client)
+        return index
+
+    def refresh(self, client) -> None:
+        """
+        Refetch the live schema, e.g. after the server reported a conflict
+        showing the local copy is stale.
+        """
+        self.load(client.schema.get())
+        self.aliases = list_aliases(client)
+        self.fetch_count += 1
+
+    def load(self, schema: Dict) -> None:
+        """
+        Replace the indexed state with the given schema.
+        """
+        self.classes = {}
+        self.properties = {}
+        for class_definition in schema.get("classes") or []:
+            self.add_class(class_definition)
+
+    def resolve(self, class_name: str) -> str:
+        """
+        The physical class behind a name, which may be an alias.
+        """
+        return self.aliases.get(class_name, class_name)
+
+    def has_class(self, class_name: str) -> bool:
+        return self.resolve(class_name) in self.classes
+
+    def has_property(self, class_name: str, property_name: str) -> bool:
+        return (self.resolve(class_name), property_name) in self.properties
+
+    def add_class(self, class_definition: Dict) -> None:
+        """
+        Record a created class, including the properties it was created with.
+        """
+        class_name = class_definition["class"]
+        self.classes[class_name] = class_definition
+        for property_definition in class_definition.get("properties") or []:
+            self.properties[(class_name, property_definition["name"])] = property_definition
+
+    def add_property(self, class_name: str, property_definition: Dict) -> None:
+        """
+        Record a property created on an existing class.
+        """
+        self.properties[(self.resolve(class_name), property_definition["name"])] = property_definition
+
+    def remove_class(self, class_name: str) -> None:
+        """
+        Forget a deleted class and its properties, and the alias it was
+        reached through.
+        """
+        class_name = self.aliases.pop(class_name, class_name)
+        self.classes.pop(class_name, None)
+        self.properties = {
+            key: p for key, p in self.properties.items() if key[0] != class_name
+        }
+
+    def to_schema(self) -> Dict:
+        """
+        Return the indexed state in the shape returned by `client.schema.get()`.
+        """
+        classes = {}
+        for class_name, class_definition in self.classes.items():
+            classes[class_name] = dict(class_definition, properties=[])
+        for (class_name, _), property_definition in self.properties.items():
+            classes.setdefault(class_name, {"class": class_name, "properties": []})
+            classes[class_name]["properties"].append(property_definition)
+        return {"classes": list(classes.values())}
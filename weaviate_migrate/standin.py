@@ -0,0 +1,502 @@
+import re
+import json
+import time
+import random
+import http.client
+import asyncio
+import argparse
+import threading
+from http import HTTPStatus
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlencode, urlparse, urlsplit
+from uuid import uuid4
+from weaviate_migrate.rest import RestError
+
+
+class StandInState:
+    """
+    In-memory schema, objects and tenants of a stand-in server.
+    """
+
+    def __init__(self):
+        self.classes = {}
+        self.objects = {}
+        self.tenants = {}
+        self.requests = 0
+        self.throttled = 0
+        self.failed = 0
+
+    def schema(self) -> Dict:
+        return {"classes": list(self.classes.values())}
+
+    def reset(self) -> None:
+        self.classes.clear()
+        self.objects.clear()
+        self.tenants.clear()
+
+
+def _error(status: int, message: str) -> Tuple[int, Dict]:
+    return status, {"error": [{"message": message}]}
+
+
+def route(state: StandInState, method: str, path: str, query: Dict, body) -> Tuple[int, Optional[object]]:
+    """
+    Serve one request against `state`, returning the status code and the
+    JSON body of the response.
+    """
+    parts = [p for p in path.split("/") if p]
+    if parts[:1] != ["v1"]:
+        return _error(404, f"No route for {path}")
+    parts = parts[1:]
+    if parts == [".well-known", "ready"] and method == "GET":
+        return 200, None
+    if parts == ["schema"]:
+        if method == "GET":
+            return 200, state.schema()
+        if method == "POST":
+            if body["class"] in state.classes:
+                return _error(422, f"class name {body['class']} already exists")
+            state.classes[body["class"]] = dict(body, properties=list(body.get("properties") or []))
+            state.objects[body["class"]] = {}
+            if (body.get("multiTenancyConfig") or {}).get("enabled"):
+                state.tenants[body["class"]] = {}
+            return 200, body
+    if len(parts) == 2 and parts[0] == "schema" and method == "GET":
+        if parts[1] not in state.classes:
+            return _error(404, f"class {parts[1]} not found")
+        return 200, state.classes[parts[1]]
+    if len(parts) == 2 and parts[0] == "schema" and method == "DELETE":
+        state.classes.pop(parts[1], None)
+        state.objects.pop(parts[1], None)
+        state.tenants.pop(parts[1], None)
+        return 200, None
+    if len(parts) == 3 and parts[0] == "schema" and parts[2] == "tenants":
+        return _tenants(state, method, parts[1], body)
+    if len(parts) == 3 and parts[0] == "schema" and parts[2] == "shards" and method == "GET":
+        class_definition = state.classes.get(parts[1])
+        if class_definition is None:
+            return _error(404, f"class {parts[1]} not found")
+        shards = (class_definition.get("shardingConfig") or {}).get("desiredCount") or 1
+        return 200, [{"name": f"shard{i}", "status": "READY"} for i in range(shards)]
+    if parts == ["graphql"] and method == "POST":
+        return _aggregate(state, body["query"])
+    if len(parts) == 3 and parts[0] == "schema" and parts[2] == "properties" and method == "POST":
+        class_definition = state.classes.get(parts[1])
+        if class_definition is None:
+            return _error(404, f"class {parts[1]} not found")
+        if any(p["name"] == body["name"] for p in class_definition["properties"]):
+            return _error(422, f"property {body['name']} already exists")
+        class_definition["properties"].append(body)
+        return 200, body
+    if parts == ["aliases"] and method == "GET":
+        return 200, {"aliases": []}
+    if parts == ["objects"] and method == "GET":
+        return _list_objects(state, query)
+    if parts == ["objects"] and method == "POST":
+        objects = state.objects.get(body["class"])
+        if objects is None:
+            return _error(422, f"class {body['class']} not found")
+        if body["id"] in objects:
+            return _error(422, f"object {body['id']} already exists")
+        objects[body["id"]] = body
+        return 200, body
+    if len(parts) == 3 and parts[0] == "objects" and method in ("GET", "DELETE"):
+        objects = state.objects.get(parts[1]) or {}
+        if parts[2] not in objects:
+            return _error(404, f"object {parts[2]} not found")
+        if method == "DELETE":
+            del objects[parts[2]]
+            return 204, None
+        return 200, objects[parts[2]]
+    if parts == ["batch", "objects"] and method == "POST":
+        return _batch_objects(state, body)
+    if parts == ["batch", "objects"] and method == "DELETE":
+        return _batch_delete(state, body)
+    if parts == ["batch", "references"] and method == "POST":
+        return _batch_references(state, body)
+    return _error(404, f"No route for {method} {path}")
+
+
+def _tenants(state: StandInState, method: str, class_name: str, body):
+    if class_name not in state.classes:
+        return _error(404, f"class {class_name} not found")
+    tenants = state.tenants.get(class_name)
+    if tenants is None:
+        return _error(422, f"multi-tenancy is not enabled for class {class_name}")
+    if method == "GET":
+        return 200, [{"name": name, "activityStatus": status} for name, status in tenants.items()]
+    if method == "POST":
+        for tenant in body:
+            tenants.setdefault(tenant["name"], tenant.get("activityStatus", "HOT"))
+        return 200, body
+    if method == "PUT":
+        missing = [t["name"] for t in body if t["name"] not in tenants]
+        if missing:
+            return _error(422, f"tenants not found: {', '.join(missing)}")
+        for tenant in body:
+            tenants[tenant["name"]] = tenant["activityStatus"]
+        return 200, body
+    if method == "DELETE":
+        for name in body:
+            tenants.pop(name, None)
+        return 200, None
+    return _error(404, f"No route for {method} /schema/{class_name}/tenants")
+
+
+def _aggregate(state: StandInState, query: str):
+    # Only object counts are supported: {Aggregate{<class>{meta{count}}}}.
+    match = re.fullmatch(r"\s*\{\s*Aggregate\s*\{\s*(\w+)\s*\{\s*meta\s*\{\s*count\s*\}\s*\}\s*\}\s*\}\s*", query)
+    if match is None:
+        return 200, {"errors": [{"message": "the stand-in server only answers object count aggregations"}]}
+    class_name = match.group(1)
+    if class_name not in state.objects:
+        return 200, {"errors": [{"message": f"class {class_name} not found"}]}
+    if class_name in state.tenants:
+        return 200, {"errors": [{"message": f"class {class_name} has multi-tenancy enabled, but request was "
+                                            f"without tenant"}]}
+    return 200, {"data": {"Aggregate": {class_name: [{"meta": {"count": len(state.objects[class_name])}}]}}}
+
+
+def _list_objects(state: StandInState, query: Dict):
+    class_name = query["class"][0]
+    limit = int(query.get("limit", ["25"])[0])
+    after = query.get("after", [None])[0]
+    objects = state.objects.get(class_name)
+    if objects is None:
+        return _error(404, f"class {class_name} not found")
+    ids = sorted(objects)
+    if after is not None:
+        ids = [i for i in ids if i > after]
+    return 200, {"objects": [objects[i] for i in ids[:limit]]}
+
+
+def _batch_objects(state: StandInState, body: Dict):
+    results = []
+    for obj in body.get("objects") or []:
+        objects = state.objects.get(obj["class"])
+        if objects is None:
+            results.append(dict(obj, result={"errors": {"error": [{"message": f"class {obj['class']} not found"}]}}))
+            continue
+        objects[obj["id"]] = obj
+        results.append(dict(obj, result={}))
+    return 200, results
+
+
+def _batch_delete(state: StandInState, body: Dict):
+    # Only deletes by UUID are supported: {"path": ["id"], "operator": "ContainsAny"}.
+    match = body["match"]
+    where = match["where"]
+    if where.get("path") != ["id"] or where.get("operator") != "ContainsAny":
+        return _error(422, "the stand-in server only deletes objects by id")
+    objects = state.objects.get(match["class"])
+    if objects is None:
+        return _error(422, f"class {match['class']} not found")
+    ids = [i for i in where["valueTextArray"] if i in objects]
+    for object_id in ids:
+        del objects[object_id]
+    return 200, {"match": match, "output": body.get("output", "minimal"),
+                 "results": {"matches": len(ids), "successful": len(ids), "failed": 0}}
+
+
+def _batch_references(state: StandInState, body: List[Dict]):
+    results = []
+    for reference in body or []:
+        # weaviate://localhost/<class>/<uuid>/<property>
+        class_name, object_id, property_name = reference["from"].split("/")[-3:]
+        obj = (state.objects.get(class_name) or {}).get(object_id)
+        if obj is None:
+            message = f"source object {class_name}/{object_id} not found"
+            results.append(dict(reference, result={"errors": {"error": [{"message": message}]}}))
+            continue
+        beacons = obj.setdefault("properties", {}).setdefault(property_name, [])
+        if all(b["beacon"] != reference["to"] for b in beacons):
+            beacons.append({"beacon": reference["to"]})
+        results.append(dict(reference, result={}))
+    return 200, results
+
+
+class StandInServer:
+    """
+    A local HTTP server implementing the subset of the Weaviate REST API the
+    migration tool uses, for benchmarks and end-to-end tests that must not
+    depend on a real cluster.
+
+    Every request is delayed by `latency` seconds to model network round
+    trips. Requests are served on a single asyncio event loop, so concurrent
+    clients overlap their delays as they would against a real server
+    without the server's own threads competing for the GIL.
+
+    Faults are injected before a request is served, so a failed request
+    changes nothing. Requests beyond `rate_limit` per second, and a
+    `throttle_rate` share of the others, are answered with 429 and a
+    `Retry-After` header; an `error_rate` share gets a 500. Draws come from
+    a generator seeded with `seed`, so a run can be replayed.
+
+    Usage::
+
+        with StandInServer(latency=0.005, throttle_rate=0.1) as server:
+            url = server.url
+    """
+
+    def __init__(self, latency: float = 0.0, host: str = "127.0.0.1", port: int = 0,
+                 state: Optional[StandInState] = None, throttle_rate: float = 0.0, error_rate: float = 0.0,
+                 rate_limit: Optional[float] = None, retry_after: int = 1, seed: Optional[int] = None):
+        self.latency = latency
+        self.host = host
+        self.port = port
+        self.state = state or StandInState()
+        self.throttle_rate = throttle_rate
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.retry_after = retry_after
+        self._random = random.Random(seed)
+        self._tokens = rate_limit
+        self._refilled_at = None
+        self._loop = None
+        self._stopped = None
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def _over_rate_limit(self) -> bool:
+        # A token bucket holding one second of requests.
+        if self.rate_limit is None:
+            return False
+        now = time.monotonic()
+        if self._refilled_at is not None:
+            self._tokens = min(self._tokens + (now - self._refilled_at) * self.rate_limit, self.rate_limit)
+        self._refilled_at = now
+        if self._tokens < 1:
+            return True
+        self._tokens -= 1
+        return False
+
+    def _fault(self, path: str) -> Optional[Tuple[int, Dict]]:
+        """
+        The injected failure response for a request, if it gets one.
+        """
+        if path.startswith("/v1/.well-known/"):
+            return None
+        if self._over_rate_limit() or self._random.random() < self.throttle_rate:
+            self.state.throttled += 1
+            return _error(429, "too many requests")
+        if self._random.random() < self.error_rate:
+            self.state.failed += 1
+            return _error(500, "injected failure")
+        return None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    return
+                method, target, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get("content-length") or 0)
+                body = json.loads(await reader.readexactly(length)) if length else None
+
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+                self.state.requests += 1
+                url = urlparse(target)
+                fault = self._fault(url.path)
+                if fault is not None:
+                    status, response = fault
+                else:
+                    status, response = route(self.state, method, url.path, parse_qs(url.query), body)
+
+                payload = json.dumps(response).encode("utf-8") if response is not None else b""
+                retry_after = f"Retry-After: {self.retry_after}\r\n" if status == 429 else ""
+                writer.write(
+                    f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n"
+                    f"Content-Type: application/json\r\n{retry_after}"
+                    f"Content-Length: {len(payload)}\r\n\r\n".encode("latin-1") + payload
+                )
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    return
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            # Clients hang up, and open connections are cancelled on stop.
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, on_ready: Optional[Callable] = None) -> None:
+        """
+        Serve until `stop` is called.
+        """
+        self._loop = asyncio.get_running_loop()
+        self._stopped = asyncio.Event()
+        server = await asyncio.start_server(self._handle, self.host, self.port, backlog=1024)
+        self.port = server.sockets[0].getsockname()[1]
+        if on_ready:
+            on_ready()
+        async with server:
+            await self._stopped.wait()
+
+    def start(self) -> "StandInServer":
+        """
+        Serve from a background thread.
+        """
+        ready = threading.Event()
+        self._thread = threading.Thread(target=asyncio.run, args=(self.serve(ready.set),), daemon=True)
+        self._thread.start()
+        ready.wait()
+        return self
+
+    def stop(self) -> None:
+        self._loop.call_soon_threadsafe(self._stopped.set)
+        self._thread.join()
+
+    def __enter__(self) -> "StandInServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+
+class _StandInResponse:
+    def __init__(self, response):
+        self.status_code = response.status
+        self.headers = {name.lower(): value for name, value in response.getheaders()}
+        self.content = response.read()
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", "replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class _StandInConnection:
+    """
+    Keep-alive HTTP connections to a stand-in server, one per thread.
+    """
+
+    def __init__(self, url: str):
+        self.url = url
+        self._address = urlsplit(url).netloc
+        self._local = threading.local()
+
+    def _get_request_header(self) -> Dict:
+        return {"content-type": "application/json"}
+
+    def _request(self, method: str, path: str, body=None, params: Optional[Dict] = None) -> _StandInResponse:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._local.connection = http.client.HTTPConnection(self._address)
+        target = f"/v1{path}" + (f"?{urlencode(params)}" if params else "")
+        payload = json.dumps(body).encode("utf-8") if body is not None else None
+        connection.request(method, target, payload, self._get_request_header())
+        return _StandInResponse(connection.getresponse())
+
+    def get(self, path: str, params: Optional[Dict] = None):
+        return self._request("GET", path, params=params)
+
+    def delete(self, path: str, weaviate_object=None):
+        return self._request("DELETE", path, weaviate_object)
+
+    def post(self, path: str, weaviate_object=None):
+        return self._request("POST", path, weaviate_object)
+
+    def put(self, path: str, weaviate_object=None):
+        return self._request("PUT", path, weaviate_object)
+
+    def checked(self, response, *expected_status):
+        if response.status_code not in (expected_status or (200,)):
+            raise RestError(f"Unexpected response from Weaviate: {response.text}", response.status_code)
+        return response.json() if response.content else None
+
+
+class _StandInSchema:
+    def __init__(self, connection: _StandInConnection):
+        self._connection = connection
+
+    def get(self) -> Dict:
+        return self._connection.checked(self._connection.get("/schema"))
+
+    def create_class(self, class_definition: Dict) -> None:
+        self._connection.checked(self._connection.post("/schema", class_definition))
+
+    def create_property(self, class_name: str, property_definition: Dict) -> None:
+        self._connection.checked(self._connection.post(f"/schema/{class_name}/properties", property_definition))
+
+    def delete_class(self, class_name: str) -> None:
+        self._connection.checked(self._connection.delete(f"/schema/{class_name}"))
+
+
+class _StandInDataObject:
+    def __init__(self, connection: _StandInConnection):
+        self._connection = connection
+
+    def get(self, class_name: str, limit: int = 25, after: Optional[str] = None, with_vector: bool = False) -> Dict:
+        params = {"class": class_name, "limit": limit}
+        if after:
+            params["after"] = after
+        if with_vector:
+            params["include"] = "vector"
+        return self._connection.checked(self._connection.get("/objects", params))
+
+    def get_by_id(self, uuid: str, class_name: Optional[str] = None, with_vector: bool = False) -> Optional[Dict]:
+        response = self._connection.get(f"/objects/{class_name}/{uuid}")
+        return None if response.status_code == 404 else self._connection.checked(response)
+
+    def delete(self, uuid: str, class_name: Optional[str] = None) -> None:
+        self._connection.checked(self._connection.delete(f"/objects/{class_name}/{uuid}"), 204)
+
+    def create(self, data_object: Dict, class_name: str, uuid: Optional[str] = None) -> str:
+        obj = {"class": class_name, "id": uuid or str(uuid4()), "properties": data_object}
+        return self._connection.checked(self._connection.post("/objects", obj))["id"]
+
+
+class StandInClient:
+    """
+    Minimal synchronous client for a stand-in server, exposing the parts of
+    the `weaviate.Client` interface the migration tool calls.
+    """
+
+    def __init__(self, url: str):
+        self._connection = _StandInConnection(url)
+        self.schema = _StandInSchema(self._connection)
+        self.data_object = _StandInDataObject(self._connection)
+
+    def close(self) -> None:
+        connection = getattr(self._connection._local, "connection", None)
+        if connection is not None:
+            connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local stand-in for the Weaviate REST API.")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on.")
+    parser.add_argument("--port", type=int, default=8080, help="Port to listen on (0 picks a free one).")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every request.")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Share of requests answered with 429.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with 500.")
+    parser.add_argument("--rate-limit", type=float, default=None, help="Requests per second served before 429s.")
+    parser.add_argument("--retry-after", type=int, default=1, help="Seconds in the Retry-After header of a 429.")
+    parser.add_argument("--seed", type=int, default=None, help="Seed of the fault injection, to replay a run.")
+    args = parser.parse_args()
+
+    server = StandInServer(
+        args.latency, args.host, args.port, throttle_rate=args.throttle_rate, error_rate=args.error_rate,
+        rate_limit=args.rate_limit, retry_after=args.retry_after, seed=args.seed,
+    )
+    try:
+        asyncio.run(server.serve(on_ready=lambda: print(server.url, flush=True)))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
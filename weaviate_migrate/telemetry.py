@@ -0,0 +1,357 @@
+import os
+import sys
+import json
+import time
+import logging
+import itertools
+import threading
+import contextvars
+from contextlib import contextmanager, nullcontext
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+PROMETHEUS_PREFIX = "weaviate_migrate"
+PROFILE_TOP = 25
+
+# Counters every run reports, with their Prometheus help text.
+COUNTERS = {
+    "requests": "Remote requests made.",
+    "errors": "Remote requests answered with an error status or not answered.",
+    "retries": "Remote requests sent again after a failure.",
+    "bytes_sent": "Bytes of request bodies sent.",
+    "bytes_received": "Bytes of response bodies received.",
+}
+
+_tracer: Optional["Tracer"] = None
+_current_span = contextvars.ContextVar("weaviate_migrate_span", default=None)
+
+
+class Span:
+    """
+    One timed step of a run. `start` is in seconds since the run started.
+    """
+
+    __slots__ = ("id", "parent_id", "name", "attributes", "start", "duration", "error")
+
+    def __init__(self, span_id: int, parent_id: Optional[int], name: str, attributes: Dict, start: float):
+        self.id = span_id
+        self.parent_id = parent_id
+        self.name = name
+        self.attributes = attributes
+        self.start = start
+        self.duration = 0.0
+        self.error = None
+
+    def to_dict(self) -> Dict:
+        return {
+            "id": self.id, "parentId": self.parent_id, "name": self.name, "attributes": self.attributes,
+            "start": round(self.start, 6), "duration": round(self.duration, 6), "error": self.error,
+        }
+
+
+class Tracer:
+    """
+    Spans and counters of one command run.
+
+    Spans nest through a context variable, so a request made while an
+    operation runs is recorded as its child, on worker threads and asyncio
+    tasks alike.
+    """
+
+    def __init__(self, command: str):
+        self.command = command
+        self.started_at = time.time()
+        self.spans = []
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self._start = time.perf_counter()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        parent = _current_span.get()
+        span = Span(next(self._ids), parent.id if parent else None, name, attributes,
+                    time.perf_counter() - self._start)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            span.duration = time.perf_counter() - self._start - span.start
+            _current_span.reset(token)
+            with self._lock:
+                self.spans.append(span)
+
+    def count(self, name: str, value: int = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self._start
+
+    def summary(self) -> Dict[str, Dict]:
+        """
+        Count, total and longest duration of the spans of each name.
+        """
+        summary = {}
+        for span in self.spans:
+            entry = summary.setdefault(span.name, {"count": 0, "seconds": 0.0, "maxSeconds": 0.0, "errors": 0})
+            entry["count"] += 1
+            entry["seconds"] += span.duration
+            entry["maxSeconds"] = max(entry["maxSeconds"], span.duration)
+            entry["errors"] += span.error is not None
+        return summary
+
+    def migrations(self) -> Dict[str, Dict]:
+        """
+        Time spent on each migration file, from the spans tagged with it.
+
+        Operations of different files run interleaved, so besides the busy
+        time, the sum of their spans, each file reports the wall-clock time
+        from its first operation starting to its last one ending.
+        """
+        extents = {}
+        for span in self.spans:
+            migration = span.attributes.get("migration")
+            if migration is None or span.name != "operation":
+                continue
+            entry = extents.setdefault(migration, {"operations": 0, "busySeconds": 0.0, "start": span.start,
+                                                   "end": span.start + span.duration, "errors": 0})
+            entry["operations"] += 1
+            entry["busySeconds"] += span.duration
+            entry["start"] = min(entry["start"], span.start)
+            entry["end"] = max(entry["end"], span.start + span.duration)
+            entry["errors"] += span.error is not None
+        return {
+            migration: {
+                "operations": entry["operations"], "busySeconds": round(entry["busySeconds"], 6),
+                "wallSeconds": round(entry["end"] - entry["start"], 6), "errors": entry["errors"],
+            }
+            for migration, entry in sorted(extents.items())
+        }
+
+    def report(self) -> Dict:
+        return {
+            "command": self.command,
+            "startedAt": self.started_at,
+            "seconds": round(self.elapsed(), 6),
+            "counters": dict(self.counters),
+            "summary": {name: dict(entry, seconds=round(entry["seconds"], 6),
+                                   maxSeconds=round(entry["maxSeconds"], 6))
+                        for name, entry in sorted(self.summary().items())},
+            "migrations": self.migrations(),
+            "spans": [span.to_dict() for span in sorted(self.spans, key=lambda s: s.start)],
+        }
+
+    def prometheus(self) -> str:
+        """
+        The run in the Prometheus text exposition format, for the node
+        exporter's textfile collector.
+        """
+        label = f'command="{self.command}"'
+        lines = [
+            f"# HELP {PROMETHEUS_PREFIX}_run_seconds Duration of the last run.",
+            f"# TYPE {PROMETHEUS_PREFIX}_run_seconds gauge",
+            f"{PROMETHEUS_PREFIX}_run_seconds{{{label}}} {self.elapsed():.6f}",
+            f"# HELP {PROMETHEUS_PREFIX}_last_run_timestamp_seconds Start of the last run.",
+            f"# TYPE {PROMETHEUS_PREFIX}_last_run_timestamp_seconds gauge",
+            f"{PROMETHEUS_PREFIX}_last_run_timestamp_seconds{{{label}}} {self.started_at:.3f}",
+        ]
+        for name, help_text in COUNTERS.items():
+            lines += [
+                f"# HELP {PROMETHEUS_PREFIX}_{name}_total {help_text}",
+                f"# TYPE {PROMETHEUS_PREFIX}_{name}_total counter",
+                f"{PROMETHEUS_PREFIX}_{name}_total{{{label}}} {self.counters.get(name, 0)}",
+            ]
+        lines += [
+            f"# HELP {PROMETHEUS_PREFIX}_span_seconds Time spent in each kind of step of the last run.",
+            f"# TYPE {PROMETHEUS_PREFIX}_span_seconds summary",
+        ]
+        for name, entry in sorted(self.summary().items()):
+            lines.append(f'{PROMETHEUS_PREFIX}_span_seconds_sum{{{label},span="{name}"}} {entry["seconds"]:.6f}')
+            lines.append(f'{PROMETHEUS_PREFIX}_span_seconds_count{{{label},span="{name}"}} {entry["count"]}')
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str) -> None:
+        """
+        Write the run to `path`: a Prometheus textfile when it ends in
+        `.prom`, a JSON report otherwise. The file is replaced atomically,
+        so a collector never reads half of it.
+        """
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            if path.endswith(".prom"):
+                f.write(self.prometheus())
+            else:
+                json.dump(self.report(), f, indent=2)
+        os.replace(tmp_path, path)
+
+
+def get_tracer() -> Optional[Tracer]:
+    return _tracer
+
+
+@contextmanager
+def activate(tracer: Optional[Tracer]):
+    """
+    Record spans and counters to `tracer` until the block exits.
+    """
+    global _tracer
+    previous, _tracer = _tracer, tracer
+    try:
+        yield tracer
+    finally:
+        _tracer = previous
+
+
+def span(name: str, **attributes):
+    """
+    Time a block as a span of the active tracer, or do nothing when no
+    tracer is active. The block receives the span, or None.
+    """
+    tracer = _tracer
+    return tracer.span(name, **attributes) if tracer is not None else nullcontext()
+
+
+def count(name: str, value: int = 1) -> None:
+    tracer = _tracer
+    if tracer is not None:
+        tracer.count(name, value)
+
+
+def annotate(**attributes) -> None:
+    """
+    Add attributes to the innermost open span, e.g. the number of objects
+    an operation processed. Does nothing when no tracer is active.
+    """
+    current = _current_span.get()
+    if _tracer is not None and current is not None:
+        current.attributes.update(attributes)
+
+
+def operation_name(method: str, path: str) -> str:
+    """
+    Name of the remote operation a REST call makes, for span names.
+    """
+    parts = [p for p in path.split("?", 1)[0].split("/") if p]
+    if parts[:1] == ["v1"]:
+        parts = parts[1:]
+    method = method.upper()
+    if parts == ["schema"]:
+        return {"GET": "get_schema", "POST": "create_class"}.get(method, f"{method} /schema")
+    if len(parts) == 2 and parts[0] == "schema" and method == "DELETE":
+        return "delete_class"
+    if len(parts) == 3 and parts[0] == "schema" and parts[2] == "properties" and method == "POST":
+        return "create_property"
+    if len(parts) == 3 and parts[0] == "schema" and parts[2] == "tenants":
+        return {"GET": "list_tenants", "POST": "add_tenants", "PUT": "update_tenants",
+                "DELETE": "remove_tenants"}.get(method, f"{method} /schema")
+    if parts == ["batch", "objects"] and method == "POST":
+        return "batch_objects"
+    if parts == ["batch", "references"] and method == "POST":
+        return "batch_references"
+    if parts == ["objects"] and method == "GET":
+        return "list_objects"
+    return f"{method} /{parts[0]}" if parts else f"{method} /"
+
+
+def record_request(current: Optional[Span], status_code: Optional[int], sent: int, received: int) -> None:
+    """
+    Count one remote request, and tag the span timing it with its status.
+    """
+    count("requests")
+    count("bytes_sent", sent)
+    count("bytes_received", received)
+    if status_code is None or status_code >= 400:
+        count("errors")
+    if current is not None:
+        current.attributes["status"] = status_code
+
+
+def _traced_call(method: str, call):
+    def traced(path, *args, **kwargs):
+        body = kwargs.get("weaviate_object", args[0] if args and method != "GET" else None)
+        # Only paid while a tracer is active: the client encodes the body
+        # again itself.
+        sent = len(json.dumps(body).encode("utf-8")) if body is not None else 0
+        with span(operation_name(method, path), path=path) as current:
+            try:
+                response = call(path, *args, **kwargs)
+            except Exception:
+                record_request(current, None, sent, 0)
+                raise
+            record_request(current, getattr(response, "status_code", None), sent,
+                           len(getattr(response, "content", b"") or b""))
+            return response
+    return traced
+
+
+def instrument(client):
+    """
+    Trace the HTTP calls `client` makes while a tracer is active.
+
+    The methods of the client's connection are wrapped in place, so calls
+    made by the client library itself are traced as well as the raw REST
+    calls of `weaviate_migrate.rest`. Does nothing when no tracer is active.
+    """
+    connection = getattr(client, "_connection", None)
+    if _tracer is None or connection is None or getattr(connection, "_weaviate_migrate_traced", False):
+        return client
+    for method in ("get", "post", "put", "patch", "delete"):
+        call = getattr(connection, method, None)
+        if call is not None:
+            setattr(connection, method, _traced_call(method.upper(), call))
+    connection._weaviate_migrate_traced = True
+    return client
+
+
+def add_arguments(parser) -> None:
+    parser.add_argument(
+        "--metrics-file",
+        help="Write spans and counters of the run to this file: a Prometheus textfile if it ends in .prom, "
+             "JSON otherwise."
+    )
+    parser.add_argument("--profile", help="Profile the run with cProfile and write the stats to this file.")
+
+
+@contextmanager
+def session(args, command: str):
+    """
+    Trace and profile a command run as its `--metrics-file` and `--profile`
+    arguments ask. The outputs are written even when the run fails.
+    """
+    metrics_file = getattr(args, "metrics_file", None)
+    profile_file = getattr(args, "profile", None)
+    tracer = Tracer(command) if metrics_file else None
+    profiler = None
+    if profile_file:
+        import cProfile
+        profiler = cProfile.Profile()
+
+    with activate(tracer):
+        if profiler is not None:
+            profiler.enable()
+        try:
+            with span(command):
+                yield tracer
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                _write_profile(profiler, profile_file)
+            if tracer is not None:
+                tracer.write(metrics_file)
+                logger.info(f"Wrote run metrics to {metrics_file}")
+
+
+def _write_profile(profiler, path: str) -> None:
+    import pstats
+
+    profiler.dump_stats(path)
+    # Time spent in the functions themselves shows the Python-side hot
+    # paths; time waiting on the network lands in a few socket calls.
+    print(f"Profile written to {path}; top functions by own time:", file=sys.stderr)
+    pstats.Stats(profiler, stream=sys.stderr).sort_stats("tottime").print_stats(PROFILE_TOP)
+
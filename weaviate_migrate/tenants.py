@@ -0,0 +1,100 @@
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+from weaviate_migrate.rest import add_tenants, delete_tenants, list_tenants, update_tenants
+
+logger = logging.getLogger(__name__)
+
+TENANT_OPERATIONS = ("add_tenants", "remove_tenants", "set_tenant_activity")
+# Tenants per request; the server handles a few hundred per call well.
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_WORKERS = 4
+# Servers from 1.26 on name the activity statuses differently.
+ACTIVITY_ALIASES = {"ACTIVE": "HOT", "INACTIVE": "COLD"}
+
+
+class TenantError(Exception):
+    """
+    Raised when a tenant operation refers to tenants that do not exist.
+    """
+
+
+def activity(status: str) -> str:
+    """
+    Canonical form of an activity status, so `ACTIVE` matches `HOT`.
+    """
+    status = status.upper()
+    return ACTIVITY_ALIASES.get(status, status)
+
+
+def chunked(items: List, size: int) -> List[List]:
+    if size < 1:
+        raise ValueError("Batch size must be at least 1.")
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def tenant_changes(live: Dict[str, str], entry: Dict) -> Tuple[List, int]:
+    """
+    The tenant changes an entry still needs against the `live` tenants of
+    its class, and how many of its tenants need none.
+
+    `add_tenants` yields the tenants to create and `set_tenant_activity`
+    the tenants whose status differs, both as tenant objects;
+    `remove_tenants` yields the names to delete. Adding an existing tenant
+    leaves its status alone.
+    """
+    kind = entry["type"]
+    requested = list(dict.fromkeys(entry["tenants"]))
+    if kind == "add_tenants":
+        missing = set(requested) - live.keys()
+        status = entry.get("activityStatus")
+        changes = [
+            dict({"name": name}, **({"activityStatus": status} if status else {}))
+            for name in requested if name in missing
+        ]
+    elif kind == "remove_tenants":
+        present = set(requested) & live.keys()
+        changes = [name for name in requested if name in present]
+    elif kind == "set_tenant_activity":
+        unknown = set(requested) - live.keys()
+        if unknown:
+            raise TenantError(
+                f"{len(unknown)} tenant(s) of {entry['class']} do not exist: {', '.join(sorted(unknown)[:10])}"
+            )
+        status = activity(entry["activityStatus"])
+        changes = [
+            {"name": name, "activityStatus": entry["activityStatus"]}
+            for name in requested if activity(live[name]) != status
+        ]
+    else:
+        raise ValueError(f"Unknown tenant operation: {kind}")
+    return changes, len(requested) - len(changes)
+
+
+def apply_tenant_operation(client, class_name: str, entry: Dict) -> Dict:
+    """
+    Apply a tenant migration entry to `class_name`, the physical class.
+
+    The live tenants are read once and diffed with the entry, so only the
+    missing changes are sent and a re-run sends nothing. The changes go out
+    in batches of `batch_size` tenants, `workers` requests at a time.
+    """
+    start = time.perf_counter()
+    changes, unchanged = tenant_changes(list_tenants(client, class_name), entry)
+    send = {"add_tenants": add_tenants, "remove_tenants": delete_tenants,
+            "set_tenant_activity": update_tenants}[entry["type"]]
+    chunks = chunked(changes, entry.get("batch_size", DEFAULT_BATCH_SIZE))
+    if chunks:
+        with ThreadPoolExecutor(max_workers=min(entry.get("workers", DEFAULT_WORKERS), len(chunks))) as pool:
+            for future in [pool.submit(send, client, class_name, chunk) for chunk in chunks]:
+                future.result()
+    seconds = time.perf_counter() - start
+    return {
+        "requested": len(changes) + unchanged,
+        "changed": len(changes),
+        "unchanged": unchanged,
+        "chunks": len(chunks),
+        "seconds": seconds,
+        "tenants_per_second": len(changes) / seconds if seconds else 0.0,
+    }
@@ -0,0 +1,364 @@
+import time
+import random
+import logging
+import threading
+from typing import Dict, Optional
+from weaviate_migrate import telemetry
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_MAX_CONCURRENCY = 32
+DEFAULT_INITIAL_CONCURRENCY = 8
+
+# The server refused these before doing anything, so any request can be
+# sent again, and they signal an overloaded cluster.
+THROTTLE_STATUSES = frozenset({429, 503})
+# Gateway failures: the request may or may not have been applied.
+TRANSIENT_STATUSES = frozenset({502, 504})
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "PUT", "DELETE"})
+# Read-only queries sent as POST.
+IDEMPOTENT_POST_PATHS = frozenset({"/graphql"})
+# Includes timeouts, resets, and the `requests` connection errors.
+CONNECTION_ERRORS = (OSError,)
+
+
+def is_idempotent(method: str, path: str, body=None) -> bool:
+    """
+    Whether sending a request twice has the same effect as sending it once.
+
+    Besides the idempotent methods and read-only queries, a batch of
+    objects is an upsert when every object carries its UUID.
+    """
+    method = method.upper()
+    if method in IDEMPOTENT_METHODS:
+        return True
+    parts = [p for p in path.split("?", 1)[0].split("/") if p]
+    path = "/" + "/".join(parts[1:] if parts[:1] == ["v1"] else parts)
+    if path in IDEMPOTENT_POST_PATHS:
+        return True
+    if path == "/batch/objects" and isinstance(body, dict):
+        return all(obj.get("id") for obj in body.get("objects") or [])
+    return False
+
+
+def retry_after(response) -> Optional[float]:
+    headers = getattr(response, "headers", None) or {}
+    value = headers.get("Retry-After") or headers.get("retry-after")
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        # An HTTP date; fall back to our own backoff.
+        return None
+
+
+class RetryPolicy:
+    """
+    When to send a failed request again, and how long to wait first.
+
+    Throttled requests (429, 503) are always retried. Gateway errors and
+    connection failures are retried only for idempotent requests, since
+    the first attempt may have been applied. Waits are drawn uniformly from
+    zero to an exponentially growing cap ("full jitter"), so clients that
+    were throttled together do not come back together, and are at least the
+    server's `Retry-After`.
+    """
+
+    def __init__(self, max_retries: int = DEFAULT_MAX_RETRIES, base_delay: float = 0.1, max_delay: float = 10.0):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._random = random.Random()
+
+    def should_retry(self, attempt: int, idempotent: bool, status_code: Optional[int] = None) -> bool:
+        if attempt >= self.max_retries:
+            return False
+        if status_code is None:
+            return idempotent
+        return status_code in THROTTLE_STATUSES or (idempotent and status_code in TRANSIENT_STATUSES)
+
+    def delay(self, attempt: int, server_delay: Optional[float] = None) -> float:
+        delay = self._random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        if server_delay is not None:
+            delay = max(delay, min(server_delay, self.max_delay))
+        return delay
+
+
+class AIMDLimiter:
+    """
+    Limit on concurrent requests that adapts to the cluster, like TCP's
+    congestion window.
+
+    Every request that completes normally while the window is full raises
+    the limit by one per window of requests (additive increase). A
+    throttling response, or a request much slower than the fastest seen
+    for its operation, halves it (multiplicative decrease). Only requests
+    sent after the last decrease can cause another one, so a burst of
+    throttled responses to one window halves the limit once.
+
+    Threads use `acquire` and `release`; coroutines on one event loop use
+    `acquire_async` and `release`.
+    """
+
+    def __init__(self, initial: int = DEFAULT_INITIAL_CONCURRENCY, minimum: int = 1,
+                 maximum: int = DEFAULT_MAX_CONCURRENCY, backoff: float = 0.5,
+                 latency_tolerance: float = 3.0, latency_slack: float = 0.05):
+        if not 1 <= minimum <= maximum:
+            raise ValueError("Concurrency limits must satisfy 1 <= minimum <= maximum.")
+        self.limit = float(min(max(initial, minimum), maximum))
+        self.minimum = minimum
+        self.maximum = maximum
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        # Latency increases below this many seconds are noise, not queueing.
+        self.latency_slack = latency_slack
+        self.in_flight = 0
+        self.decreases = 0
+        self._decreased_at = float("-inf")
+        self._baselines = {}
+        self._condition = threading.Condition()
+        self._async_waiters = []
+
+    def _has_room(self) -> bool:
+        return self.in_flight < int(self.limit)
+
+    def acquire(self) -> float:
+        """
+        Wait for a free slot, returning the request's start time to pass to
+        `release`.
+        """
+        with self._condition:
+            self._condition.wait_for(self._has_room)
+            self.in_flight += 1
+            return time.monotonic()
+
+    async def acquire_async(self) -> float:
+        import asyncio
+
+        while not self._has_room():
+            waiter = asyncio.get_running_loop().create_future()
+            self._async_waiters.append(waiter)
+            await waiter
+        self.in_flight += 1
+        return time.monotonic()
+
+    def _is_slow(self, key: Optional[str], latency: float) -> bool:
+        if key is None:
+            return False
+        # The fastest latency seen, drifting up slowly so that one lucky
+        # request does not make everything after it look slow.
+        baseline = min(self._baselines.get(key, latency) * 1.01, latency)
+        self._baselines[key] = baseline
+        return latency > baseline * self.latency_tolerance + self.latency_slack
+
+    def release(self, started: float, throttled: bool = False, key: Optional[str] = None) -> None:
+        """
+        Free the slot taken at `started`, adjusting the limit by how the
+        request went. Pass `key`, the operation, only for requests that got
+        a response, so their latency is compared with their own kind.
+        """
+        with self._condition:
+            window_full = self.in_flight >= int(self.limit)
+            self.in_flight -= 1
+            congested = throttled or self._is_slow(key, time.monotonic() - started)
+            if congested:
+                if started >= self._decreased_at:
+                    self.limit = max(self.minimum, self.limit * self.backoff)
+                    self._decreased_at = time.monotonic()
+                    self.decreases += 1
+            elif window_full:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self._condition.notify_all()
+        # Coroutines release on the event loop's thread, so their waiters
+        # can be woken directly.
+        waiters, self._async_waiters = self._async_waiters, []
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+
+class Transport:
+    """
+    Retries and adaptive concurrency for the HTTP calls of a client.
+
+    `wrap` applies them to a synchronous client's connection in place, so
+    both the client library's calls and the raw REST calls of
+    `weaviate_migrate.rest` go through them. The async backend's REST client
+    takes the same transport.
+    """
+
+    def __init__(self, retry: Optional[RetryPolicy] = None, limiter: Optional[AIMDLimiter] = None):
+        self.retry = retry or RetryPolicy()
+        self.limiter = limiter or AIMDLimiter()
+
+    @classmethod
+    def create(cls, max_retries: int = DEFAULT_MAX_RETRIES,
+               max_concurrency: int = DEFAULT_MAX_CONCURRENCY) -> "Transport":
+        return cls(
+            RetryPolicy(max_retries),
+            AIMDLimiter(min(DEFAULT_INITIAL_CONCURRENCY, max_concurrency), maximum=max_concurrency),
+        )
+
+    @classmethod
+    def from_args(cls, args) -> "Transport":
+        max_retries = getattr(args, "max_retries", None)
+        return cls.create(
+            DEFAULT_MAX_RETRIES if max_retries is None else max_retries,
+            getattr(args, "max_concurrency", None) or DEFAULT_MAX_CONCURRENCY,
+        )
+
+    def fork(self) -> "Transport":
+        """
+        A transport with the same retry policy and a limiter of its own,
+        for an event loop: a limiter is used either from threads or from
+        one loop, not both.
+        """
+        limiter = self.limiter
+        return Transport(self.retry, AIMDLimiter(
+            int(limiter.limit), limiter.minimum, limiter.maximum, limiter.backoff,
+            limiter.latency_tolerance, limiter.latency_slack,
+        ))
+
+    def _log_retry(self, method: str, path: str, attempt: int, delay: float, reason) -> None:
+        telemetry.count("retries")
+        logger.info(f"Retrying {method} {path} in {delay:.2f}s (attempt {attempt + 2}): {reason}")
+
+    def call(self, method: str, call, path: str, *args, **kwargs):
+        """
+        Make `call(path, *args, **kwargs)`, a request of `method`, with
+        retries and within the concurrency limit.
+        """
+        body = kwargs.get("weaviate_object", args[0] if args and method != "GET" else None)
+        idempotent = is_idempotent(method, path, body)
+        key = telemetry.operation_name(method, path)
+        attempt = 0
+        while True:
+            started = self.limiter.acquire()
+            try:
+                response = call(path, *args, **kwargs)
+            except CONNECTION_ERRORS as e:
+                self.limiter.release(started)
+                if not self.retry.should_retry(attempt, idempotent):
+                    raise
+                delay = self.retry.delay(attempt)
+                self._log_retry(method, path, attempt, delay, e)
+            except BaseException:
+                self.limiter.release(started)
+                raise
+            else:
+                status_code = getattr(response, "status_code", None)
+                self.limiter.release(started, status_code in THROTTLE_STATUSES, key)
+                if not self.retry.should_retry(attempt, idempotent, status_code):
+                    return response
+                delay = self.retry.delay(attempt, retry_after(response))
+                self._log_retry(method, path, attempt, delay, f"status {status_code}")
+            time.sleep(delay)
+            attempt += 1
+
+    async def call_async(self, method: str, call, path: str, body=None, params: Optional[Dict] = None):
+        """
+        Await `call(method, path, body, params)` with retries and within the
+        concurrency limit.
+        """
+        import asyncio
+
+        idempotent = is_idempotent(method, path, body)
+        key = telemetry.operation_name(method, path)
+        attempt = 0
+        while True:
+            started = await self.limiter.acquire_async()
+            try:
+                response = await call(method, path, body, params)
+            except (*CONNECTION_ERRORS, asyncio.TimeoutError) as e:
+                self.limiter.release(started)
+                if not self.retry.should_retry(attempt, idempotent):
+                    raise
+                delay = self.retry.delay(attempt)
+                self._log_retry(method, path, attempt, delay, e)
+            except BaseException:
+                self.limiter.release(started)
+                raise
+            else:
+                self.limiter.release(started, response.status_code in THROTTLE_STATUSES, key)
+                if not self.retry.should_retry(attempt, idempotent, response.status_code):
+                    return response
+                delay = self.retry.delay(attempt, retry_after(response))
+                self._log_retry(method, path, attempt, delay, f"status {response.status_code}")
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def _pool(self, connection) -> None:
+        # The client library's `requests` session keeps up to 10 idle
+        # connections; size the pool for the most requests in flight so
+        # none is opened just to be thrown away.
+        session = getattr(connection, "_session", None)
+        if session is None or not hasattr(session, "mount"):
+            return
+        from requests.adapters import HTTPAdapter
+
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.limiter.maximum, max_retries=0)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+
+    def wrap(self, client):
+        """
+        Send the HTTP calls of `client` through this transport, returning
+        the client.
+        """
+        connection = client._connection
+        if getattr(connection, "_weaviate_migrate_transport", None) is not None:
+            return client
+        self._pool(connection)
+        for method in ("get", "post", "put", "patch", "delete"):
+            call = getattr(connection, method, None)
+            if call is not None:
+                setattr(connection, method, self._wrapped(method.upper(), call))
+        connection._weaviate_migrate_transport = self
+        return client
+
+    def _wrapped(self, method: str, call):
+        def wrapped(path, *args, **kwargs):
+            return self.call(method, call, path, *args, **kwargs)
+        return wrapped
+
+
+def transport_of(client) -> Optional[Transport]:
+    """
+    The transport `client` was wrapped with, if any.
+    """
+    return getattr(getattr(client, "_connection", None), "_weaviate_migrate_transport", None)
+
+
+def add_arguments(parser) -> None:
+    parser.add_argument(
+        "--max-retries", type=int, default=DEFAULT_MAX_RETRIES,
+        help="Times a throttled or failed request is retried (default: %(default)s)."
+    )
+    parser.add_argument(
+        "--max-concurrency", type=int, default=DEFAULT_MAX_CONCURRENCY,
+        help="Most requests in flight; the limit adapts below it to the cluster (default: %(default)s)."
+    )
+
+
+def connect(url: str, api_key: Optional[str] = None, max_retries: int = DEFAULT_MAX_RETRIES,
+            max_concurrency: int = DEFAULT_MAX_CONCURRENCY):
+    """
+    A client for `url`, authenticated with `api_key` if given, whose
+    requests are retried and adaptively limited.
+    """
+    import weaviate
+    from weaviate import Client
+
+    if api_key:
+        client = Client(url, auth_client_secret=weaviate.auth.AuthApiKey(api_key=api_key))
+    else:
+        client = Client(url)
+    return Transport.create(max_retries, max_concurrency).wrap(client)
+
+
+def configure(client, args):
+    """
+    Trace `client` if a tracer is active, and send its calls through a
+    transport built from the command line arguments.
+    """
+    return Transport.from_args(args).wrap(telemetry.instrument(client))